@@ -39,6 +39,9 @@ CREATE TABLE versions (
     "status" TEXT,
     "file_path" TEXT,
     "effective_date" TEXT,
+    "effective_from" TEXT,
+    "effective_to" TEXT,
+    "checksum" TEXT,
     FOREIGN KEY("doc") REFERENCES "documents"("doc_id"),
     UNIQUE("doc", "version")
 );
@@ -57,6 +60,16 @@ CREATE TABLE audit_log (
     FOREIGN KEY("user") REFERENCES "users"("user_id")
 );
 
+CREATE TABLE audit_checkpoints (
+    "checkpoint_id" INTEGER,
+    "log_id" INTEGER,
+    "chain_hash" TEXT,
+    "created_at" TEXT,
+    "signature" TEXT,
+    "sealed" INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY("checkpoint_id")
+);
+
 CREATE TABLE approvals (
     "approval_id" INTEGER,
     "version_id" INTEGER,
@@ -88,4 +101,129 @@ CREATE TABLE training_records(
 
 CREATE INDEX idx_audit_lookup ON "audit_log"("table_affected", "record_id");
 CREATE INDEX idx_doc_num ON "documents"("doc_num");
-CREATE INDEX idx_versions_doc ON "versions"("doc");
\ No newline at end of file
+CREATE INDEX idx_versions_doc ON "versions"("doc");
+CREATE INDEX idx_training_due ON "training_records"("status", "due_date");
+CREATE INDEX idx_roles_name ON "roles"("role_name");
+CREATE INDEX idx_users_roles_role ON "users_roles"("role", "user");
+CREATE INDEX idx_documents_type ON "documents"("type", "doc_id");
+CREATE INDEX idx_documents_title ON "documents"("title");
+CREATE INDEX idx_versions_doc_status ON "versions"("doc", "status");
+CREATE INDEX idx_versions_status ON "versions"("status");
+CREATE INDEX idx_training_user ON "training_records"("user_id", "version_id", "status");
+CREATE INDEX idx_approvals_version ON "approvals"("version_id", "status");
+
+CREATE TABLE due_events (
+    "kind" TEXT,
+    "record_id" INTEGER,
+    "due_at" TEXT,
+    PRIMARY KEY("kind", "record_id")
+);
+
+CREATE INDEX idx_due_events_due ON "due_events"("due_at");
+
+CREATE TRIGGER trg_versions_due AFTER UPDATE OF "status", "effective_date" ON "versions"
+WHEN new."status" IN ('TRAINING', 'PENDING_RELEASE') AND new."effective_date" IS NOT NULL
+BEGIN
+    INSERT INTO due_events ("kind", "record_id", "due_at") VALUES ('RELEASE', new."version_id", new."effective_date")
+    ON CONFLICT ("kind", "record_id") DO UPDATE SET "due_at" = excluded."due_at";
+END;
+
+CREATE TRIGGER trg_versions_due_clear AFTER UPDATE OF "status" ON "versions"
+WHEN new."status" NOT IN ('TRAINING', 'PENDING_RELEASE')
+BEGIN
+    DELETE FROM due_events WHERE "kind" = 'RELEASE' AND "record_id" = new."version_id";
+END;
+
+CREATE TRIGGER trg_training_due AFTER INSERT ON "training_records"
+WHEN new."status" IN ('ASSIGNED', 'FAILED')
+BEGIN
+    INSERT INTO due_events ("kind", "record_id", "due_at") VALUES ('OVERDUE', 0, new."due_date")
+    ON CONFLICT ("kind", "record_id") DO UPDATE SET "due_at" = min("due_at", excluded."due_at");
+END;
+
+CREATE TRIGGER trg_training_due_update AFTER UPDATE OF "status", "due_date" ON "training_records"
+WHEN new."status" IN ('ASSIGNED', 'FAILED')
+BEGIN
+    INSERT INTO due_events ("kind", "record_id", "due_at") VALUES ('OVERDUE', 0, new."due_date")
+    ON CONFLICT ("kind", "record_id") DO UPDATE SET "due_at" = min("due_at", excluded."due_at");
+END;
+
+CREATE TABLE sequences (
+    "name" TEXT,
+    "value" INTEGER,
+    PRIMARY KEY("name")
+);
+
+CREATE VIRTUAL TABLE documents_fts USING fts5(
+    doc_num UNINDEXED,
+    title,
+    content,
+    status,
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+);
+
+CREATE INDEX idx_audit_record ON "audit_log"("table_affected", "record_id", "log_id");
+CREATE INDEX idx_audit_user ON "audit_log"("user", "log_id");
+CREATE INDEX idx_audit_timestamp ON "audit_log"("timestamp");
+
+CREATE TABLE training_summary (
+    "version_id" INTEGER,
+    "assigned" INTEGER NOT NULL DEFAULT 0,
+    "failed" INTEGER NOT NULL DEFAULT 0,
+    "completed" INTEGER NOT NULL DEFAULT 0,
+    "overdue" INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY("version_id"),
+    FOREIGN KEY("version_id") REFERENCES "versions"("version_id")
+);
+
+CREATE TABLE current_effective (
+    "doc_id" INTEGER,
+    "version_id" INTEGER NOT NULL,
+    "version" TEXT,
+    "file_path" TEXT,
+    "effective_date" TEXT,
+    PRIMARY KEY("doc_id"),
+    FOREIGN KEY("doc_id") REFERENCES "documents"("doc_id"),
+    FOREIGN KEY("version_id") REFERENCES "versions"("version_id")
+);
+
+CREATE TRIGGER trg_versions_effective AFTER UPDATE OF "status", "file_path", "effective_date" ON "versions"
+WHEN new."status" = 'RELEASED'
+BEGIN
+    INSERT INTO current_effective ("doc_id", "version_id", "version", "file_path", "effective_date")
+    VALUES (new."doc", new."version_id", new."version", new."file_path", new."effective_date")
+    ON CONFLICT ("doc_id") DO UPDATE SET "version_id" = excluded."version_id", "version" = excluded."version", "file_path" = excluded."file_path", "effective_date" = excluded."effective_date"
+    WHERE excluded."version_id" >= "version_id";
+END;
+
+CREATE TRIGGER trg_versions_effective_insert AFTER INSERT ON "versions"
+WHEN new."status" = 'RELEASED'
+BEGIN
+    INSERT INTO current_effective ("doc_id", "version_id", "version", "file_path", "effective_date")
+    VALUES (new."doc", new."version_id", new."version", new."file_path", new."effective_date")
+    ON CONFLICT ("doc_id") DO UPDATE SET "version_id" = excluded."version_id", "version" = excluded."version", "file_path" = excluded."file_path", "effective_date" = excluded."effective_date"
+    WHERE excluded."version_id" >= "version_id";
+END;
+
+CREATE TRIGGER trg_versions_effective_clear AFTER UPDATE OF "status" ON "versions"
+WHEN old."status" = 'RELEASED' AND new."status" != 'RELEASED'
+BEGIN
+    DELETE FROM current_effective WHERE "doc_id" = new."doc" AND "version_id" = new."version_id";
+    INSERT OR IGNORE INTO current_effective ("doc_id", "version_id", "version", "file_path", "effective_date")
+    SELECT "doc", "version_id", "version", "file_path", "effective_date" FROM "versions"
+    WHERE "doc" = new."doc" AND "status" = 'RELEASED' ORDER BY "version_id" DESC LIMIT 1;
+END;
+
+CREATE INDEX idx_versions_effective ON "versions"("doc", "effective_from");
+
+CREATE TABLE file_scan_cache (
+    "path" TEXT PRIMARY KEY,
+    "size" INTEGER,
+    "mtime_ns" INTEGER,
+    "inode" INTEGER,
+    "digest" TEXT
+) WITHOUT ROWID;
+
+PRAGMA journal_mode = WAL;
+PRAGMA user_version = 13;
\ No newline at end of file
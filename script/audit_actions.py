@@ -2,7 +2,75 @@ import sqlite3
 from datetime import datetime
 import json
 import hashlib
-from classes import Document_Header, Document_Version, Training
+from classes import Document_Header, Document_Version, Training, ChangeSet
+from session import Session, connect
+
+genesis_hash: str = "0" * 64
+query_insert: str = """
+    INSERT INTO audit_log (table_affected, record_id, user, action, old_val, new_val, timestamp, hash)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """
+
+
+def audit_entry(
+    table_affected: str,
+    record_id: int,
+    user_id: int,
+    action: str,
+    old_val: dict,
+    new_val: dict,
+    timestam: str,
+) -> tuple:
+    old_val_json: str = json.dumps(old_val)
+    new_val_json: str = json.dumps(new_val)
+    return (
+        table_affected,
+        record_id,
+        user_id,
+        action,
+        old_val_json,
+        new_val_json,
+        timestam,
+    )
+
+
+def chain_hash(prev_hash: str, entry: tuple) -> str:
+    raw_hash: str = prev_hash + "".join(str(field) for field in entry)
+    return hashlib.sha256(raw_hash.encode("utf-8")).hexdigest()
+
+
+def last_audit_hash(db: sqlite3.Connection) -> str:
+    cur: sqlite3.Cursor = db.execute(
+        "SELECT hash FROM audit_log WHERE log_id = (SELECT MAX(log_id) FROM audit_log)"
+    )
+    result: tuple | None = cur.fetchone()
+    if result is None:
+        return genesis_hash
+    return result[0]
+
+
+def insert_chained(db: sqlite3.Connection, entries: list[tuple]) -> None:
+    prev_hash: str = last_audit_hash(db)
+    rows: list[tuple] = []
+    for entry in entries:
+        prev_hash = chain_hash(prev_hash, entry)
+        rows.append((*entry, prev_hash))
+    db.executemany(query_insert, rows)
+
+
+def audit_log_many(
+    entries: list[tuple], db_path: str, session: Session | None = None
+) -> None:
+    if not entries:
+        return
+    if session is None:
+        with connect(db_path, immediate=True) as db:
+            insert_chained(db, entries)
+        return
+    pending: list[tuple] = session.pending_audit
+    if not pending:
+        session.before_commit(lambda: insert_chained(session.db, pending))
+    pending.extend(entries)
 
 
 def audit_log_docs(
@@ -11,6 +79,7 @@ def audit_log_docs(
     user_id: int,
     action: str,
     db_path: str,
+    session: Session | None = None,
 ) -> dict:
     if isinstance(new_object, Document_Header):
         table_affected: str = "documents"
@@ -24,45 +93,48 @@ def audit_log_docs(
     changed_keys: list = [k for k, v in new_dict.items() if v != old_dict.get(k)]
     old_val: dict = {k: old_dict.get(k) for k in changed_keys}
     new_val: dict = {k: new_dict.get(k) for k in changed_keys}
-    old_val_json: str = json.dumps(old_val)
-    new_val_json: str = json.dumps(new_val)
-    record_id: int = new_object.id
     timestam: str = datetime.now().isoformat()
-    raw_hash: str = f"{table_affected}{record_id}{user_id}{action}{old_val_json}{new_val_json}{timestam}"
-    row_hash: str = hashlib.sha256(raw_hash.encode("utf-8")).hexdigest()
-    query_insert: str = """
-        INSERT INTO audit_log (table_affected, record_id, user, action, old_val, new_val, timestamp, hash)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """
-    with sqlite3.connect(db_path) as db:
-        try:
-            db.execute(
-                query_insert,
-                (
-                    table_affected,
-                    record_id,
-                    user_id,
-                    action,
-                    old_val_json,
-                    new_val_json,
-                    timestam,
-                    row_hash,
-                ),
-            )
-            db.commit()
-        except sqlite3.Error as e:
-            db.rollback()
-            raise e
+    entry: tuple = audit_entry(
+        table_affected, new_object.id, user_id, action, old_val, new_val, timestam
+    )
+    audit_log_many([entry], db_path, session)
     return new_val
 
 
-def audit_log_training(
+def change_audit_entry(
+    changes: ChangeSet, user_id: int, action: str, timestam: str
+) -> tuple:
+    return audit_entry(
+        changes.table,
+        changes.record_id,  # type: ignore
+        user_id,
+        action,
+        changes.old,
+        changes.new,
+        timestam,
+    )
+
+
+def audit_log_changes(
+    changes: ChangeSet,
+    user_id: int,
+    action: str,
+    db_path: str,
+    session: Session | None = None,
+) -> dict:
+    timestam: str = datetime.now().isoformat()
+    entry: tuple = change_audit_entry(changes, user_id, action, timestam)
+    audit_log_many([entry], db_path, session)
+    return changes.new
+
+
+def training_audit_entry(
     old_training_obj: Training | None,
     new_training_obj: Training,
     user_id: int,
     action: str,
-    db_path: str,
-):
+    timestam: str,
+) -> tuple:
     table_affected: str = "training_records"
     if not old_training_obj:
         old_dict: dict = {}
@@ -72,33 +144,28 @@ def audit_log_training(
     changed_keys: list = [k for k, v in new_dict.items() if v != old_dict.get(k)]
     old_val: dict = {k: old_dict.get(k) for k in changed_keys}
     new_val: dict = {k: new_dict.get(k) for k in changed_keys}
-    old_val_json: str = json.dumps(old_val)
-    new_val_json: str = json.dumps(new_val)
-    record_id: int = new_training_obj.id
+    return audit_entry(
+        table_affected,
+        new_training_obj.id,
+        user_id,
+        action,
+        old_val,
+        new_val,
+        timestam,
+    )
+
+
+def audit_log_training(
+    old_training_obj: Training | None,
+    new_training_obj: Training,
+    user_id: int,
+    action: str,
+    db_path: str,
+    session: Session | None = None,
+):
     timestam: str = datetime.now().isoformat()
-    raw_hash: str = f"{table_affected}{record_id}{user_id}{action}{old_val_json}{new_val_json}{timestam}"
-    row_hash: str = hashlib.sha256(raw_hash.encode("utf-8")).hexdigest()
-    query_insert: str = """
-        INSERT INTO audit_log (table_affected, record_id, user, action, old_val, new_val, timestamp, hash)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """
-    with sqlite3.connect(db_path) as db:
-        try:
-            db.execute(
-                query_insert,
-                (
-                    table_affected,
-                    record_id,
-                    user_id,
-                    action,
-                    old_val_json,
-                    new_val_json,
-                    timestam,
-                    row_hash,
-                ),
-            )
-            db.commit()
-        except sqlite3.Error as e:
-            db.rollback()
-            raise e
-    return new_val
+    entry: tuple = training_audit_entry(
+        old_training_obj, new_training_obj, user_id, action, timestam
+    )
+    audit_log_many([entry], db_path, session)
+    return json.loads(entry[5])
@@ -0,0 +1,165 @@
+import sys
+import csv
+import sqlite3
+import json
+import argparse
+from collections.abc import Callable, Iterator
+from session import connect
+
+export_fields: list[str] = [
+    "log_id",
+    "table_affected",
+    "record_id",
+    "user",
+    "action",
+    "old_val",
+    "new_val",
+    "timestamp",
+    "hash",
+]
+export_formats: list[str] = ["jsonl", "csv"]
+
+
+def audit_filters(
+    user: int | None = None,
+    action: str | None = None,
+    table: str | None = None,
+    record_id: int | None = None,
+    since: str | None = None,
+    until: str | None = None,
+) -> tuple[str, list]:
+    clauses: list[str] = []
+    params: list = []
+    for column, operator, value in (
+        ("table_affected", "=", table),
+        ("record_id", "=", record_id),
+        ("user", "=", user),
+        ("action", "=", action),
+        ("timestamp", ">=", since),
+        ("timestamp", "<", until),
+    ):
+        if value is not None:
+            clauses.append(f"{column} {operator} ?")
+            params.append(value)
+    return "".join(f" AND {clause}" for clause in clauses), params
+
+
+def audit_bounds(
+    db: sqlite3.Connection, since: str | None = None, until: str | None = None
+) -> tuple[int, int]:
+    if since is None:
+        lower: int = 0
+    else:
+        first: int | None = db.execute(
+            "SELECT MIN(log_id) FROM audit_log INDEXED BY idx_audit_timestamp WHERE timestamp >= ?",
+            (since,),
+        ).fetchone()[0]
+        if first is None:
+            return 0, 0
+        lower = first - 1
+    if until is None:
+        upper: int = db.execute("SELECT MAX(log_id) FROM audit_log").fetchone()[0] or 0
+    else:
+        upper = (
+            db.execute(
+                "SELECT MAX(log_id) FROM audit_log INDEXED BY idx_audit_timestamp WHERE timestamp < ?",
+                (until,),
+            ).fetchone()[0]
+            or 0
+        )
+    return lower, upper
+
+
+def iter_audit(
+    db_path: str,
+    user: int | None = None,
+    action: str | None = None,
+    table: str | None = None,
+    record_id: int | None = None,
+    since: str | None = None,
+    until: str | None = None,
+    page_rows: int = 5000,
+    progress: Callable[[int, int, int], None] | None = None,
+) -> Iterator[tuple]:
+    where, params = audit_filters(user, action, table, record_id, since, until)
+    with connect(db_path) as db:
+        last_id, upper = audit_bounds(db, since, until)
+    query: str = f"SELECT {', '.join(export_fields)} FROM audit_log WHERE log_id > ? AND log_id <= ?{where} ORDER BY log_id LIMIT ?"
+    exported: int = 0
+    while True:
+        with connect(db_path) as db:
+            page: list[tuple] = db.execute(
+                query, (last_id, upper, *params, page_rows)
+            ).fetchall()
+        if not page:
+            break
+        yield from page
+        last_id = page[-1][0]
+        exported += len(page)
+        if progress is not None:
+            progress(exported, last_id, upper)
+        if len(page) < page_rows:
+            break
+
+
+def export_audit(
+    db_path: str,
+    out_path: str,
+    export_format: str = "jsonl",
+    page_rows: int = 5000,
+    progress: Callable[[int, int, int], None] | None = None,
+    **filters,
+) -> int:
+    if export_format not in export_formats:
+        raise ValueError(f"Invalid export format: '{export_format}'")
+    rows: Iterator[tuple] = iter_audit(
+        db_path, page_rows=page_rows, progress=progress, **filters
+    )
+    exported: int = 0
+    with open(out_path, "w", encoding="utf-8", newline="") as f:
+        if export_format == "csv":
+            writer = csv.writer(f)
+            writer.writerow(export_fields)
+            for row in rows:
+                writer.writerow(row)
+                exported += 1
+        else:
+            for row in rows:
+                f.write(json.dumps(dict(zip(export_fields, row))) + "\n")
+                exported += 1
+    return exported
+
+
+def print_progress(exported: int, last_id: int, upper: int) -> None:
+    sys.stderr.write(f"\r{exported} rows exported (log_id {last_id}/{upper})")
+    sys.stderr.flush()
+
+
+if __name__ == "__main__":
+    from config import db_path
+
+    parser = argparse.ArgumentParser(description="Export the audit trail")
+    parser.add_argument("out_path")
+    parser.add_argument("--format", choices=export_formats, default="jsonl")
+    parser.add_argument("--db", default=db_path)
+    parser.add_argument("--user", type=int)
+    parser.add_argument("--action")
+    parser.add_argument("--table")
+    parser.add_argument("--record", type=int)
+    parser.add_argument("--since")
+    parser.add_argument("--until")
+    args = parser.parse_args()
+    total: int = export_audit(
+        args.db,
+        args.out_path,
+        args.format,
+        progress=print_progress,
+        user=args.user,
+        action=args.action,
+        table=args.table,
+        record_id=args.record,
+        since=args.since,
+        until=args.until,
+    )
+    sys.stderr.write("\n")
+    print(f"Exported {total} audit rows to {args.out_path}")
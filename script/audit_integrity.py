@@ -0,0 +1,171 @@
+import sqlite3
+import hmac
+import hashlib
+import os
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from audit_actions import chain_hash, genesis_hash
+from config import audit_checkpoint_key
+from session import Session, open_session, connect
+
+query_rows: str = """
+    SELECT log_id, table_affected, record_id, user, action, old_val, new_val, timestamp, hash
+    FROM audit_log WHERE log_id > ? AND log_id <= ? ORDER BY log_id
+    """
+end_of_log: int = 2**63 - 1
+
+
+def sign_checkpoint(
+    log_id: int, chain: str, created_at: str, sealed: bool = False
+) -> str:
+    message: bytes = f"{log_id}{chain}{created_at}{'sealed' if sealed else ''}".encode(
+        "utf-8"
+    )
+    return hmac.new(audit_checkpoint_key, message, hashlib.sha256).hexdigest()
+
+
+def checked_checkpoint(result: tuple | None) -> tuple[int, str]:
+    if result is None:
+        return 0, genesis_hash
+    log_id: int
+    chain: str
+    created_at: str
+    signature: str
+    sealed: int
+    log_id, chain, created_at, signature, sealed = result
+    if not hmac.compare_digest(
+        signature, sign_checkpoint(log_id, chain, created_at, bool(sealed))
+    ):
+        raise ValueError(f"Invalid signature on audit checkpoint: '{log_id}'")
+    return log_id, chain
+
+
+def last_checkpoint(db: sqlite3.Connection) -> tuple[int, str]:
+    cur: sqlite3.Cursor = db.execute(
+        "SELECT log_id, chain_hash, created_at, signature, sealed FROM audit_checkpoints WHERE checkpoint_id = (SELECT MAX(checkpoint_id) FROM audit_checkpoints)"
+    )
+    return checked_checkpoint(cur.fetchone())
+
+
+def last_seal(db: sqlite3.Connection) -> tuple[int, str]:
+    cur: sqlite3.Cursor = db.execute(
+        "SELECT log_id, chain_hash, created_at, signature, sealed FROM audit_checkpoints WHERE sealed = 1 ORDER BY checkpoint_id DESC LIMIT 1"
+    )
+    return checked_checkpoint(cur.fetchone())
+
+
+def write_checkpoint(
+    db: sqlite3.Connection, log_id: int, chain: str, sealed: bool = False
+) -> None:
+    created_at: str = datetime.now().isoformat()
+    db.execute(
+        "INSERT INTO audit_checkpoints (log_id, chain_hash, created_at, signature, sealed) VALUES (?, ?, ?, ?, ?)",
+        (
+            log_id,
+            chain,
+            created_at,
+            sign_checkpoint(log_id, chain, created_at, sealed),
+            int(sealed),
+        ),
+    )
+
+
+def verify_rows(rows, prev_hash: str) -> tuple:
+    verified: int = 0
+    last_verified: int | None = None
+    for row in rows:
+        log_id: int = row[0]
+        if chain_hash(prev_hash, row[1:8]) != row[8]:
+            return verified, prev_hash, last_verified, log_id
+        prev_hash = row[8]
+        verified += 1
+        last_verified = log_id
+    return verified, prev_hash, last_verified, None
+
+
+def checkpoint_intact(db: sqlite3.Connection, log_id: int, chain: str) -> bool:
+    if log_id == 0:
+        return True
+    cur: sqlite3.Cursor = db.execute(
+        "SELECT hash FROM audit_log WHERE log_id = ?", (log_id,)
+    )
+    result: tuple | None = cur.fetchone()
+    return result is not None and result[0] == chain
+
+
+def verify_incremental(db_path: str, session: Session | None = None) -> dict:
+    with open_session(db_path, session, immediate=True) as session:
+        with connect(db_path, session) as db:
+            checkpoint_id: int
+            prev_hash: str
+            checkpoint_id, prev_hash = last_checkpoint(db)
+            if not checkpoint_intact(db, checkpoint_id, prev_hash):
+                return {
+                    "ok": False,
+                    "rows": 0,
+                    "from_log_id": checkpoint_id,
+                    "last_log_id": checkpoint_id,
+                    "broken_log_id": checkpoint_id,
+                }
+            cur: sqlite3.Cursor = db.execute(query_rows, (checkpoint_id, end_of_log))
+            verified, head_hash, last_verified, broken = verify_rows(cur, prev_hash)
+            if broken is None and last_verified is not None:
+                write_checkpoint(db, last_verified, head_hash)
+    return {
+        "ok": broken is None,
+        "rows": verified,
+        "from_log_id": checkpoint_id,
+        "last_log_id": last_verified if last_verified is not None else checkpoint_id,
+        "broken_log_id": broken,
+    }
+
+
+def verify_range(db_path: str, start: int, end: int, prev_hash: str) -> tuple:
+    db: sqlite3.Connection = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        cur: sqlite3.Cursor = db.execute(query_rows, (start, end))
+        verified, _, _, broken = verify_rows(cur, prev_hash)
+    finally:
+        db.close()
+    return verified, broken
+
+
+def verify_full(
+    db_path: str, workers: int | None = None, chunk_rows: int = 500_000
+) -> dict:
+    with sqlite3.connect(db_path) as db:
+        first_id: int | None
+        max_log_id: int | None
+        first_id, max_log_id = db.execute(
+            "SELECT (SELECT MIN(log_id) FROM audit_log), (SELECT MAX(log_id) FROM audit_log)"
+        ).fetchone()
+        checkpoint_id, checkpoint_hash = last_checkpoint(db)
+        if not checkpoint_intact(db, checkpoint_id, checkpoint_hash):
+            return {"ok": False, "rows": 0, "broken_log_id": checkpoint_id}
+        seal_id, seal_hash = last_seal(db)
+        if not checkpoint_intact(db, seal_id, seal_hash):
+            return {"ok": False, "rows": 0, "broken_log_id": seal_id}
+        if first_id is None or max_log_id is None or max_log_id <= seal_id:
+            return {"ok": True, "rows": 0, "broken_log_id": None}
+        starts: list[int] = list(
+            range(max(first_id - 1, seal_id), max_log_id, chunk_rows)
+        )
+        ends: list[int] = [min(start + chunk_rows, max_log_id) for start in starts]
+        prev_hashes: list[str] = []
+        for start in starts:
+            cur: sqlite3.Cursor = db.execute(
+                "SELECT hash FROM audit_log WHERE log_id = (SELECT MAX(log_id) FROM audit_log WHERE log_id <= ?)",
+                (start,),
+            )
+            result: tuple | None = cur.fetchone()
+            prev_hashes.append(genesis_hash if result is None else result[0])
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        results: list[tuple] = list(
+            pool.map(verify_range, [db_path] * len(starts), starts, ends, prev_hashes)
+        )
+    broken_ids: list[int] = [broken for _, broken in results if broken is not None]
+    return {
+        "ok": not broken_ids,
+        "rows": sum(verified for verified, _ in results),
+        "broken_log_id": broken_ids[0] if broken_ids else None,
+    }
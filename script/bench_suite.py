@@ -0,0 +1,209 @@
+import os
+import sys
+import json
+import shutil
+import sqlite3
+import tempfile
+import time
+import platform
+import argparse
+from collections.abc import Callable
+from datetime import datetime, timedelta
+from stats import percentile
+
+target_queries: dict[str, str] = {
+    "open": """
+        SELECT d.doc_num, u.user_name, v.version_id FROM versions v
+        JOIN documents d ON d.doc_id = v.doc
+        JOIN users u ON u.user_id = d.owner_id
+        WHERE v.status = ? ORDER BY v.version_id LIMIT ?
+        """,
+    "released": """
+        SELECT d.doc_num, u.user_name, v.version_id FROM versions v
+        JOIN documents d ON d.doc_id = v.doc
+        JOIN users u ON u.user_id = d.owner_id
+        WHERE v.status = 'RELEASED' AND NOT EXISTS (
+            SELECT 1 FROM versions o WHERE o.doc = v.doc AND o.status IN ('DRAFT', 'IN_REVIEW', 'TRAINING', 'PENDING_RELEASE')
+        )
+        ORDER BY v.version_id LIMIT ?
+        """,
+    "training": """
+        SELECT u.user_name, d.doc_num FROM training_records t
+        JOIN users u ON u.user_id = t.user_id
+        JOIN versions v ON v.version_id = t.version_id
+        JOIN documents d ON d.doc_id = v.doc
+        WHERE t.status = 'ASSIGNED' AND v.status = 'TRAINING' LIMIT ?
+        """,
+}
+
+
+def time_calls(calls: list[Callable[[], object]]) -> dict:
+    samples: list[float] = []
+    for call in calls:
+        start: float = time.perf_counter()
+        call()
+        samples.append(time.perf_counter() - start)
+    return {
+        "runs": len(samples),
+        "median_ms": percentile(samples, 50) * 1000,
+        "p95_ms": percentile(samples, 95) * 1000,
+        "max_ms": max(samples, default=0.0) * 1000,
+    }
+
+
+def bench_scale(
+    db_path: str, documents: int, users: int, repeat: int, trace_dir: str | None = None
+) -> dict:
+    import instrumentation
+    from dataset import generate_dataset, stage_files
+    import document_actions
+    import training_actions
+
+    dataset: dict = generate_dataset(db_path, documents, users)
+    effective_date: str = (datetime.now() + timedelta(days=20)).isoformat()
+    with sqlite3.connect(db_path) as db:
+        drafts: list[tuple] = db.execute(
+            target_queries["open"], ("DRAFT", repeat)
+        ).fetchall()
+        in_review: list[tuple] = db.execute(
+            target_queries["open"], ("IN_REVIEW", 2 * repeat)
+        ).fetchall()
+        released: list[tuple] = db.execute(
+            target_queries["released"], (2 * repeat,)
+        ).fetchall()
+        trainees: list[tuple] = db.execute(
+            target_queries["training"], (repeat,)
+        ).fetchall()
+    stage_files(db_path, [row[2] for row in drafts + in_review + released])
+    approvals: list[tuple] = in_review[::2]
+    rejections: list[tuple] = in_review[1::2]
+    revisions: list[tuple] = released[::2]
+    obsoletes: list[tuple] = released[1::2]
+    workflows: dict[str, list[Callable[[], object]]] = {
+        "create_new_document": [
+            lambda n=n: document_actions.create_new_document(
+                f"Benchmark document {n}", "SOP", "albert.sevilleja", db_path
+            )
+            for n in range(repeat)
+        ],
+        "approve_document": [
+            lambda row=row: document_actions.approve_document(row[1], row[0], db_path)
+            for row in drafts
+        ],
+        "approve_document_qm": [
+            lambda row=row: document_actions.approve_document(
+                "gus.fring", row[0], db_path, effective_date
+            )
+            for row in approvals
+        ],
+        "reject_doc": [
+            lambda row=row: document_actions.reject_doc(
+                "gus.fring", row[0], db_path, comment="Benchmark rejection"
+            )
+            for row in rejections
+        ],
+        "revise_doc": [
+            lambda row=row: document_actions.revise_doc(row[1], row[0], db_path)
+            for row in revisions
+        ],
+        "obsolete_doc": [
+            lambda row=row: document_actions.obsolete_doc("gus.fring", row[0], db_path)
+            for row in obsoletes
+        ],
+        "do_training": [
+            lambda row=row: training_actions.do_training(row[0], row[1], 90, db_path)
+            for row in trainees
+        ],
+        "lazy_check": [
+            lambda: training_actions.lazy_check(db_path) for _ in range(repeat)
+        ],
+        "check_overdue": [
+            lambda: training_actions.check_overdue(db_path) for _ in range(repeat)
+        ],
+    }
+    results: dict = {"dataset": dataset, "workflows": {}}
+    if trace_dir:
+        instrumentation.enable()
+    try:
+        for name, calls in workflows.items():
+            results["workflows"][name] = time_calls(calls)
+    finally:
+        if trace_dir:
+            instrumentation.disable()
+            os.makedirs(trace_dir, exist_ok=True)
+            instrumentation.write_trace(
+                os.path.join(trace_dir, f"trace_{documents}.json")
+            )
+            instrumentation.write_prometheus(
+                os.path.join(trace_dir, f"metrics_{documents}.prom")
+            )
+    return results
+
+
+def run_suite(scales: list[int], repeat: int = 5, trace_dir: str | None = None) -> dict:
+    report: dict = {
+        "created_at": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "scales": {},
+    }
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        storage_root: str = os.path.join(tmp_dir, "storage")
+        os.environ["MEDIQMS_STORAGE_ROOT"] = storage_root
+        for documents in scales:
+            for stage in (
+                os.listdir(storage_root) if os.path.isdir(storage_root) else []
+            ):
+                if stage != "blobs":
+                    shutil.rmtree(os.path.join(storage_root, stage))
+            db_path: str = os.path.join(tmp_dir, f"bench_{documents}.db")
+            report["scales"][str(documents)] = bench_scale(
+                db_path, documents, documents, repeat, trace_dir
+            )
+    return report
+
+
+def compare(
+    report: dict, baseline: dict, tolerance: float = 0.25, min_delta_ms: float = 1.0
+) -> list[str]:
+    regressions: list[str] = []
+    for scale, results in report["scales"].items():
+        previous: dict = baseline.get("scales", {}).get(scale, {}).get("workflows", {})
+        for name, stats in results["workflows"].items():
+            if name not in previous or stats["runs"] == 0:
+                continue
+            before: float = previous[name]["median_ms"]
+            after: float = stats["median_ms"]
+            if after > before * (1 + tolerance) and after - before > min_delta_ms:
+                regressions.append(
+                    f"{name} at {scale} documents: {before:.2f}ms -> {after:.2f}ms"
+                )
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time MediQMS workflows at scale")
+    parser.add_argument("--scales", default="1000,10000,100000")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--trace", help="directory for JSON traces and metrics")
+    args = parser.parse_args()
+    result: dict = run_suite(
+        [int(scale) for scale in args.scales.split(",")], args.repeat, args.trace
+    )
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+    for scale, results in result["scales"].items():
+        print(f"{scale} documents:")
+        for name, stats in results["workflows"].items():
+            print(
+                f"  {name}: n={stats['runs']} median={stats['median_ms']:.2f}ms p95={stats['p95_ms']:.2f}ms"
+            )
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            found: list[str] = compare(result, json.load(f), args.tolerance)
+        for regression in found:
+            print(f"REGRESSION: {regression}")
+        sys.exit(1 if found else 0)
@@ -0,0 +1,730 @@
+import sqlite3
+import tempfile
+import time
+import os
+import sys
+import json
+import statistics
+import subprocess
+import random
+import asyncio
+import tracemalloc
+from copy import deepcopy
+from pathlib import Path
+from datetime import datetime, timedelta
+from training_actions import (
+    assign_training,
+    check_overdue,
+    do_training,
+    do_training_batch,
+)
+from core_actions import (
+    doc_info,
+    version_info,
+    effective_version,
+    released_documents,
+    as_of,
+    get_active_training,
+)
+from read_cache import read_cache
+from session import Session
+from classes import Document_Header, Document_Version, Training
+from dataset import generate_dataset
+from search import search_documents
+from audit_export import export_audit
+from service import QMSService
+from legacy_ingest import ingest_manifest
+from storage_scan import scan_storage
+from compliance import (
+    compliance_summary,
+    compliance_matrix,
+    iter_compliance_matrix,
+    summary_counts,
+)
+
+base_dir: Path = Path(__file__).resolve().parent.parent
+schema_path: str = str(base_dir / "data" / "database" / "schema.sql")
+mock_path: str = str(base_dir / "data" / "database" / "mock_data.sql")
+
+
+def build_training_db(db_path: str, employees: int) -> None:
+    with sqlite3.connect(db_path) as db:
+        with open(schema_path, encoding="utf-8") as f:
+            db.executescript(f.read())
+        with open(mock_path, encoding="utf-8") as md:
+            db.executescript(md.read())
+        first_user: int = 1000
+        db.executemany(
+            "INSERT INTO users (user_id, user_name, full_name, email, active_flag, password_hash) VALUES (?, ?, ?, ?, 1, '')",
+            (
+                (i, f"bench.user{i}", f"Bench User {i}", f"bench.user{i}@meddevice.com")
+                for i in range(first_user, first_user + employees)
+            ),
+        )
+        db.executemany(
+            "INSERT INTO users_roles (user, role) VALUES (?, 5)",
+            ((i,) for i in range(first_user, first_user + employees)),
+        )
+        db.execute(
+            "INSERT INTO documents (doc_id, doc_num, title, owner_id, type) VALUES (1, 'SOP-001', 'Benchmark SOP', 2, 'SOP')"
+        )
+        db.execute(
+            "INSERT INTO versions (version_id, doc, version, status, file_path, effective_date) VALUES (1, 1, '1.0', 'TRAINING', 'SOP-001_V1.0_TRAINING.txt', ?)",
+            ((datetime.now() + timedelta(days=15)).isoformat(),),
+        )
+
+
+def bench_assign_training(sizes: tuple = (10_000, 100_000)) -> list[dict]:
+    results: list[dict] = []
+    for employees in sizes:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            db_path: str = os.path.join(tmp_dir, "bench.db")
+            build_training_db(db_path, employees)
+            due_date: str = (datetime.now() + timedelta(days=15)).isoformat()
+            stats: dict = assign_training("SOP-001", due_date, 7, db_path)
+            stats["employees"] = employees
+            results.append(stats)
+    return results
+
+
+def bench_check_overdue(sizes: tuple = (1_000_000,)) -> list[dict]:
+    results: list[dict] = []
+    for open_records in sizes:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            db_path: str = os.path.join(tmp_dir, "bench.db")
+            build_training_db(db_path, 0)
+            assigned_date: str = datetime.now().isoformat()
+            due_date: str = (datetime.now() + timedelta(days=15)).isoformat()
+            with sqlite3.connect(db_path) as db:
+                db.executemany(
+                    "INSERT INTO training_records (training_id, user_id, version_id, status, assigned_date, due_date) VALUES (?, 3, 1, 'ASSIGNED', ?, ?)",
+                    ((i, assigned_date, due_date) for i in range(1, open_records + 1)),
+                )
+            start: float = time.perf_counter()
+            overdue: int = check_overdue(db_path)
+            elapsed: float = time.perf_counter() - start
+            results.append(
+                {"open_records": open_records, "overdue": overdue, "seconds": elapsed}
+            )
+    return results
+
+
+def bench_read_cache(lookups: int = 10_000) -> dict:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path: str = os.path.join(tmp_dir, "bench.db")
+        build_training_db(db_path, 0)
+        statements: list[str] = []
+        with Session(db_path) as session:
+            session.db.set_trace_callback(statements.append)  # type: ignore
+            start: float = time.perf_counter()
+            for _ in range(lookups):
+                doc_obj: Document_Header = doc_info("SOP-001", db_path, session)
+                version_info(doc_obj.id, db_path, ["status", "TRAINING"], session)
+            elapsed: float = time.perf_counter() - start
+            session.db.set_trace_callback(None)  # type: ignore
+        metrics: dict = read_cache(db_path).metrics()
+    return {
+        "lookups": lookups,
+        "statements": len(statements),
+        "seconds": elapsed,
+        **metrics,
+    }
+
+
+def bench_current_effective(
+    documents: int = 10_000, versions_per_doc: int = 20, lookups: int = 2_000
+) -> dict:
+    legacy_listing: str = """
+    SELECT d.doc_num, d.title, d.type, v.version, v.file_path, v.effective_date
+    FROM documents d
+    JOIN versions v ON v.version_id = (
+        SELECT max(version_id) FROM versions WHERE doc = d.doc_id AND status = 'RELEASED'
+    )
+    ORDER BY d.doc_num
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path: str = os.path.join(tmp_dir, "bench.db")
+        generate_dataset(
+            db_path,
+            documents,
+            100,
+            versions_per_doc=versions_per_doc,
+            trainees_per_version=0,
+        )
+        with sqlite3.connect(db_path) as db:
+            doc_nums: list[str] = [
+                row[0]
+                for row in db.execute(
+                    "SELECT d.doc_num FROM documents d JOIN current_effective c ON c.doc_id = d.doc_id LIMIT ?",
+                    (lookups,),
+                )
+            ]
+            start: float = time.perf_counter()
+            legacy: int = len(db.execute(legacy_listing).fetchall())
+            legacy_seconds: float = time.perf_counter() - start
+        listed: int = len(released_documents(db_path))
+        start = time.perf_counter()
+        released_documents(db_path)
+        listing_seconds: float = time.perf_counter() - start
+        cache = read_cache(db_path)
+        start = time.perf_counter()
+        for doc_num in doc_nums:
+            cache.clear()
+            effective_version(doc_num, db_path)
+        lookup_seconds: float = time.perf_counter() - start
+    return {
+        "documents": documents,
+        "versions_per_doc": versions_per_doc,
+        "released": listed,
+        "legacy_released": legacy,
+        "listing_seconds": listing_seconds,
+        "legacy_listing_seconds": legacy_seconds,
+        "lookup_us": lookup_seconds / max(len(doc_nums), 1) * 1_000_000,
+    }
+
+
+def bench_as_of(
+    documents: int = 10_000, versions_per_doc: int = 20, days: tuple = (0, 180, 720)
+) -> list[dict]:
+    results: list[dict] = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path: str = os.path.join(tmp_dir, "bench.db")
+        generate_dataset(
+            db_path,
+            documents,
+            100,
+            versions_per_doc=versions_per_doc,
+            trainees_per_version=0,
+        )
+        as_of(datetime.now().isoformat(), db_path)
+        for days_ago in days:
+            when: str = (datetime.now() - timedelta(days=days_ago)).isoformat()
+            start: float = time.perf_counter()
+            in_force: list[tuple] = as_of(when, db_path)
+            results.append(
+                {
+                    "days_ago": days_ago,
+                    "documents": len(in_force),
+                    "seconds": time.perf_counter() - start,
+                }
+            )
+    return results
+
+
+async def service_clients(
+    db_path: str,
+    clients: int,
+    doc_nums: list[str],
+    trainees: list[tuple],
+    requests: int,
+    write_share: float,
+) -> dict:
+    rng: random.Random = random.Random(clients)
+    async with QMSService(db_path) as service:
+
+        async def client(work: list[tuple]) -> None:
+            for user, doc_num in work:
+                if user is None:
+                    await service.effective_version(doc_num)
+                else:
+                    await service.train(user, doc_num, 90)
+
+        plans: list[list[tuple]] = [[] for _ in range(clients)]
+        pending: list[tuple] = list(trainees)
+        for n in range(requests):
+            if pending and rng.random() < write_share:
+                plans[n % clients].append(pending.pop())
+            else:
+                plans[n % clients].append((None, rng.choice(doc_nums)))
+        start: float = time.perf_counter()
+        await asyncio.gather(*(client(work) for work in plans))
+        elapsed: float = time.perf_counter() - start
+        metrics: dict = service.metrics()
+    return {
+        "clients": clients,
+        "requests": requests,
+        "seconds": elapsed,
+        "requests_per_sec": requests / elapsed if elapsed > 0 else 0.0,
+        **metrics,
+    }
+
+
+def bench_service(
+    clients: tuple = (1, 8, 32), requests: int = 2_000, write_share: float = 0.2
+) -> list[dict]:
+    results: list[dict] = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path: str = os.path.join(tmp_dir, "bench.db")
+        generate_dataset(db_path, 2_000, 500, trainees_per_version=100)
+        with sqlite3.connect(db_path) as db:
+            doc_nums: list[str] = [
+                row[0]
+                for row in db.execute(
+                    "SELECT d.doc_num FROM documents d JOIN current_effective c ON c.doc_id = d.doc_id"
+                )
+            ]
+            trainees: list[tuple] = db.execute(
+                """
+                SELECT u.user_name, d.doc_num FROM training_records t
+                JOIN users u ON u.user_id = t.user_id
+                JOIN versions v ON v.version_id = t.version_id
+                JOIN documents d ON d.doc_id = v.doc
+                WHERE t.status = 'ASSIGNED' AND v.status = 'TRAINING'
+                """
+            ).fetchall()
+        for count in clients:
+            batch: list[tuple] = trainees[: int(requests * write_share * 2)]
+            trainees = trainees[len(batch) :]
+            results.append(
+                asyncio.run(
+                    service_clients(
+                        db_path, count, doc_nums, batch, requests, write_share
+                    )
+                )
+            )
+    return results
+
+
+def bench_training_import(rows: int = 1_000) -> dict:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        batch_path: str = os.path.join(tmp_dir, "batch.db")
+        single_path: str = os.path.join(tmp_dir, "single.db")
+        generate_dataset(batch_path, 1_000, 2_000, trainees_per_version=500)
+        with sqlite3.connect(batch_path) as db:
+            results: list[tuple] = [
+                (user_name, doc_num, 50 + n % 50)
+                for n, (user_name, doc_num) in enumerate(
+                    db.execute(
+                        """
+                        SELECT u.user_name, d.doc_num FROM training_records t
+                        JOIN users u ON u.user_id = t.user_id
+                        JOIN versions v ON v.version_id = t.version_id
+                        JOIN documents d ON d.doc_id = v.doc
+                        WHERE t.status = 'ASSIGNED' AND v.status = 'TRAINING' LIMIT ?
+                        """,
+                        (rows,),
+                    )
+                )
+            ]
+            db.execute("VACUUM INTO ?", (single_path,))
+        start: float = time.perf_counter()
+        for user_name, doc_num, score in results:
+            do_training(user_name, doc_num, score, single_path)
+        single_seconds: float = time.perf_counter() - start
+        start = time.perf_counter()
+        report: dict = do_training_batch(results, batch_path)
+        batch_seconds: float = time.perf_counter() - start
+    return {
+        "rows": len(results),
+        "errors": len(report["errors"]),
+        "single_seconds": single_seconds,
+        "batch_seconds": batch_seconds,
+    }
+
+
+def legacy_manifest(
+    source_root: Path,
+    name: str,
+    first_doc: int,
+    documents: int,
+    versions_per_doc: int,
+    owner: str,
+    repeat: int = 200,
+) -> Path:
+    manifest_path: Path = source_root / f"{name}.jsonl"
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        for n in range(documents):
+            doc_num: str = f"SOP-{first_doc + n}"
+            for v in range(versions_per_doc):
+                source_file: str = f"{doc_num}_{v}.txt"
+                (source_root / source_file).write_text(
+                    f"{doc_num} legacy revision {v} " * repeat, encoding="utf-8"
+                )
+                released: bool = v == versions_per_doc - 1
+                record: dict = {
+                    "doc_num": doc_num,
+                    "title": f"Legacy procedure {n}",
+                    "type": "SOP",
+                    "owner": owner,
+                    "version": f"{v + 1}.0",
+                    "status": "RELEASED" if released else "SUPERSEDED",
+                    "effective_date": f"{2000 + v}-01-01",
+                    "source_file": source_file,
+                }
+                f.write(json.dumps(record) + "\n")
+    return manifest_path
+
+
+def legacy_base(tmp_dir: str) -> tuple[str, str, Path]:
+    base_path: str = os.path.join(tmp_dir, "base.db")
+    generate_dataset(base_path, 100, 100, trainees_per_version=1)
+    with sqlite3.connect(base_path) as db:
+        owner: str = db.execute("SELECT user_name FROM users LIMIT 1").fetchone()[0]
+    source_root: Path = Path(tmp_dir) / "legacy"
+    source_root.mkdir()
+    return base_path, owner, source_root
+
+
+def bench_legacy_ingest(
+    documents: int = 2_000, versions_per_doc: int = 3, workers: list[int] = [1, 4]
+) -> list[dict]:
+    results: list[dict] = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        base_path, owner, source_root = legacy_base(tmp_dir)
+        for count in workers:
+            db_path: str = os.path.join(tmp_dir, f"ingest_{count}.db")
+            with sqlite3.connect(base_path) as db:
+                db.execute("VACUUM INTO ?", (db_path,))
+            manifest_path: Path = legacy_manifest(
+                source_root,
+                f"manifest_{count}",
+                900_000 + count * documents,
+                documents,
+                versions_per_doc,
+                owner,
+            )
+            report: dict = ingest_manifest(str(manifest_path), db_path, workers=count)
+            results.append(
+                {
+                    "workers": count,
+                    "imported": report["imported"],
+                    "errors": len(report["errors"]),
+                    "seconds": report["seconds"],
+                    "rows_per_sec": report["rows_per_sec"],
+                    "mb_per_sec": report["mb_per_sec"],
+                }
+            )
+    return results
+
+
+def bench_storage_scan(documents: int = 2_000, versions_per_doc: int = 3) -> list[dict]:
+    results: list[dict] = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path, owner, source_root = legacy_base(tmp_dir)
+        manifest_path: Path = legacy_manifest(
+            source_root, "scan", 800_000, documents, versions_per_doc, owner, 2_000
+        )
+        ingest_manifest(str(manifest_path), db_path)
+        for mode, processes, full in [
+            ("threads", False, True),
+            ("processes", True, True),
+            ("incremental", False, False),
+        ]:
+            report: dict = scan_storage(db_path, processes=processes, full=full)
+            results.append(
+                {
+                    "mode": mode,
+                    "versions": report["versions"],
+                    "hashed": report["hashed"],
+                    "cached": report["cached"],
+                    "modified": len(report["modified"]),
+                    "seconds": report["seconds"],
+                    "mb_per_sec": report["mb_per_sec"],
+                }
+            )
+    return results
+
+
+def bench_search(documents: int = 100_000, rounds: int = 20) -> list[dict]:
+    queries: list[tuple[str, list[str] | None]] = [
+        ("cleaning validation", None),
+        ("cleaning validation", ["RELEASED"]),
+        ("risk", ["RELEASED"]),
+        ("calib insp", ["DRAFT", "IN_REVIEW"]),
+        ("supplier audit complaint", None),
+    ]
+    results: list[dict] = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path: str = os.path.join(tmp_dir, "bench.db")
+        generate_dataset(db_path, documents, 1_000, trainees_per_version=0)
+        for query, statuses in queries:
+            samples: list[float] = []
+            for _ in range(rounds):
+                start: float = time.perf_counter()
+                hits: list[dict] = search_documents(query, db_path, statuses)
+                samples.append(time.perf_counter() - start)
+            samples.sort()
+            results.append(
+                {
+                    "query": query,
+                    "statuses": statuses,
+                    "hits": len(hits),
+                    "p50_ms": samples[len(samples) // 2] * 1000,
+                    "max_ms": samples[-1] * 1000,
+                }
+            )
+    return results
+
+
+def bench_training_sweep(
+    documents: int = 2_000, trainees_per_version: int = 500
+) -> list[dict]:
+    results: list[dict] = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path: str = os.path.join(tmp_dir, "bench.db")
+        generate_dataset(
+            db_path, documents, 5_000, trainees_per_version=trainees_per_version
+        )
+        now: datetime = datetime.now() + timedelta(days=10)
+
+        def sweep_objects() -> int:
+            with sqlite3.connect(db_path) as db:
+                trainings: list[Training] = [
+                    Training(*row)
+                    for row in db.execute(
+                        "SELECT training_id, user_id, version_id, status, assigned_date, due_date, completion_date, score FROM training_records WHERE status IN ('FAILED', 'ASSIGNED')"
+                    )
+                ]
+            return sum(1 for training in trainings if training.due_date < now)
+
+        def sweep_batch() -> int:
+            return len(get_active_training(db_path).due_before(now))
+
+        for name, sweep in [("objects", sweep_objects), ("batch", sweep_batch)]:
+            start: float = time.perf_counter()
+            due: int = sweep()
+            elapsed: float = time.perf_counter() - start
+            tracemalloc.start()
+            sweep()
+            peak: int = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            results.append(
+                {
+                    "mode": name,
+                    "due": due,
+                    "seconds": elapsed,
+                    "peak_mb": peak / 1_000_000,
+                }
+            )
+    return results
+
+
+def bench_change_set(rounds: int = 50_000) -> list[dict]:
+    timestamp: str = datetime.now().isoformat()
+    version: Document_Version = Document_Version(
+        1, 1, "0.2", "IN_REVIEW", "/storage/01_drafts/SOP-001_V0.2_DRAFT.docx", None
+    )
+    training: Training = Training(1, 1000, 1, "ASSIGNED", timestamp, timestamp)
+    approval: dict = {
+        "status": "TRAINING",
+        "file_path": "/storage/02_pending_approval/SOP-001_V0.2_TRAINING.docx",
+        "effective_date": timestamp,
+        "version": "1.0",
+    }
+    result: dict = {
+        "status": "COMPLETED",
+        "completion_date": datetime.now(),
+        "score": 90,
+    }
+
+    def diff_path(record, fields: dict, table: str, key: str) -> None:
+        new_record = deepcopy(record)
+        for name, value in fields.items():
+            setattr(new_record, name, value)
+        old_dict: dict = dict(record)
+        new_dict: dict = dict(new_record)
+        changed_keys: list = [k for k, v in new_dict.items() if v != old_dict.get(k)]
+        old_val: dict = {k: old_dict.get(k) for k in changed_keys}
+        new_val: dict = {k: new_dict.get(k) for k in changed_keys}
+        json.dumps(old_val)
+        json.dumps(new_val)
+        ", ".join(f"{k} = ?" for k in new_val)
+        (*new_val.values(), new_record.id)
+
+    def change_set_path(record, fields: dict, table: str, key: str) -> None:
+        _, changes = record.evolve(**fields)
+        json.dumps(changes.old)
+        json.dumps(changes.new)
+        changes.update_statement()
+
+    results: list[dict] = []
+    for name, record, fields in [
+        ("version", version, approval),
+        ("training", training, result),
+    ]:
+        timings: dict[str, float] = {}
+        for mode, path in [("diff", diff_path), ("change_set", change_set_path)]:
+            start: float = time.perf_counter()
+            for _ in range(rounds):
+                path(record, fields, record.table, record.key)
+            timings[mode] = (time.perf_counter() - start) / rounds * 1_000_000
+        results.append(
+            {
+                "record": name,
+                "diff_us": timings["diff"],
+                "change_set_us": timings["change_set"],
+            }
+        )
+    return results
+
+
+def bench_audit_export(rows: int = 1_000_000) -> list[dict]:
+    results: list[dict] = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path: str = os.path.join(tmp_dir, "bench.db")
+        build_training_db(db_path, 0)
+        timestamp: str = datetime.now().isoformat()
+        with sqlite3.connect(db_path) as db:
+            db.executemany(
+                "INSERT INTO audit_log (table_affected, record_id, user, action, old_val, new_val, timestamp, hash) VALUES ('training_records', ?, 7, 'ASSING', '{}', '{}', ?, '')",
+                ((i, timestamp) for i in range(rows)),
+            )
+        for export_format in ("jsonl", "csv"):
+            out_path: str = os.path.join(tmp_dir, f"audit.{export_format}")
+            start: float = time.perf_counter()
+            exported: int = export_audit(db_path, out_path, export_format)
+            elapsed: float = time.perf_counter() - start
+            tracemalloc.start()
+            export_audit(db_path, out_path, export_format)
+            peak: int = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            results.append(
+                {
+                    "format": export_format,
+                    "rows": exported,
+                    "seconds": elapsed,
+                    "peak_mb": peak / 1_000_000,
+                }
+            )
+    return results
+
+
+def bench_compliance(
+    documents: int = 9_000,
+    users: int = 10_000,
+    trainees_per_version: int = 500,
+    rounds: int = 5,
+) -> dict:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path: str = os.path.join(tmp_dir, "bench.db")
+        generate_dataset(
+            db_path, documents, users, trainees_per_version=trainees_per_version
+        )
+        timings: dict[str, float] = {"summary_seconds": 0.0, "rescan_seconds": 0.0}
+        for _ in range(rounds):
+            start: float = time.perf_counter()
+            summary: list[dict] = compliance_summary(db_path)
+            timings["summary_seconds"] += (time.perf_counter() - start) / rounds
+            start = time.perf_counter()
+            with sqlite3.connect(db_path) as db:
+                db.execute(summary_counts).fetchall()
+            timings["rescan_seconds"] += (time.perf_counter() - start) / rounds
+        start = time.perf_counter()
+        page: dict = compliance_matrix(db_path)
+        timings["page_seconds"] = time.perf_counter() - start
+        start = time.perf_counter()
+        rows: int = sum(1 for _ in iter_compliance_matrix(db_path))
+        timings["matrix_seconds"] = time.perf_counter() - start
+        with sqlite3.connect(db_path) as db:
+            records: int = db.execute(
+                "SELECT count(*) FROM training_records"
+            ).fetchone()[0]
+    return {
+        "users": rows,
+        "columns": len(page["columns"]),
+        "records": records,
+        "summary_rows": len(summary),
+        **timings,
+    }
+
+
+def bench_cli_startup(rounds: int = 20) -> list[dict]:
+    main_path: str = str(Path(__file__).resolve().parent / "main.py")
+    results: list[dict] = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path: str = os.path.join(tmp_dir, "bench.db")
+        build_training_db(db_path, 0)
+        env: dict[str, str] = {
+            key: value
+            for key, value in os.environ.items()
+            if key != "PYTHONDONTWRITEBYTECODE"
+        }
+        env["MEDIQMS_STORAGE_ROOT"] = os.path.join(tmp_dir, "storage")
+        for name, argv in [
+            ("python", ["-c", "pass"]),
+            ("help", [main_path, "--help"]),
+            ("report", [main_path, "--db", db_path, "report"]),
+            ("sweep", [main_path, "--db", db_path, "sweep"]),
+            (
+                "revise",
+                [main_path, "--db", db_path, "revise", "SOP-999", "--user", "admin"],
+            ),
+        ]:
+            subprocess.run([sys.executable, *argv], capture_output=True, env=env)
+            timings: list[float] = []
+            for _ in range(rounds):
+                start: float = time.perf_counter()
+                subprocess.run([sys.executable, *argv], capture_output=True, env=env)
+                timings.append((time.perf_counter() - start) * 1000)
+            results.append(
+                {
+                    "command": name,
+                    "median_ms": statistics.median(timings),
+                    "max_ms": max(timings),
+                }
+            )
+    return results
+
+
+if __name__ == "__main__":
+    for result in bench_assign_training():
+        print(
+            f"assign_training employees={result['employees']}: {result['rows']} rows in {result['seconds']:.3f}s ({result['rows_per_sec']:.0f} rows/sec)"
+        )
+    for result in bench_check_overdue():
+        print(
+            f"check_overdue open_records={result['open_records']}: {result['overdue']} overdue in {result['seconds']:.3f}s"
+        )
+    result: dict = bench_read_cache()
+    print(
+        f"read cache lookups={result['lookups']}: {result['statements']} statements, {result['hits']} hits, {result['misses']} misses in {result['seconds']:.3f}s"
+    )
+    result = bench_current_effective()
+    print(
+        f"current_effective documents={result['documents']} versions_per_doc={result['versions_per_doc']}: {result['released']} released listed in {result['listing_seconds'] * 1000:.1f}ms (legacy {result['legacy_listing_seconds'] * 1000:.1f}ms), point lookup {result['lookup_us']:.0f}us"
+    )
+    for result in bench_as_of():
+        print(
+            f"as_of {result['days_ago']} days ago: {result['documents']} documents in force, {result['seconds'] * 1000:.1f}ms"
+        )
+    for result in bench_service():
+        print(
+            f"service clients={result['clients']}: {result['requests_per_sec']:.0f} requests/sec, write wait p99 {result['writes']['wait_p99_ms']:.1f}ms, max queue {result['writes']['max_depth']}, read p99 {result['reads']['latency_p99_ms']:.1f}ms"
+        )
+    result = bench_training_import()
+    print(
+        f"training import rows={result['rows']}: batch {result['batch_seconds']:.3f}s vs do_training {result['single_seconds']:.3f}s, {result['errors']} errors"
+    )
+    for result in bench_legacy_ingest():
+        print(
+            f"legacy ingest workers={result['workers']}: {result['imported']} versions in {result['seconds']:.2f}s ({result['rows_per_sec']:.0f} versions/sec, {result['mb_per_sec']:.1f}MB/s), {result['errors']} errors"
+        )
+    for result in bench_storage_scan():
+        print(
+            f"storage scan {result['mode']}: {result['versions']} versions, {result['hashed']} hashed, {result['cached']} cached in {result['seconds']:.2f}s ({result['mb_per_sec']:.1f}MB/s), {result['modified']} modified"
+        )
+    for result in bench_search():
+        print(
+            f"search '{result['query']}' statuses={result['statuses']}: {result['hits']} hits, p50 {result['p50_ms']:.1f}ms, max {result['max_ms']:.1f}ms"
+        )
+
+    for result in bench_training_sweep():
+        print(
+            f"training sweep {result['mode']}: {result['due']} due in {result['seconds']:.3f}s, peak {result['peak_mb']:.1f}MB"
+        )
+    for result in bench_change_set():
+        print(
+            f"change set {result['record']}: {result['change_set_us']:.1f}us vs deepcopy diff {result['diff_us']:.1f}us"
+        )
+    for result in bench_audit_export():
+        print(
+            f"export_audit {result['format']}: {result['rows']} rows in {result['seconds']:.2f}s, peak {result['peak_mb']:.1f}MB"
+        )
+    result = bench_compliance()
+    print(
+        f"compliance users={result['users']} columns={result['columns']} records={result['records']}: summary {result['summary_seconds'] * 1000:.1f}ms vs rescan {result['rescan_seconds'] * 1000:.1f}ms, page {result['page_seconds'] * 1000:.1f}ms, full matrix {result['matrix_seconds']:.2f}s"
+    )
+    for result in bench_cli_startup():
+        print(
+            f"cli startup {result['command']}: median {result['median_ms']:.1f}ms, max {result['max_ms']:.1f}ms"
+        )
@@ -0,0 +1,115 @@
+import os
+import mmap
+import hashlib
+import shutil
+import stat
+from pathlib import Path
+from config import storage_root_path
+
+blob_root: Path = Path(storage_root_path) / "blobs"
+stage_folders: dict[str, str] = {
+    "DRAFT": "01_drafts",
+    "IN_REVIEW": "01_drafts",
+    "TRAINING": "02_pending_approval",
+    "PENDING_RELEASE": "02_pending_approval",
+    "RELEASED": "03_released",
+    "SUPERSEDED": "04_archive",
+    "OBSOLETE": "04_archive",
+    "REJECTED": "04_archive",
+}
+mutable_stages: set[str] = {"DRAFT"}
+mmap_threshold: int = 4 * 1024 * 1024
+
+
+def blob_path(digest: str) -> Path:
+    return blob_root / digest[:2] / digest
+
+
+def file_digest(file_path: str | Path) -> str:
+    with open(file_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size < mmap_threshold:
+            return hashlib.file_digest(f, "sha256").hexdigest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return hashlib.sha256(mapped).hexdigest()
+
+
+def view_digest(view: str | Path) -> str:
+    view = Path(view)
+    if view.is_symlink():
+        target: Path = (view.parent / os.readlink(view)).resolve()
+        if target.parent.parent == blob_root.resolve():
+            return target.name
+    return file_digest(view)
+
+
+def store_blob(source: str | Path, digest: str) -> None:
+    destination: Path = blob_path(digest)
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path: Path = destination.with_name(f"{digest}.{os.getpid()}.tmp")
+    shutil.copyfile(source, tmp_path)
+    os.chmod(tmp_path, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+    os.replace(tmp_path, destination)
+
+
+def put_file(source: str | Path) -> str:
+    digest: str = view_digest(source)
+    if not blob_path(digest).exists():
+        store_blob(source, digest)
+    return digest
+
+
+def link_view(digest: str, view: str | Path) -> None:
+    view = Path(view)
+    view.parent.mkdir(parents=True, exist_ok=True)
+    source: Path = blob_path(digest)
+    tmp_view: Path = view.with_name(f".{view.name}.link")
+    if tmp_view.is_symlink() or tmp_view.exists():
+        tmp_view.unlink()
+    try:
+        os.symlink(os.path.relpath(source, view.parent), tmp_view)
+    except OSError:
+        os.link(source, tmp_view)
+    os.replace(tmp_view, view)
+
+
+def write_copy(digest: str, view: str | Path) -> None:
+    view = Path(view)
+    view.parent.mkdir(parents=True, exist_ok=True)
+    tmp_view: Path = view.with_name(f".{view.name}.copy")
+    shutil.copyfile(blob_path(digest), tmp_view)
+    os.replace(tmp_view, view)
+
+
+def place_view(
+    digest: str, view: str | Path, status: str, old_view: str | Path | None = None
+) -> None:
+    if status in mutable_stages:
+        write_copy(digest, view)
+    else:
+        link_view(digest, view)
+    if old_view is not None and Path(old_view) != Path(view):
+        Path(old_view).unlink(missing_ok=True)
+
+
+def copy_view(source: str | Path, view: str | Path) -> str:
+    digest: str = put_file(source)
+    link_view(digest, view)
+    return digest
+
+
+def move_view(old_view: str | Path, new_view: str | Path) -> str:
+    digest: str = put_file(old_view)
+    link_view(digest, new_view)
+    if Path(old_view) != Path(new_view):
+        os.unlink(old_view)
+    return digest
+
+
+def view_path(doc_num: str, version: str, status: str, extension: str) -> str:
+    if status == "RELEASED":
+        file_name: str = f"{doc_num}_V{version}{extension}"
+    elif status == "IN_REVIEW":
+        file_name = f"{doc_num}_V{version}_DRAFT{extension}"
+    else:
+        file_name = f"{doc_num}_V{version}_{status}{extension}"
+    return str(Path(storage_root_path) / stage_folders[status] / file_name)
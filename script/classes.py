@@ -1,18 +1,117 @@
-from dataclasses import dataclass
-from datetime import datetime
+import calendar
+from array import array
+from collections.abc import Iterable
+from datetime import datetime, timedelta
 import re
 from config import document_types, status_types, training_types
 
+training_statuses: list[str] = ["ASSIGNED", "FAILED", "COMPLETED", "OVERDUE"]
+training_status_codes: dict[str, int] = {
+    status: code for code, status in enumerate(training_statuses)
+}
+epoch_start: datetime = datetime(1970, 1, 1)
 
-@dataclass
-class Document_Header:
-    id: int
-    number: str
-    title: str
-    owner: int
-    type: str
 
-    def __post_init__(self) -> None:
+class ChangeSet:
+    __slots__ = ("table", "key", "record_id", "old", "new")
+
+    def __init__(self, table: str, key: str, record_id: int | None = None) -> None:
+        self.table: str = table
+        self.key: str = key
+        self.record_id: int | None = record_id
+        self.old: dict = {}
+        self.new: dict = {}
+
+    def __bool__(self) -> bool:
+        return bool(self.new)
+
+    def record(self, column: str, old_value, new_value) -> None:
+        if isinstance(old_value, datetime):
+            old_value = old_value.isoformat()
+        if isinstance(new_value, datetime):
+            new_value = new_value.isoformat()
+        if column in self.old:
+            old_value = self.old[column]
+        if new_value == old_value:
+            self.old.pop(column, None)
+            self.new.pop(column, None)
+            return
+        self.old[column] = old_value
+        self.new[column] = new_value
+
+    def update_statement(self) -> tuple[str, tuple]:
+        if not self.new:
+            raise ValueError(f"Change set has no changes: '{self.table}'")
+        fields: str = ", ".join(f"{column} = ?" for column in self.new)
+        return (
+            f"UPDATE {self.table} SET {fields} WHERE {self.key} = ?",
+            (*self.new.values(), self.record_id),
+        )
+
+
+class Record:
+    __slots__ = ()
+    table: str
+    key: str
+    columns: dict[str, str]
+
+    def __copy__(self):
+        clone = object.__new__(type(self))
+        for name in type(self).__slots__:
+            object.__setattr__(clone, name, getattr(self, name))
+        return clone
+
+    def __deepcopy__(self, memo: dict):
+        return self.__copy__()
+
+    def __eq__(self, other) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(
+            getattr(self, name) == getattr(other, name) for name in type(self).__slots__
+        )
+
+    def __repr__(self) -> str:
+        fields: str = ", ".join(
+            f"{name.lstrip('_')}={getattr(self, name)!r}"
+            for name in type(self).__slots__
+        )
+        return f"{type(self).__name__}({fields})"
+
+    def evolve(self, **fields) -> tuple:
+        unknown: set[str] = fields.keys() - self.columns.keys()
+        if unknown:
+            raise ValueError(
+                f"Unknown {self.table} fields: '{', '.join(sorted(unknown))}'"
+            )
+        new = self.__copy__()
+        changes: ChangeSet = ChangeSet(self.table, self.key)
+        for name, column in self.columns.items():
+            if name in fields:
+                changes.record(column, getattr(self, name), fields[name])
+                setattr(new, name, fields[name])
+        changes.record_id = new.id
+        return new, changes
+
+
+class Document_Header(Record):
+    table: str = "documents"
+    key: str = "doc_id"
+    columns: dict[str, str] = {
+        "id": "doc_id",
+        "number": "doc_num",
+        "title": "title",
+        "owner": "owner_id",
+        "type": "type",
+    }
+    __slots__ = ("id", "number", "title", "owner", "type")
+
+    def __init__(self, id: int, number: str, title: str, owner: int, type: str) -> None:
+        self.id: int = id
+        self.number: str = number
+        self.title: str = title
+        self.owner: int = owner
+        self.type: str = type
         check_1: str | None = self._checks()
         if check_1 is not None:
             raise (ValueError(check_1))
@@ -22,7 +121,7 @@ class Document_Header:
             return "Title cannot be empty"
         elif self.type not in document_types.values():
             return f"Invalid document type: '{self.type}'"
-        elif not re.fullmatch(r"^[a-zA-Z]{2,4}-\d{3}$", self.number):
+        elif not re.fullmatch(r"^[a-zA-Z]{2,4}-\d{3,}$", self.number):
             return f"Invalid document number format: '{self.number}'"
         elif self.type != self.number.split("-")[0]:
             return f"Mismatch: Type is '{self.type}' but Number starts with '{self.number.split('-')[0]}'"
@@ -40,16 +139,34 @@ class Document_Header:
         return (self.id, self.number, self.title, self.owner, self.type)
 
 
-@dataclass
-class Document_Version:
-    id: int
-    doc: int
-    version: str
-    status: str
-    file_path: str
-    effective_date: str | None
+class Document_Version(Record):
+    table: str = "versions"
+    key: str = "version_id"
+    columns: dict[str, str] = {
+        "id": "version_id",
+        "doc": "doc",
+        "version": "version",
+        "status": "status",
+        "file_path": "file_path",
+        "effective_date": "effective_date",
+    }
+    __slots__ = ("id", "doc", "version", "status", "file_path", "effective_date")
 
-    def __post_init__(self) -> None:
+    def __init__(
+        self,
+        id: int,
+        doc: int,
+        version: str,
+        status: str,
+        file_path: str,
+        effective_date: str | None,
+    ) -> None:
+        self.id: int = id
+        self.doc: int = doc
+        self.version: str = version
+        self.status: str = status
+        self.file_path: str = file_path
+        self.effective_date: str | None = effective_date
         basic_check: str | None = self._basic_checks()
         if basic_check is not None:
             raise (ValueError(basic_check))
@@ -85,32 +202,80 @@ class Document_Version:
         )
 
 
-class Training:
+class Training(Record):
+    table: str = "training_records"
+    key: str = "training_id"
+    columns: dict[str, str] = {
+        "id": "training_id",
+        "user_id": "user_id",
+        "version_id": "version_id",
+        "status": "status",
+        "assigned_date": "assigned_date",
+        "due_date": "due_date",
+        "completion_date": "completion_date",
+        "score": "score",
+    }
+    __slots__ = (
+        "id",
+        "user_id",
+        "version_id",
+        "status",
+        "_assigned_date",
+        "_due_date",
+        "_completion_date",
+        "score",
+    )
+
     def __init__(
         self,
         training_id: int,
         user_id: int,
         version_id: int,
         status: str,
-        assigned_date: str,
-        due_date: str,
-        completion_date: str | None = None,
+        assigned_date: str | datetime,
+        due_date: str | datetime,
+        completion_date: str | datetime | None = None,
         score: int | None = None,
     ) -> None:
         self.id: int = training_id
         self.user_id: int = user_id
         self.version_id: int = version_id
         self.status: str = status
-        self.assigned_date: datetime = datetime.fromisoformat(assigned_date)
-        self.due_date: datetime = datetime.fromisoformat(due_date)
-        if completion_date:
-            self.completion_date: datetime | None = datetime.fromisoformat(
-                completion_date
-            )
-        else:
-            self.completion_date = None
+        self._assigned_date: str | datetime = assigned_date
+        self._due_date: str | datetime = due_date
+        self._completion_date: str | datetime | None = completion_date or None
         self.score: int | None = score
 
+    @property
+    def assigned_date(self) -> datetime:
+        if isinstance(self._assigned_date, str):
+            self._assigned_date = datetime.fromisoformat(self._assigned_date)
+        return self._assigned_date
+
+    @assigned_date.setter
+    def assigned_date(self, value: str | datetime) -> None:
+        self._assigned_date = value
+
+    @property
+    def due_date(self) -> datetime:
+        if isinstance(self._due_date, str):
+            self._due_date = datetime.fromisoformat(self._due_date)
+        return self._due_date
+
+    @due_date.setter
+    def due_date(self, value: str | datetime) -> None:
+        self._due_date = value
+
+    @property
+    def completion_date(self) -> datetime | None:
+        if isinstance(self._completion_date, str):
+            self._completion_date = datetime.fromisoformat(self._completion_date)
+        return self._completion_date
+
+    @completion_date.setter
+    def completion_date(self, value: str | datetime | None) -> None:
+        self._completion_date = value or None
+
     def _checks(self) -> None | str:
         if self.status not in training_types:
             return "Status not valid or empty"
@@ -142,3 +307,79 @@ class Training:
             completion_str,
             self.score,
         )
+
+
+def epoch_seconds(value: str | datetime) -> int:
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return calendar.timegm(value.timetuple())
+
+
+class TrainingBatch:
+    __slots__ = (
+        "ids",
+        "user_ids",
+        "version_ids",
+        "statuses",
+        "assigned",
+        "due",
+        "scores",
+    )
+
+    def __init__(self) -> None:
+        self.ids: array = array("q")
+        self.user_ids: array = array("q")
+        self.version_ids: array = array("q")
+        self.statuses: array = array("b")
+        self.assigned: array = array("q")
+        self.due: array = array("q")
+        self.scores: array = array("h")
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def extend(self, rows: Iterable[tuple]) -> None:
+        columns: list[tuple] = list(zip(*rows))
+        if not columns:
+            return
+        ids, user_ids, version_ids, statuses, assigned, due, scores = columns
+        unknown: set[str] = set(statuses) - training_status_codes.keys()
+        if unknown:
+            raise ValueError(f"Invalid training status: '{', '.join(sorted(unknown))}'")
+        self.ids.extend(ids)
+        self.user_ids.extend(user_ids)
+        self.version_ids.extend(version_ids)
+        self.statuses.extend(map(training_status_codes.__getitem__, statuses))
+        self.assigned.extend(assigned)
+        self.due.extend(due)
+        self.scores.extend(-1 if score is None else score for score in scores)
+
+    def training(self, n: int) -> Training:
+        return Training(
+            self.ids[n],
+            self.user_ids[n],
+            self.version_ids[n],
+            training_statuses[self.statuses[n]],
+            epoch_start + timedelta(seconds=self.assigned[n]),
+            epoch_start + timedelta(seconds=self.due[n]),
+            None,
+            None if self.scores[n] < 0 else self.scores[n],
+        )
+
+    def status_counts(self) -> dict[str, int]:
+        counts: list[int] = [0] * len(training_statuses)
+        for code in self.statuses:
+            counts[code] += 1
+        return {status: counts[code] for code, status in enumerate(training_statuses)}
+
+    def due_before(self, when: str | datetime) -> list[int]:
+        limit: int = epoch_seconds(when)
+        return [
+            training_id for training_id, due in zip(self.ids, self.due) if due < limit
+        ]
+
+    def nbytes(self) -> int:
+        return sum(
+            len(column) * column.itemsize
+            for column in (getattr(self, name) for name in TrainingBatch.__slots__)
+        )
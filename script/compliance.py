@@ -0,0 +1,170 @@
+import sqlite3
+import argparse
+from collections.abc import Iterator
+from config import training_docs
+from session import Session, connect
+
+training_version_statuses: list[str] = ["TRAINING", "RELEASED"]
+summary_counts: str = """
+    SELECT version_id,
+        sum(status = 'ASSIGNED'),
+        sum(status = 'FAILED'),
+        sum(status = 'COMPLETED'),
+        sum(status = 'OVERDUE')
+    FROM training_records GROUP BY version_id
+    """
+
+
+def rebuild_training_summary(db_path: str, session: Session | None = None) -> int:
+    with connect(db_path, session) as db:
+        db.execute("DELETE FROM training_summary")
+        cur: sqlite3.Cursor = db.execute(
+            f"INSERT INTO training_summary (version_id, assigned, failed, completed, overdue) {summary_counts}"
+        )
+        return cur.rowcount
+
+
+def summary_drift(db_path: str, session: Session | None = None) -> list[tuple]:
+    with connect(db_path, session) as db:
+        cur: sqlite3.Cursor = db.execute(
+            f"""
+            SELECT * FROM (
+                SELECT version_id, assigned, failed, completed, overdue FROM training_summary
+                WHERE assigned + failed + completed + overdue > 0
+                EXCEPT {summary_counts}
+            )
+            UNION ALL
+            SELECT * FROM ({summary_counts} EXCEPT SELECT version_id, assigned, failed, completed, overdue FROM training_summary)
+            """
+        )
+        return cur.fetchall()
+
+
+def matrix_columns(db_path: str, session: Session | None = None) -> list[tuple]:
+    query: str = f"""
+    SELECT v.version_id, d.doc_num, d.title, v.version, v.status
+    FROM versions v
+    JOIN documents d ON d.doc_id = v.doc
+    WHERE v.status IN ({', '.join('?' * len(training_version_statuses))})
+    AND d.type IN ({', '.join('?' * len(training_docs))})
+    ORDER BY d.doc_num, v.version_id
+    """
+    with connect(db_path, session) as db:
+        cur: sqlite3.Cursor = db.execute(
+            query, (*training_version_statuses, *training_docs)
+        )
+        return cur.fetchall()
+
+
+def compliance_summary(db_path: str, session: Session | None = None) -> list[dict]:
+    query: str = f"""
+    SELECT d.doc_num, d.title, v.version, v.status, s.assigned, s.failed, s.completed, s.overdue
+    FROM versions v
+    JOIN documents d ON d.doc_id = v.doc
+    JOIN training_summary s ON s.version_id = v.version_id
+    WHERE v.status IN ({', '.join('?' * len(training_version_statuses))})
+    AND d.type IN ({', '.join('?' * len(training_docs))})
+    ORDER BY d.doc_num, v.version_id
+    """
+    with connect(db_path, session) as db:
+        cur: sqlite3.Cursor = db.execute(
+            query, (*training_version_statuses, *training_docs)
+        )
+        rows: list[tuple] = cur.fetchall()
+    summary: list[dict] = []
+    for doc_num, title, version, status, assigned, failed, completed, overdue in rows:
+        total: int = assigned + failed + completed + overdue
+        summary.append(
+            {
+                "doc_num": doc_num,
+                "title": title,
+                "version": version,
+                "status": status,
+                "assigned": assigned,
+                "failed": failed,
+                "completed": completed,
+                "overdue": overdue,
+                "total": total,
+                "completion_rate": completed / total if total else 0.0,
+            }
+        )
+    return summary
+
+
+def compliance_matrix(
+    db_path: str,
+    after_user: int = 0,
+    limit: int = 500,
+    session: Session | None = None,
+    columns: list[tuple] | None = None,
+) -> dict:
+    if columns is None:
+        columns = matrix_columns(db_path, session)
+    with connect(db_path, session) as db:
+        users: list[tuple] = db.execute(
+            """
+            SELECT u.user_id, u.user_name
+            FROM users u
+            JOIN users_roles ur ON ur.user = u.user_id
+            JOIN roles r ON r.role_id = ur.role
+            WHERE r.role_name = 'General Employee' AND u.active_flag = 1 AND u.user_id > ?
+            ORDER BY u.user_id LIMIT ?
+            """,
+            (after_user, limit),
+        ).fetchall()
+        records: list[tuple] = []
+        if users:
+            records = db.execute(
+                "SELECT user_id, version_id, status FROM training_records WHERE user_id >= ? AND user_id <= ?",
+                (users[0][0], users[-1][0]),
+            ).fetchall()
+    position: dict[int, int] = {column[0]: n for n, column in enumerate(columns)}
+    cells: dict[int, list[str | None]] = {
+        user_id: [None] * len(columns) for user_id, _ in users
+    }
+    for user_id, version_id, status in records:
+        n: int | None = position.get(version_id)
+        row: list[str | None] | None = cells.get(user_id)
+        if n is not None and row is not None:
+            row[n] = status
+    return {
+        "columns": [
+            {"doc_num": doc_num, "title": title, "version": version, "status": status}
+            for _, doc_num, title, version, status in columns
+        ],
+        "rows": [
+            {"user_id": user_id, "user_name": user_name, "statuses": cells[user_id]}
+            for user_id, user_name in users
+        ],
+        "next_user": users[-1][0] if len(users) == limit else None,
+    }
+
+
+def iter_compliance_matrix(db_path: str, page_users: int = 500) -> Iterator[dict]:
+    columns: list[tuple] = matrix_columns(db_path)
+    after_user: int | None = 0
+    while after_user is not None:
+        page: dict = compliance_matrix(db_path, after_user, page_users, None, columns)
+        yield from page["rows"]
+        after_user = page["next_user"]
+
+
+def print_summary(db_path: str, rebuild: bool = False) -> None:
+    if rebuild:
+        print(f"Rebuilt {rebuild_training_summary(db_path)} summary rows")
+    for entry in compliance_summary(db_path):
+        print(
+            f"{entry['doc_num']} v{entry['version']} {entry['status']}: "
+            f"{entry['completed']}/{entry['total']} completed, "
+            f"{entry['assigned']} assigned, {entry['failed']} failed, {entry['overdue']} overdue"
+        )
+
+
+if __name__ == "__main__":
+    from config import db_path
+
+    parser = argparse.ArgumentParser(description="Training compliance summary")
+    parser.add_argument("--db", default=db_path)
+    parser.add_argument("--rebuild", action="store_true")
+    args = parser.parse_args()
+    print_summary(args.db, args.rebuild)
@@ -3,10 +3,19 @@ import os
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
-storage_root_path: str = str(BASE_DIR / "storage")
+storage_root_path: str = os.environ.get(
+    "MEDIQMS_STORAGE_ROOT", str(BASE_DIR / "storage")
+)
 db_path: str = str(BASE_DIR / "data" / "database" / "mediqms.db")
 os.makedirs(os.path.dirname(db_path), exist_ok=True)
 os.makedirs(storage_root_path, exist_ok=True)
+busy_timeout_ms: int = int(os.environ.get("MEDIQMS_BUSY_TIMEOUT_MS", "5000"))
+journal_mode: str = os.environ.get("MEDIQMS_JOURNAL_MODE", "WAL")
+write_retries: int = int(os.environ.get("MEDIQMS_WRITE_RETRIES", "5"))
+retry_backoff: float = float(os.environ.get("MEDIQMS_RETRY_BACKOFF", "0.05"))
+audit_checkpoint_key: bytes = os.environ.get(
+    "MEDIQMS_AUDIT_KEY", "mediqms-local-audit-key"
+).encode("utf-8")
 
 document_types: dict[str, str] = {
     "Quality Manual": "QM",
@@ -33,6 +42,7 @@ status_types: list = [
     "DRAFT",
     "IN_REVIEW",
     "TRAINING",
+    "PENDING_RELEASE",
     "RELEASED",
     "SUPERSEDED",
     "OBSOLETE",
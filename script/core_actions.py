@@ -1,27 +1,38 @@
 import sqlite3
 import hashlib
-import shutil
 import os
-from copy import deepcopy
-from classes import Document_Header, Document_Version, Training
-from audit_actions import audit_log_docs
+from datetime import datetime
+from classes import (
+    Document_Header,
+    Document_Version,
+    Training,
+    TrainingBatch,
+    ChangeSet,
+)
+from blob_store import put_file, place_view
+from audit_actions import audit_log_changes
+from session import Session, open_session, connect
+from read_cache import cached_read, store_read, invalidate_doc
+from search import index_version
 
 
-def user_info(user_name: str, db_path: str) -> list:
-    with sqlite3.connect(db_path) as db:
+def user_info(user_name: str, db_path: str, session: Session | None = None) -> list:
+    with connect(db_path, session) as db:
         cur: sqlite3.Cursor = db.cursor()
         cur.execute(
             "SELECT user_id, active_flag FROM users WHERE user_name = ?", (user_name,)
         )
-        result: tuple = cur.fetchone()
+        result: tuple | None = cur.fetchone()
+        if result is None:
+            raise ValueError(f"User does not exist: '{user_name}'")
         user_id: int
         active_flag: int
         user_id, active_flag = result
         cur.execute(
             """
-            SELECT r.role_name 
-            FROM roles r 
-            JOIN users_roles ur ON r.role_id = ur.role 
+            SELECT r.role_name
+            FROM roles r
+            JOIN users_roles ur ON r.role_id = ur.role
             WHERE ur.user = ?
         """,
             (user_id,),
@@ -30,24 +41,39 @@ def user_info(user_name: str, db_path: str) -> list:
         return [user_id, active_flag, user_roles]
 
 
-def doc_info(doc_num: str, db_path: str) -> Document_Header:
+def doc_info(
+    doc_num: str, db_path: str, session: Session | None = None
+) -> Document_Header:
     doc_id: int
     title: str
     owner_id: int
     doc_type: str
-    with sqlite3.connect(db_path) as db:
-        cur: sqlite3.Cursor = db.cursor()
+    key: tuple = ("doc_num", doc_num)
+    with open_session(db_path, session) as active:
+        cached: Document_Header | None = cached_read(active, key)  # type: ignore
+        if cached is not None:
+            return cached
+        cur: sqlite3.Cursor = active.db.cursor()  # type: ignore
         cur.execute(
             "SELECT doc_id, title, owner_id, type FROM documents WHERE doc_num = ?",
             (doc_num,),
         )
-        result: tuple = cur.fetchone()
-    doc_id, title, owner_id, doc_type = result
-    return Document_Header(doc_id, doc_num, title, owner_id, doc_type)
+        result: tuple | None = cur.fetchone()
+        if result is None:
+            raise ValueError(f"Document does not exist: '{doc_num}'")
+        doc_id, title, owner_id, doc_type = result
+        doc_obj: Document_Header = Document_Header(
+            doc_id, doc_num, title, owner_id, doc_type
+        )
+        store_read(active, key, doc_id, doc_obj)
+    return doc_obj
 
 
 def version_info(
-    doc_id: int, db_path: str, modifier: list | None = None
+    doc_id: int,
+    db_path: str,
+    modifier: list | None = None,
+    session: Session | None = None,
 ) -> Document_Version:
     version_id: int
     version: str
@@ -56,119 +82,328 @@ def version_info(
     effective_date: str
     if not modifier:
         query: str = "SELECT version_id, version, status, file_path, effective_date FROM versions WHERE doc = ? ORDER BY version_id DESC LIMIT 1"
+        key: tuple = ("version", doc_id)
+    elif modifier == ["status", "RELEASED"]:
+        query: str = "SELECT version_id, version, 'RELEASED', file_path, effective_date FROM current_effective WHERE doc_id = ?"
+        key: tuple = ("version", doc_id, "status", "RELEASED")
     else:
         query: str = f"SELECT version_id, version, status, file_path, effective_date FROM versions WHERE doc = ? AND {modifier[0]} = '{modifier[1]}' ORDER BY version_id DESC LIMIT 1"
-    with sqlite3.connect(db_path) as db:
-        cur: sqlite3.Cursor = db.cursor()
+        key: tuple = ("version", doc_id, modifier[0], modifier[1])
+    with open_session(db_path, session) as active:
+        cached: Document_Version | None = cached_read(active, key)  # type: ignore
+        if cached is not None:
+            return cached
+        cur: sqlite3.Cursor = active.db.cursor()  # type: ignore
         cur.execute(
             query,
             (doc_id,),
         )
-        results: tuple = cur.fetchone()
-    version_id, version, status, file_path, effective_date = results
-    return Document_Version(
-        version_id, doc_id, version, status, file_path, effective_date
-    )
+        results: tuple | None = cur.fetchone()
+        if results is None:
+            raise ValueError(
+                f"No version found for document {doc_id}: '{' = '.join(modifier or [])}'"
+            )
+        version_id, version, status, file_path, effective_date = results
+        version_obj: Document_Version = Document_Version(
+            version_id, doc_id, version, status, file_path, effective_date
+        )
+        store_read(active, key, doc_id, version_obj)
+    return version_obj
+
+
+def effective_version(
+    doc_num: str, db_path: str, session: Session | None = None
+) -> Document_Version:
+    doc_obj: Document_Header = doc_info(doc_num, db_path, session)
+    return version_info(doc_obj.id, db_path, ["status", "RELEASED"], session)
+
+
+def released_documents(db_path: str, session: Session | None = None) -> list[tuple]:
+    with connect(db_path, session) as db:
+        cur: sqlite3.Cursor = db.execute(
+            """
+            SELECT d.doc_num, d.title, d.type, c.version, c.file_path, c.effective_date
+            FROM documents d
+            JOIN current_effective c ON c.doc_id = d.doc_id
+            ORDER BY d.doc_num
+            """
+        )
+        return cur.fetchall()
 
 
-def update_db(table: str, new_values: dict, object, db_path: str) -> None:
+def update_db(
+    table: str,
+    new_values: dict,
+    object,
+    db_path: str,
+    session: Session | None = None,
+) -> None:
     update_fields: str = ", ".join([f"{key} = ?" for key in new_values.keys()])
     values: list = list(new_values.values())
     values.append(object.id)
     query_update: str = f"UPDATE {table} SET {update_fields} WHERE version_id = ?"
-    with sqlite3.connect(db_path) as db:
-        try:
-            cur: sqlite3.Cursor = db.cursor()
-            cur.execute(query_update, tuple(values))
-            db.commit()
-        except sqlite3.Error as e:
-            db.rollback()
-            raise e
-
-
-def max_id(table: str, field: str, db_path: str):
-    with sqlite3.connect(db_path) as db:
-        cur: sqlite3.Cursor = db.cursor()
-        cur.execute(f"SELECT MAX({field}) FROM {table}")
-        result = cur.fetchone()[0]
-        if result:
-            return int(result)
+    with open_session(db_path, session) as active:
+        cur: sqlite3.Cursor = active.db.cursor()  # type: ignore
+        cur.execute(query_update, tuple(values))
+        invalidate_doc(active, object.doc)
+        if "status" in new_values or "file_path" in new_values:
+            index_version(object, db_path, active)
+
+
+def update_version(
+    changes: ChangeSet,
+    version_obj: Document_Version,
+    db_path: str,
+    session: Session | None = None,
+) -> None:
+    query_update, values = changes.update_statement()
+    with open_session(db_path, session) as active:
+        cur: sqlite3.Cursor = active.db.cursor()  # type: ignore
+        cur.execute(query_update, values)
+        invalidate_doc(active, version_obj.doc)
+        if "status" in changes.new or "file_path" in changes.new:
+            index_version(version_obj, db_path, active)
+
+
+sequence_fields: dict[str, tuple[str, str]] = {
+    "documents": ("documents", "doc_id"),
+    "versions": ("versions", "version_id"),
+    "training_records": ("training_records", "training_id"),
+}
+summary_statuses: list[str] = ["ASSIGNED", "FAILED", "COMPLETED", "OVERDUE"]
+lookup_chunk: int = 500
+batch_fetch_rows: int = 10_000
+
+
+def sequence_seed(db: sqlite3.Connection, name: str) -> int:
+    if name.startswith("doc_num:"):
+        doc_type: str = name.split(":", 1)[1]
+        cur: sqlite3.Cursor = db.execute(
+            "SELECT MAX(CAST(substr(doc_num, instr(doc_num, '-') + 1) AS INTEGER)) FROM documents WHERE type = ?",
+            (doc_type,),
+        )
+    else:
+        table, field = sequence_fields[name]
+        cur = db.execute(f"SELECT MAX({field}) FROM {table}")
+    return cur.fetchone()[0] or 0
+
+
+def allocate_ids(
+    name: str, db_path: str, count: int = 1, session: Session | None = None
+) -> int:
+    with connect(db_path, session) as db:
+        cur: sqlite3.Cursor = db.execute(
+            "UPDATE sequences SET value = value + ? WHERE name = ? RETURNING value",
+            (count, name),
+        )
+        result: tuple | None = cur.fetchone()
+        if result is None:
+            last_value: int = sequence_seed(db, name) + count
+            db.execute(
+                "INSERT INTO sequences (name, value) VALUES (?, ?)", (name, last_value)
+            )
         else:
-            return 1
+            last_value = result[0]
+    return last_value - count + 1
 
 
-def create_version(version_obj: Document_Version, db_path: str) -> None:
-    with sqlite3.connect(db_path) as db:
-        cur: sqlite3.Cursor = db.cursor()
+def advance_sequence(
+    name: str, value: int, db_path: str, session: Session | None = None
+) -> None:
+    with connect(db_path, session) as db:
+        db.execute(
+            "UPDATE sequences SET value = max(value, ?) WHERE name = ?", (value, name)
+        )
+
+
+def allocate_doc_num(
+    doc_type: str, db_path: str, session: Session | None = None
+) -> str:
+    seq: int = allocate_ids(f"doc_num:{doc_type}", db_path, session=session)
+    return f"{doc_type}-{seq:03d}"
+
+
+def create_version(
+    version_obj: Document_Version, db_path: str, session: Session | None = None
+) -> None:
+    with open_session(db_path, session) as active:
+        cur: sqlite3.Cursor = active.db.cursor()  # type: ignore
         cur.execute(
             "INSERT INTO versions (version_id, doc, version, status, file_path, effective_date) VALUES (?, ?, ?, ?, ?, ?)",
             version_obj.to_db_tuple(),
         )
-        db.commit()
+        invalidate_doc(active, version_obj.doc)
+        index_version(version_obj, db_path, active)
 
 
-def create_doc(doc_obj: Document_Header, db_path: str) -> None:
-    with sqlite3.connect(db_path) as db:
-        cur: sqlite3.Cursor = db.cursor()
+def create_doc(
+    doc_obj: Document_Header, db_path: str, session: Session | None = None
+) -> None:
+    with open_session(db_path, session) as active:
+        cur: sqlite3.Cursor = active.db.cursor()  # type: ignore
         cur.execute(
             "INSERT INTO documents (doc_id, doc_num, title, owner_id, type) VALUES (?, ?, ?, ?, ?)",
             doc_obj.to_db_tuple(),
         )
-        db.commit()
+        invalidate_doc(active, doc_obj.id)
 
 
-def supersed_docs(doc_id: int, user_id: int, db_path: str) -> None:
+def supersed_docs(
+    doc_id: int,
+    user_id: int,
+    db_path: str,
+    session: Session | None = None,
+    retired_at: str | None = None,
+) -> None:
     action: str = "SUPERSEDED"
     version_old: Document_Version = version_info(
-        doc_id, db_path, ["status", "RELEASED"]
-    )
-    version_superseded: Document_Version = deepcopy(version_old)
-    tmp_file_path: str = version_superseded.file_path.replace(
-        "03_released", "04_archive"
+        doc_id, db_path, ["status", "RELEASED"], session
     )
+    tmp_file_path: str = version_old.file_path.replace("03_released", "04_archive")
     root, ext = os.path.splitext(tmp_file_path)
-    version_superseded.file_path = f"{root}_SUPERSEDED{ext}"
-    version_superseded.status = "SUPERSEDED"
-    shutil.move(version_old.file_path, version_superseded.file_path)
-    new_val: dict = audit_log_docs(
-        version_old, version_superseded, user_id, action, db_path
+    version_superseded: Document_Version
+    changes: ChangeSet
+    version_superseded, changes = version_old.evolve(
+        status="SUPERSEDED", file_path=f"{root}_SUPERSEDED{ext}"
+    )
+    checksum: str = stage_view(
+        version_old.file_path,
+        version_superseded.file_path,
+        "SUPERSEDED",
+        db_path,
+        session,
+        move=True,
+    )
+    audit_log_changes(changes, user_id, action, db_path, session)
+    update_version(changes, version_superseded, db_path, session)
+    set_checksum(version_superseded.id, checksum, db_path, session)
+    set_effectivity(
+        version_old.id,
+        db_path,
+        session,
+        effective_to=retired_at or datetime.now().isoformat(),
+    )
+
+
+def set_effectivity(
+    version_id: int,
+    db_path: str,
+    session: Session | None = None,
+    effective_from: str | None = None,
+    effective_to: str | None = None,
+) -> None:
+    with connect(db_path, session) as db:
+        db.execute(
+            "UPDATE versions SET effective_from = coalesce(?, effective_from), effective_to = coalesce(?, effective_to) WHERE version_id = ?",
+            (effective_from, effective_to, version_id),
+        )
+
+
+def stage_view(
+    source: str,
+    view: str,
+    status: str,
+    db_path: str,
+    session: Session | None = None,
+    move: bool = False,
+) -> str:
+    with open_session(db_path, session) as active:
+        digest: str | None = active.staged_views.get(source)
+        if digest is None:
+            if not os.path.exists(source):
+                raise FileNotFoundError(f"Incorrect path in the databse: '{source}'")
+            digest = put_file(source)
+        active.staged_views[view] = digest
+        old_view: str | None = source if move else None
+        active.after_commit(lambda: place_view(digest, view, status, old_view))
+    return digest
+
+
+def has_view(view: str, session: Session | None = None) -> bool:
+    if session is not None and view in session.staged_views:
+        return True
+    return os.path.exists(view)
+
+
+def set_checksum(
+    version_id: int, checksum: str, db_path: str, session: Session | None = None
+) -> None:
+    with connect(db_path, session) as db:
+        db.execute(
+            "UPDATE versions SET checksum = ? WHERE version_id = ?",
+            (checksum, version_id),
+        )
+
+
+def as_of(
+    when: str, db_path: str, doc_num: str | None = None, session: Session | None = None
+) -> list[tuple]:
+    moment: str = datetime.fromisoformat(when).isoformat()
+    where: str = " AND d.doc_num = ?" if doc_num is not None else ""
+    params: tuple = (
+        (moment, moment, doc_num) if doc_num is not None else (moment, moment)
+    )
+    query: str = f"""
+    SELECT d.doc_num, d.title, d.type, v.version, v.status, v.file_path, v.effective_from, v.effective_to
+    FROM documents d
+    JOIN versions v ON v.version_id = (
+        SELECT version_id FROM versions WHERE doc = d.doc_id AND effective_from <= ? ORDER BY effective_from DESC LIMIT 1
     )
-    update_db("versions", new_val, version_superseded, db_path)
+    WHERE (v.effective_to IS NULL OR v.effective_to > ?){where}
+    ORDER BY d.doc_num
+    """
+    with connect(db_path, session) as db:
+        cur: sqlite3.Cursor = db.execute(query, params)
+        return cur.fetchall()
 
 
-def get_training_users(db_path: str) -> list[int]:
-    with sqlite3.connect(db_path) as db:
+def get_training_users(db_path: str, session: Session | None = None) -> list[int]:
+    with connect(db_path, session) as db:
         cur: sqlite3.Cursor = db.cursor()
         cur.execute(
             """
-            SELECT user 
-            FROM users_roles 
-            WHERE role = (SELECT role_id FROM roles WHERE role_name = 'General Employee') 
-            AND user IN (SELECT user_id FROM users WHERE active_flag = 1);
+            SELECT ur.user
+            FROM users_roles ur
+            JOIN roles r ON r.role_id = ur.role
+            JOIN users u ON u.user_id = ur.user
+            WHERE r.role_name = 'General Employee' AND u.active_flag = 1;
             """
         )
         return [i[0] for i in cur.fetchall()]
 
 
-def inital_trining(training_obj: Training, db_path: str) -> None:
+def inital_trining(
+    training_obj: Training, db_path: str, session: Session | None = None
+) -> None:
     query_training = """
     INSERT INTO training_records(training_id, user_id, version_id, status, assigned_date, due_date, completion_date, score) VALUES(?, ?, ?, ?, ?, ?, ?, ?)
     """
-    with sqlite3.connect(db_path) as db:
+    with connect(db_path, session) as db:
         cur: sqlite3.Cursor = db.cursor()
         cur.execute(query_training, training_obj.to_db_tuple())
-        db.commit()
 
 
-def get_training(user_id: int, doc_num: str, db_path: str) -> Training:
-    doc_obj: Document_Header = doc_info(doc_num, db_path)
+def bulk_initial_training(
+    training_rows: list[tuple], db_path: str, session: Session | None = None
+) -> None:
+    query_training = """
+    INSERT INTO training_records(training_id, user_id, version_id, status, assigned_date, due_date, completion_date, score) VALUES(?, ?, ?, ?, ?, ?, ?, ?)
+    """
+    with connect(db_path, session) as db:
+        db.executemany(query_training, training_rows)
+
+
+def get_training(
+    user_id: int, doc_num: str, db_path: str, session: Session | None = None
+) -> Training:
+    doc_obj: Document_Header = doc_info(doc_num, db_path, session)
     version_obj: Document_Version = version_info(
-        doc_obj.id, db_path, ["status", "TRAINING"]
+        doc_obj.id, db_path, ["status", "TRAINING"], session
     )
     query: str = """
                 SELECT * FROM training_records WHERE user_id = ? AND version_id = ? AND status IN ('ASSIGNED','FAILED')
                 """
-    with sqlite3.connect(db_path) as db:
+    with connect(db_path, session) as db:
         cur: sqlite3.Cursor = db.cursor()
         cur.execute(query, (user_id, version_obj.id))
         res: tuple = cur.fetchone()
@@ -177,47 +412,207 @@ def get_training(user_id: int, doc_num: str, db_path: str) -> Training:
         return Training(*res[:-1])
 
 
-def update_training(new_training_obj: Training, db_path: str) -> None:
-    if new_training_obj.status == "COMPLETED":
-        raw_hash: str = f"{new_training_obj.id}{new_training_obj.user_id}{new_training_obj.version_id}{new_training_obj.status}{new_training_obj.assigned_date}{new_training_obj.due_date}{new_training_obj.completion_date}{new_training_obj.score}"
-        row_hash: str = hashlib.sha256(raw_hash.encode("utf-8")).hexdigest()
-        query_complete: str = """
-        UPDATE training_records SET(status, completion_date, score, signature_hash) = (?, ?, ?, ?) WHERE training_id = ?
-        """
-        update_tuple: tuple = (
-            new_training_obj.status,
-            new_training_obj.completion_date,
-            new_training_obj.score,
-            row_hash,
-            new_training_obj.id,
-        )
-        with sqlite3.connect(db_path) as db:
-            cur: sqlite3.Cursor = db.cursor()
-            cur.execute(query_complete, update_tuple)
-            db.commit()
+def training_signature(training_obj: Training) -> str:
+    raw_hash: str = f"{training_obj.id}{training_obj.user_id}{training_obj.version_id}{training_obj.status}{training_obj.assigned_date}{training_obj.due_date}{training_obj.completion_date}{training_obj.score}"
+    return hashlib.sha256(raw_hash.encode("utf-8")).hexdigest()
 
-    else:
-        query_fail: str = """
-        UPDATE training_records SET(status, score) = (?, ?) WHERE training_id = ?
-        """
-        with sqlite3.connect(db_path) as db:
-            cur: sqlite3.Cursor = db.cursor()
-            cur.execute(
-                query_fail,
-                (new_training_obj.status, new_training_obj.score, new_training_obj.id),
+
+def update_training(
+    new_training_obj: Training, db_path: str, session: Session | None = None
+) -> None:
+    bulk_update_training([new_training_obj], db_path, session)
+
+
+def bulk_update_training(
+    training_objs: list[Training], db_path: str, session: Session | None = None
+) -> None:
+    query_complete: str = """
+    UPDATE training_records SET(status, completion_date, score, signature_hash) = (?, ?, ?, ?) WHERE training_id = ?
+    """
+    query_fail: str = """
+    UPDATE training_records SET(status, score) = (?, ?) WHERE training_id = ?
+    """
+    completed: list[tuple] = [
+        (
+            training_obj.status,
+            training_obj.completion_date,
+            training_obj.score,
+            training_signature(training_obj),
+            training_obj.id,
+        )
+        for training_obj in training_objs
+        if training_obj.status == "COMPLETED"
+    ]
+    failed: list[tuple] = [
+        (training_obj.status, training_obj.score, training_obj.id)
+        for training_obj in training_objs
+        if training_obj.status != "COMPLETED"
+    ]
+    with connect(db_path, session) as db:
+        if completed:
+            db.executemany(query_complete, completed)
+        if failed:
+            db.executemany(query_fail, failed)
+
+
+def user_ids(
+    user_names: list[str], db_path: str, session: Session | None = None
+) -> dict[str, int]:
+    found: dict[str, int] = {}
+    with connect(db_path, session) as db:
+        for start in range(0, len(user_names), lookup_chunk):
+            chunk: list[str] = user_names[start : start + lookup_chunk]
+            cur: sqlite3.Cursor = db.execute(
+                f"SELECT user_name, user_id FROM users WHERE user_name IN ({', '.join('?' * len(chunk))})",
+                chunk,
+            )
+            found.update(cur.fetchall())
+    return found
+
+
+def training_versions(
+    doc_nums: list[str], db_path: str, session: Session | None = None
+) -> dict[str, int]:
+    found: dict[str, int] = {}
+    with connect(db_path, session) as db:
+        for start in range(0, len(doc_nums), lookup_chunk):
+            chunk: list[str] = doc_nums[start : start + lookup_chunk]
+            cur: sqlite3.Cursor = db.execute(
+                f"""
+                SELECT d.doc_num, max(v.version_id) FROM documents d
+                JOIN versions v ON v.doc = d.doc_id
+                WHERE v.status = 'TRAINING' AND d.doc_num IN ({', '.join('?' * len(chunk))})
+                GROUP BY d.doc_num
+                """,
+                chunk,
             )
+            found.update(cur.fetchall())
+    return found
+
+
+def open_training(
+    pairs: list[tuple[int, int]], db_path: str, session: Session | None = None
+) -> dict[tuple[int, int], tuple]:
+    query: str = """
+    SELECT training_id, user_id, version_id, status, assigned_date, due_date, completion_date, score FROM training_records WHERE user_id = ? AND version_id = ? AND status IN ('ASSIGNED','FAILED')
+    """
+    found: dict[tuple[int, int], tuple] = {}
+    with connect(db_path, session) as db:
+        for pair in pairs:
+            row: tuple | None = db.execute(query, pair).fetchone()
+            if row is not None:
+                found[pair] = row
+    return found
+
+
+def get_active_training(
+    db_path: str,
+    session: Session | None = None,
+    batch: TrainingBatch | None = None,
+) -> TrainingBatch:
+    query: str = """
+    SELECT training_id, user_id, version_id, status,
+        CAST(strftime('%s', assigned_date) AS INTEGER),
+        CAST(strftime('%s', due_date) AS INTEGER),
+        score
+    FROM training_records WHERE status IN ('FAILED', 'ASSIGNED')
+    """
+    if batch is None:
+        batch = TrainingBatch()
+    with connect(db_path, session) as db:
+        cur: sqlite3.Cursor = db.execute(query)
+        rows: list[tuple] = cur.fetchmany(batch_fetch_rows)
+        while rows:
+            batch.extend(rows)
+            rows = cur.fetchmany(batch_fetch_rows)
+    return batch
+
+
+def mark_overdue(now: str, db_path: str, session: Session | None = None) -> list[tuple]:
+    query: str = """
+    UPDATE training_records SET status = 'OVERDUE' WHERE status = ? AND due_date < ? RETURNING training_id, version_id
+    """
+    overdue: list[tuple] = []
+    with connect(db_path, session) as db:
+        for old_status in ("ASSIGNED", "FAILED"):
+            cur: sqlite3.Cursor = db.execute(query, (old_status, now))
+            overdue.extend((row[0], old_status, row[1]) for row in cur.fetchall())
+    return overdue
+
+
+def adjust_training_summary(
+    deltas: dict[int, dict[str, int]], db_path: str, session: Session | None = None
+) -> None:
+    query: str = """
+    INSERT INTO training_summary (version_id, assigned, failed, completed, overdue) VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT (version_id) DO UPDATE SET
+        assigned = assigned + excluded.assigned,
+        failed = failed + excluded.failed,
+        completed = completed + excluded.completed,
+        overdue = overdue + excluded.overdue
+    """
+    rows: list[tuple] = [
+        (version_id, *(changes.get(status, 0) for status in summary_statuses))
+        for version_id, changes in deltas.items()
+    ]
+    with connect(db_path, session) as db:
+        db.executemany(query, rows)
+
+
+def has_due_events(now: str, db_path: str, session: Session | None = None) -> bool:
+    with connect(db_path, session) as db:
+        cur: sqlite3.Cursor = db.execute(
+            "SELECT 1 FROM due_events WHERE due_at <= ? LIMIT 1", (now,)
+        )
+        return cur.fetchone() is not None
 
 
-def get_active_training(db_path: str) -> list:
-    query: str = "SELECT training_id, user_id, version_id, status, assigned_date, due_date, completion_date, score FROM training_records WHERE status IN ('FAILED', 'ASSIGNED')"
-    with sqlite3.connect(db_path) as db:
+def due_events(now: str, db_path: str, session: Session | None = None) -> list:
+    with connect(db_path, session) as db:
         cur: sqlite3.Cursor = db.cursor()
-        cur.execute(query)
+        cur.execute(
+            "SELECT kind, record_id FROM due_events WHERE due_at <= ? ORDER BY due_at",
+            (now,),
+        )
         return cur.fetchall()
 
 
-def get_user_id(user: str, db_path: str) -> int:
-    with sqlite3.connect(db_path) as db:
+def reschedule_overdue(now: str, db_path: str, session: Session | None = None) -> None:
+    query: str = """
+    SELECT min(due_date) FROM training_records WHERE status = ? AND due_date >= ?
+    """
+    with connect(db_path, session) as db:
+        cur: sqlite3.Cursor = db.cursor()
+        due_dates: list[str] = []
+        for status in ("ASSIGNED", "FAILED"):
+            cur.execute(query, (status, now))
+            result: str | None = cur.fetchone()[0]
+            if result is not None:
+                due_dates.append(result)
+        next_due: str | None = min(due_dates) if due_dates else None
+        if next_due is None:
+            cur.execute("DELETE FROM due_events WHERE kind = 'OVERDUE'")
+        else:
+            cur.execute(
+                "INSERT INTO due_events (kind, record_id, due_at) VALUES ('OVERDUE', 0, ?) ON CONFLICT (kind, record_id) DO UPDATE SET due_at = excluded.due_at",
+                (next_due,),
+            )
+
+
+def drop_due_event(
+    kind: str, record_id: int, db_path: str, session: Session | None = None
+) -> None:
+    with connect(db_path, session) as db:
+        db.execute(
+            "DELETE FROM due_events WHERE kind = ? AND record_id = ?", (kind, record_id)
+        )
+
+
+def get_user_id(user: str, db_path: str, session: Session | None = None) -> int:
+    with connect(db_path, session) as db:
         cur: sqlite3.Cursor = db.cursor()
         cur.execute("SELECT user_id FROM users WHERE user_name = ?", (user,))
-        return cur.fetchone()[0]
+        result: tuple | None = cur.fetchone()
+        if result is None:
+            raise ValueError(f"User does not exist: '{user}'")
+        return result[0]
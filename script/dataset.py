@@ -0,0 +1,433 @@
+import sqlite3
+import hashlib
+import random
+import time
+import os
+import argparse
+from pathlib import Path
+from itertools import accumulate
+from datetime import datetime, timedelta
+from audit_actions import audit_entry, chain_hash, last_audit_hash, query_insert
+from audit_integrity import write_checkpoint
+from compliance import summary_counts
+from blob_store import put_file, place_view, view_path
+from config import template_map, training_docs, document_types
+
+base_dir: Path = Path(__file__).resolve().parent.parent
+schema_path: str = str(base_dir / "data" / "database" / "schema.sql")
+mock_path: str = str(base_dir / "data" / "database" / "mock_data.sql")
+first_user: int = 1000
+owner_share: float = 0.02
+quality_manager: int = 7
+final_states: dict[str, int] = {
+    "RELEASED": 70,
+    "DRAFT": 10,
+    "IN_REVIEW": 7,
+    "PENDING": 8,
+    "OBSOLETE": 5,
+}
+insert_queries: dict[str, str] = {
+    "users": "INSERT INTO users (user_id, user_name, full_name, email, active_flag, password_hash) VALUES (?, ?, ?, ?, 1, '')",
+    "users_roles": "INSERT INTO users_roles (user, role) VALUES (?, ?)",
+    "documents": "INSERT INTO documents (doc_id, doc_num, title, owner_id, type) VALUES (?, ?, ?, ?, ?)",
+    "versions": "INSERT INTO versions (version_id, doc, version, status, file_path, effective_date) VALUES (?, ?, ?, ?, ?, ?)",
+    "approvals": "INSERT INTO approvals (version_id, approver_id, date_signature, status, role_signing, signature_hash) VALUES (?, ?, ?, ?, ?, ?)",
+    "training_records": "INSERT INTO training_records (training_id, user_id, version_id, status, assigned_date, due_date, completion_date, score, signature_hash) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+    "audit_log": query_insert,
+    "documents_fts": "INSERT INTO documents_fts (rowid, doc_num, title, content, status) VALUES (?, ?, ?, ?, ?)",
+}
+vocabulary: list[str] = (
+    "cleaning validation sterilisation calibration inspection packaging labeling "
+    "supplier audit complaint handling risk assessment design review software "
+    "verification process control batch record training deviation corrective "
+    "preventive action change management equipment maintenance environmental "
+    "monitoring biocompatibility usability clinical evaluation post market "
+    "surveillance vigilance traceability storage shipping incoming acceptance "
+    "nonconforming product internal document control records retention"
+).split()
+syllables: list[str] = "ba ce di fo gu ka le mi no pu ra se ti vo zu".split()
+content_words: list[str] = vocabulary + [
+    first + second + third
+    for first in syllables
+    for second in syllables
+    for third in syllables
+]
+random.Random(0).shuffle(content_words)
+content_weights: list[float] = list(
+    accumulate(1 / rank for rank in range(1, len(content_words) + 1))
+)
+
+
+class BulkLoader:
+    def __init__(self, db: sqlite3.Connection, batch_rows: int) -> None:
+        self.db: sqlite3.Connection = db
+        self.batch_rows: int = batch_rows
+        self.buffers: dict[str, list[tuple]] = {table: [] for table in insert_queries}
+        self.counts: dict[str, int] = dict.fromkeys(insert_queries, 0)
+        self.prev_hash: str = last_audit_hash(db)
+
+    def add(self, table: str, row: tuple) -> None:
+        buffer: list[tuple] = self.buffers[table]
+        buffer.append(row)
+        if len(buffer) >= self.batch_rows:
+            self.flush(table)
+
+    def audit(self, entry: tuple) -> None:
+        self.prev_hash = chain_hash(self.prev_hash, entry)
+        self.add("audit_log", (*entry, self.prev_hash))
+
+    def flush(self, table: str | None = None) -> None:
+        for name in [table] if table else list(insert_queries):
+            rows: list[tuple] = self.buffers[name]  # type: ignore
+            if rows:
+                self.db.executemany(insert_queries[name], rows)  # type: ignore
+                self.counts[name] += len(rows)  # type: ignore
+                rows.clear()
+
+
+def version_plan(
+    rng: random.Random, versions_per_doc: int, doc_type: str
+) -> list[tuple[str, str]]:
+    count: int = rng.randint(1, max(1, 2 * versions_per_doc - 1))
+    final: str = rng.choices(list(final_states), weights=list(final_states.values()))[0]
+    majors: int = count if final in ("RELEASED", "OBSOLETE") else count - 1
+    plan: list[tuple[str, str]] = [
+        (f"{major}.0", "SUPERSEDED") for major in range(1, majors + 1)
+    ]
+    if plan:
+        plan[-1] = (plan[-1][0], "OBSOLETE" if final == "OBSOLETE" else "RELEASED")
+    if final in ("DRAFT", "IN_REVIEW"):
+        plan.append((f"{majors}.1" if majors else "0.1", final))
+    elif final == "PENDING":
+        status: str = "TRAINING" if doc_type in training_docs else "PENDING_RELEASE"
+        plan.append((f"{majors + 1}.0", status))
+    return plan
+
+
+def signature(*fields) -> str:
+    raw: str = "".join(str(field) for field in fields)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def generate_dataset(
+    db_path: str,
+    documents: int = 10_000,
+    users: int = 1_000,
+    versions_per_doc: int = 3,
+    trainees_per_version: int = 20,
+    overdue_share: float = 0.05,
+    seed: int = 0,
+    batch_rows: int = 50_000,
+) -> dict:
+    rng: random.Random = random.Random(seed)
+    now: datetime = datetime.now()
+    timestamp: str = now.isoformat()
+    start: float = time.perf_counter()
+    db: sqlite3.Connection = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        with open(schema_path, encoding="utf-8") as f:
+            db.executescript(f.read())
+        with open(mock_path, encoding="utf-8") as md:
+            db.executescript(md.read())
+        db.execute("PRAGMA synchronous = OFF")
+        db.execute("BEGIN")
+        loader: BulkLoader = BulkLoader(db, batch_rows)
+        owners: list[int] = [
+            row[0] for row in db.execute("SELECT user FROM users_roles WHERE role = 4")
+        ]
+        employees: list[int] = [
+            row[0]
+            for row in db.execute(
+                "SELECT ur.user FROM users_roles ur JOIN users u ON u.user_id = ur.user WHERE ur.role = 5 AND u.active_flag = 1"
+            )
+        ]
+        for user_id in range(first_user, first_user + users):
+            role: int = 4 if rng.random() < owner_share else 5
+            loader.add(
+                "users",
+                (
+                    user_id,
+                    f"gen.user{user_id}",
+                    f"Generated User {user_id}",
+                    f"gen.user{user_id}@meddevice.com",
+                ),
+            )
+            loader.add("users_roles", (user_id, role))
+            (owners if role == 4 else employees).append(user_id)
+        types: list[str] = list(document_types.values())
+        version_id: int = 0
+        training_id: int = 0
+        for doc_id in range(1, documents + 1):
+            doc_type: str = types[(doc_id - 1) % len(types)]
+            doc_num: str = f"{doc_type}-{(doc_id - 1) // len(types) + 1:03d}"
+            owner: int = rng.choice(owners)
+            extension: str = os.path.splitext(template_map[doc_type])[1]
+            title: str = " ".join(rng.sample(vocabulary, 3)).capitalize()
+            content: str = " ".join(
+                rng.choices(content_words, cum_weights=content_weights, k=60)
+            )
+            header: tuple = (doc_id, doc_num, f"{title} {doc_id}", owner, doc_type)
+            loader.add("documents", header)
+            loader.audit(
+                audit_entry(
+                    "documents",
+                    doc_id,
+                    owner,
+                    "CREATE",
+                    {},
+                    dict(
+                        zip(("doc_id", "doc_num", "title", "owner_id", "type"), header)
+                    ),
+                    timestamp,
+                )
+            )
+            plan: list[tuple[str, str]] = version_plan(rng, versions_per_doc, doc_type)
+            for index, (version, status) in enumerate(plan):
+                version_id += 1
+                age: int = len(plan) - 1 - index
+                if status in ("TRAINING", "PENDING_RELEASE"):
+                    effective: datetime | None = now + timedelta(
+                        days=rng.randint(16, 60)
+                    )
+                elif status in ("DRAFT", "IN_REVIEW"):
+                    effective = None
+                else:
+                    effective = now - timedelta(days=90 * age + rng.randint(1, 60))
+                effective_date: str | None = (
+                    effective.isoformat() if effective else None
+                )
+                file_path: str = view_path(doc_num, version, status, extension)
+                loader.add(
+                    "versions",
+                    (version_id, doc_id, version, status, file_path, effective_date),
+                )
+                loader.add(
+                    "documents_fts", (version_id, doc_num, header[2], content, status)
+                )
+                loader.audit(
+                    audit_entry(
+                        "versions",
+                        version_id,
+                        owner,
+                        "CREATE",
+                        {},
+                        {"version_id": version_id, "doc": doc_id, "version": version},
+                        timestamp,
+                    )
+                )
+                if status == "DRAFT":
+                    continue
+                loader.add(
+                    "approvals",
+                    (
+                        version_id,
+                        owner,
+                        timestamp,
+                        "APPROVED",
+                        "OWNER",
+                        signature(version_id, owner, timestamp, "APPROVED", "OWNER"),
+                    ),
+                )
+                if status == "IN_REVIEW":
+                    loader.add(
+                        "approvals",
+                        (
+                            version_id,
+                            2,
+                            timestamp,
+                            "PENDING",
+                            "QUALITY_MANAGER",
+                            signature(
+                                version_id, 2, timestamp, "PENDING", "QUALITY_MANAGER"
+                            ),
+                        ),
+                    )
+                    loader.audit(
+                        audit_entry(
+                            "versions",
+                            version_id,
+                            owner,
+                            "UPDATE",
+                            {"status": "DRAFT"},
+                            {"status": status},
+                            timestamp,
+                        )
+                    )
+                    continue
+                loader.add(
+                    "approvals",
+                    (
+                        version_id,
+                        quality_manager,
+                        timestamp,
+                        "APPROVED",
+                        "QUALITY_MANAGER",
+                        signature(
+                            version_id,
+                            quality_manager,
+                            timestamp,
+                            "APPROVED",
+                            "QUALITY_MANAGER",
+                        ),
+                    ),
+                )
+                loader.audit(
+                    audit_entry(
+                        "versions",
+                        version_id,
+                        quality_manager,
+                        "APPROVE",
+                        {"status": "IN_REVIEW"},
+                        {"status": status, "effective_date": effective_date},
+                        timestamp,
+                    )
+                )
+                if doc_type not in training_docs or status == "PENDING_RELEASE":
+                    continue
+                assigned: str = (effective - timedelta(days=20)).isoformat()  # type: ignore
+                completed: str = (effective - timedelta(days=1)).isoformat()  # type: ignore
+                for user_id in rng.sample(
+                    employees, min(trainees_per_version, len(employees))
+                ):
+                    training_id += 1
+                    if status == "TRAINING" or rng.random() < overdue_share:
+                        row: tuple = (
+                            training_id,
+                            user_id,
+                            version_id,
+                            "ASSIGNED",
+                            assigned,
+                            effective_date,
+                            None,
+                            None,
+                            None,
+                        )
+                    else:
+                        score: int = rng.randint(71, 100)
+                        row = (
+                            training_id,
+                            user_id,
+                            version_id,
+                            "COMPLETED",
+                            assigned,
+                            effective_date,
+                            completed,
+                            score,
+                            signature(
+                                training_id,
+                                user_id,
+                                version_id,
+                                "COMPLETED",
+                                assigned,
+                                effective_date,
+                                completed,
+                                score,
+                            ),
+                        )
+                    loader.add("training_records", row)
+                    loader.audit(
+                        audit_entry(
+                            "training_records",
+                            training_id,
+                            quality_manager,
+                            "ASSING",
+                            {},
+                            {"user_id": user_id, "version_id": version_id},
+                            assigned,
+                        )
+                    )
+                    if row[3] == "COMPLETED":
+                        loader.audit(
+                            audit_entry(
+                                "training_records",
+                                training_id,
+                                user_id,
+                                "COMPLETED",
+                                {"status": "ASSIGNED"},
+                                {"status": "COMPLETED", "score": row[7]},
+                                completed,
+                            )
+                        )
+        loader.flush()
+        db.execute(
+            "UPDATE versions SET effective_from = effective_date WHERE status IN ('RELEASED', 'SUPERSEDED', 'OBSOLETE')"
+        )
+        db.execute(
+            """
+            UPDATE versions SET effective_to = coalesce((
+                SELECT min(n.effective_from) FROM versions n
+                WHERE n.doc = versions.doc AND n.version_id > versions.version_id
+            ), ?)
+            WHERE status IN ('SUPERSEDED', 'OBSOLETE')
+            """,
+            (now.isoformat(),),
+        )
+        db.execute(
+            f"INSERT INTO training_summary (version_id, assigned, failed, completed, overdue) {summary_counts}"
+        )
+        db.execute(
+            """
+            INSERT OR REPLACE INTO due_events (kind, record_id, due_at)
+            SELECT 'RELEASE', version_id, effective_date FROM versions
+            WHERE status IN ('TRAINING', 'PENDING_RELEASE') AND effective_date IS NOT NULL
+            """
+        )
+        head: tuple | None = db.execute(
+            "SELECT log_id, hash FROM audit_log WHERE log_id = (SELECT MAX(log_id) FROM audit_log)"
+        ).fetchone()
+        if head is not None:
+            write_checkpoint(db, head[0], head[1])
+        db.execute("COMMIT")
+        db.execute("ANALYZE")
+    finally:
+        db.close()
+    counts: dict = dict(loader.counts)
+    counts["seconds"] = time.perf_counter() - start
+    return counts
+
+
+def stage_files(db_path: str, version_ids: list[int]) -> None:
+    digests: dict[str, str] = {}
+    with sqlite3.connect(db_path) as db:
+        for version_id in version_ids:
+            doc_type: str
+            file_path: str
+            status: str
+            doc_type, file_path, status = db.execute(
+                "SELECT d.type, v.file_path, v.status FROM versions v JOIN documents d ON d.doc_id = v.doc WHERE v.version_id = ?",
+                (version_id,),
+            ).fetchone()
+            if doc_type not in digests:
+                digests[doc_type] = put_file(template_map[doc_type])
+            place_view(digests[doc_type], file_path, status)
+            db.execute(
+                "UPDATE versions SET checksum = ? WHERE version_id = ?",
+                (digests[doc_type], version_id),
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Generate a synthetic MediQMS database"
+    )
+    parser.add_argument("db_path")
+    parser.add_argument("--documents", type=int, default=10_000)
+    parser.add_argument("--users", type=int, default=1_000)
+    parser.add_argument("--versions-per-doc", type=int, default=3)
+    parser.add_argument("--trainees-per-version", type=int, default=20)
+    parser.add_argument("--overdue-share", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    if os.path.exists(args.db_path):
+        raise FileExistsError(f"Database already exists: '{args.db_path}'")
+    result: dict = generate_dataset(
+        args.db_path,
+        args.documents,
+        args.users,
+        args.versions_per_doc,
+        args.trainees_per_version,
+        args.overdue_share,
+        args.seed,
+    )
+    for table, rows in result.items():
+        print(f"{table}: {rows}")
@@ -1,24 +1,27 @@
 from types import FunctionType
 import os
-import shutil
 import sqlite3
 import hashlib
 from pathlib import Path
 from datetime import datetime, timedelta
-from copy import deepcopy
 from config import document_types, template_map, storage_root_path, training_docs
 from core_actions import (
     doc_info,
     version_info,
     user_info,
-    update_db,
+    update_version,
     create_version,
-    max_id,
+    allocate_ids,
+    allocate_doc_num,
     create_doc,
+    set_effectivity,
+    set_checksum,
+    stage_view,
 )
-from audit_actions import audit_log_docs
+from audit_actions import audit_log_docs, audit_log_changes
 from training_actions import assign_training
-from classes import Document_Header, Document_Version
+from classes import Document_Header, Document_Version, ChangeSet
+from session import Session, open_session, connect
 
 
 def doc_action(action: str) -> FunctionType:  # type: ignore
@@ -32,7 +35,13 @@ def doc_action(action: str) -> FunctionType:  # type: ignore
         raise ValueError("Action does not exist")
 
 
-def create_new_document(title: str, type: str, user_name: str, db_path: str) -> None:
+def create_new_document(
+    title: str,
+    type: str,
+    user_name: str,
+    db_path: str,
+    session: Session | None = None,
+) -> None:
     if type not in document_types.values():
         raise (ValueError(f"Invalid type, not in valid types: '{type}'"))
     tmp_path: str = template_map.get(type.upper())  # type: ignore
@@ -42,53 +51,41 @@ def create_new_document(title: str, type: str, user_name: str, db_path: str) ->
         )
     user_id: int
     active_flag: int
-    user_id, active_flag, _ = user_info(user_name, db_path)
-    if active_flag == 0:
-        raise ValueError(f"Owner ID {user_id} does not exist or is inactive")
-    with sqlite3.connect(db_path) as db:
-        cursor: sqlite3.Cursor = db.cursor()
-        cursor.execute("SELECT count(*) FROM documents WHERE title = ?", (title,))
-        if cursor.fetchone()[0] > 0:
-            raise ValueError(f"Document title already exists: '{title}'")
-        cursor.execute("SELECT MAX(doc_id) FROM documents")
-        last_doc_id: int | None = cursor.fetchone()[0]
-        next_doc_id: int = 1 if last_doc_id is None else last_doc_id + 1
-        cursor.execute("SELECT MAX(version_id) FROM versions")
-        last_ver_id: int | None = cursor.fetchone()[0]
-        next_ver_id: int = 1 if last_ver_id is None else last_ver_id + 1
-        cursor.execute(
-            "SELECT doc_num FROM documents WHERE type = ? ORDER BY doc_id DESC LIMIT 1",
-            (type,),
+    with open_session(db_path, session, immediate=True) as session:
+        user_id, active_flag, _ = user_info(user_name, db_path, session)
+        if active_flag == 0:
+            raise ValueError(f"Owner ID {user_id} does not exist or is inactive")
+        with connect(db_path, session) as db:
+            cursor: sqlite3.Cursor = db.cursor()
+            cursor.execute("SELECT count(*) FROM documents WHERE title = ?", (title,))
+            if cursor.fetchone()[0] > 0:
+                raise ValueError(f"Document title already exists: '{title}'")
+        next_doc_id: int = allocate_ids("documents", db_path, session=session)
+        next_ver_id: int = allocate_ids("versions", db_path, session=session)
+        next_doc_num: str = allocate_doc_num(type, db_path, session)
+        copy_path: Path = Path(tmp_path)
+        extension_file: str = os.path.splitext(tmp_path)[1]
+        destination_folder: Path = Path(storage_root_path) / "01_drafts"
+        file_name: str = f"{next_doc_num}_V0.1_DRAFT{extension_file}"
+        destination_path_root = destination_folder / file_name
+        checksum: str = stage_view(
+            str(copy_path), str(destination_path_root), "DRAFT", db_path, session
+        )
+        new_document: Document_Header = Document_Header(
+            next_doc_id, next_doc_num, title, user_id, type
+        )
+        new_version: Document_Version = Document_Version(
+            next_ver_id, next_doc_id, "0.1", "DRAFT", str(destination_path_root), None
+        )
+        create_doc(new_document, db_path, session)
+        create_version(new_version, db_path, session)
+        set_checksum(next_ver_id, checksum, db_path, session)
+        audit_log_docs(
+            None, new_document, new_document.owner, "CREATE", db_path, session
+        )
+        audit_log_docs(
+            None, new_version, new_document.owner, "CREATE", db_path, session
         )
-        result_num: tuple | None = cursor.fetchone()
-
-        if result_num is None:
-            next_doc_num: str = f"{type}-001"
-        else:
-            last_num_str: str = result_num[0]
-            parts: list[str] = last_num_str.split("-")
-            if len(parts) < 2:
-                next_doc_num: str = f"{type}-001"
-            else:
-                current_seq: int = int(parts[1])
-                next_seq: int = current_seq + 1
-                next_doc_num: str = f"{type}-{next_seq:03d}"
-    copy_path: Path = Path(tmp_path)
-    extension_file: str = os.path.splitext(tmp_path)[1]
-    destination_folder: Path = Path(storage_root_path) / "01_drafts"
-    file_name: str = f"{next_doc_num}_V0.1_DRAFT{extension_file}"
-    destination_path_root = destination_folder / file_name
-    shutil.copy(copy_path, destination_path_root)
-    new_document: Document_Header = Document_Header(
-        next_doc_id, next_doc_num, title, user_id, type
-    )
-    new_version: Document_Version = Document_Version(
-        next_ver_id, next_doc_id, "0.1", "DRAFT", str(destination_path_root), None
-    )
-    create_doc(new_document, db_path)
-    create_version(new_version, db_path)
-    audit_log_docs(None, new_document, new_document.owner, "CREATE", db_path)
-    audit_log_docs(None, new_version, new_document.owner, "CREATE", db_path)
 
 
 def approve_document(
@@ -97,64 +94,83 @@ def approve_document(
     db_path: str,
     efective_date: str | None = (datetime.now() + timedelta(days=15)).isoformat(),
     comment: str | None = None,
+    session: Session | None = None,
 ) -> None:
     parent_doc: Document_Header
     version_old: Document_Version
     user_role: str
     user_id: int
-    parent_doc, version_old, user_role, user_id = approve_checks(user, doc_num, db_path)
-    version_new = deepcopy(version_old)
-    if user_id == parent_doc.owner and version_old.status == "DRAFT":
-        version_new.status = "IN_REVIEW"
-        action: str = "UPDATE"
-    elif user_role == "QM" and version_old.status == "IN_REVIEW":
-        if parent_doc.type in training_docs:
-            version_new.status = "TRAINING"
-            version_new.file_path = (
-                version_old.file_path.replace("_DRAFT", "_TRAINING")
-                .replace(version_old.version, version_new.version)
-                .replace("01_drafts", "02_pending_approval")
+    with open_session(db_path, session, immediate=True) as session:
+        parent_doc, version_old, user_role, user_id = approve_checks(
+            user, doc_num, db_path, session
+        )
+        version_new: Document_Version
+        changes: ChangeSet
+        if user_id == parent_doc.owner and version_old.status == "DRAFT":
+            version_new, changes = version_old.evolve(status="IN_REVIEW")
+            action: str = "UPDATE"
+            checksum: str = stage_view(
+                version_old.file_path,
+                version_old.file_path,
+                "IN_REVIEW",
+                db_path,
+                session,
             )
-        else:
-            version_new.status = "PENDING_RELEASE"
-            version_new.file_path = (
-                version_old.file_path.replace("_DRAFT", "_PENDING_RELEASE")
-                .replace(version_old.version, version_new.version)
-                .replace("01_drafts", "02_pending_approval")
+        elif user_role == "QM" and version_old.status == "IN_REVIEW":
+            if parent_doc.type in training_docs:
+                new_status: str = "TRAINING"
+            else:
+                new_status = "PENDING_RELEASE"
+            action: str = "APPROVE"
+            if not efective_date:
+                raise ValueError(
+                    f"Efective_date field is obligatory: '{efective_date}'"
+                )
+            if datetime.fromisoformat(efective_date) < (
+                datetime.now() + timedelta(days=14)
+            ):
+                raise ValueError("Efective date must be at least 15 days from today")
+            major_version: int = int(version_old.version.split(".")[0])
+            new_version_major: int = major_version + 1
+            version_new, changes = version_old.evolve(
+                status=new_status,
+                file_path=version_old.file_path.replace(
+                    "_DRAFT", f"_{new_status}"
+                ).replace("01_drafts", "02_pending_approval"),
+                effective_date=efective_date,
+                version=f"{new_version_major}.0",
             )
-        action: str = "APPROVE"
-        if not efective_date:
-            raise ValueError(f"Efective_date field is obligatory: '{efective_date}'")
-        if datetime.fromisoformat(efective_date) < (
-            datetime.now() + timedelta(days=14)
-        ):
-            raise ValueError("Efective date must be at least 15 days from today")
-        version_new.effective_date = efective_date  # type: ignore
-        major_version: int = int(version_old.version.split(".")[0])
-        new_version_major: int = major_version + 1
-        version_new.version = f"{new_version_major}.0"
-        if os.path.exists(version_old.file_path):
-            shutil.move(version_old.file_path, version_new.file_path)
-        else:
-            raise FileNotFoundError(
-                f"Incorrect path in the databse: '{version_old.file_path}'"
+            checksum = stage_view(
+                version_old.file_path,
+                version_new.file_path,
+                new_status,
+                db_path,
+                session,
+                move=True,
             )
-    else:
-        raise PermissionError(f"Action not permited for user: '{user}'")
-    new_values = audit_log_docs(version_old, version_new, user_id, action, db_path)
-    update_db("versions", new_values, version_new, db_path)
-    write_approvals_table(user_id, user_role, version_new, "APPROVE", db_path)
-    if version_new.status == "TRAINING":
-        assign_training(doc_num, efective_date, user_id, db_path)  # type: ignore
+        else:
+            raise PermissionError(f"Action not permited for user: '{user}'")
+        audit_log_changes(changes, user_id, action, db_path, session)
+        update_version(changes, version_new, db_path, session)
+        set_checksum(version_new.id, checksum, db_path, session)
+        write_approvals_table(
+            user_id, user_role, version_new, "APPROVE", db_path, session=session
+        )
+        if version_new.status == "TRAINING":
+            assign_training(doc_num, efective_date, user_id, db_path, session)  # type: ignore
 
 
-def approve_checks(user: str, doc_num: str, db_path: str) -> tuple:
-    parent_doc: Document_Header = doc_info(doc_num, db_path)
-    version_newest: Document_Version = version_info(parent_doc.id, db_path)
+def approve_checks(
+    user: str, doc_num: str, db_path: str, session: Session | None = None
+) -> tuple:
+    parent_doc: Document_Header = doc_info(doc_num, db_path, session)
+    version_newest: Document_Version = version_info(
+        parent_doc.id, db_path, session=session
+    )
     user_id: int
     active_flag: int
     user_roles: list
-    user_id, active_flag, user_roles = user_info(user, db_path)
+    user_id, active_flag, user_roles = user_info(user, db_path, session)
     if active_flag == 0:
         raise ValueError(f"User '{user}' is inactive")
     if user_id == parent_doc.owner and version_newest.status == "DRAFT":
@@ -173,10 +189,11 @@ def write_approvals_table(
     action: str,
     db_path: str,
     comment: str | None = None,
+    session: Session | None = None,
 ) -> None:
     timestamp: str = datetime.now().isoformat()
     version_id: int = version_obj.id
-    with sqlite3.connect(db_path) as db:
+    with connect(db_path, session) as db:
         cur: sqlite3.Cursor = db.cursor()
         insert_query: str = """INSERT INTO approvals 
                             (version_id, approver_id, date_signature, status, role_signing, signature_hash) 
@@ -240,7 +257,6 @@ def write_approvals_table(
                 )
             else:
                 raise ValueError(f"Action not permited: '{action}'")
-        db.commit()
 
 
 def reject_doc(
@@ -249,118 +265,159 @@ def reject_doc(
     db_path: str,
     date: str | None = None,
     comment: str | None = None,
+    session: Session | None = None,
 ) -> None:
     action: str = "REJECT"
     parent_doc: Document_Header
     version_root: Document_Version
     user_role: str
     user_id: int
-    parent_doc, version_root, user_role, user_id = approve_checks(
-        user, doc_num, db_path
-    )
-    version_old = deepcopy(version_root)
-    version_new = deepcopy(version_root)
-    if user_role != "QM":
-        raise ValueError(
-            f"Only quality manager can reject drafts, '{user}' is not Quality Manager"
+    with open_session(db_path, session, immediate=True) as session:
+        parent_doc, version_root, user_role, user_id = approve_checks(
+            user, doc_num, db_path, session
+        )
+        if user_role != "QM":
+            raise ValueError(
+                f"Only quality manager can reject drafts, '{user}' is not Quality Manager"
+            )
+        if version_root.status != "IN_REVIEW":
+            raise ValueError(f"Document does not have in review version: '{doc_num}'")
+        if not comment:
+            raise ValueError("Rejection needs a comment")
+        major_minor_old = version_root.version
+        major_old: int = int(major_minor_old.split(".")[0])
+        minor_old: int = int(major_minor_old.split(".")[1])
+        minor_new: int = minor_old + 1
+        major_minor_new: str = f"{major_old}.{minor_new}"
+        version_new: Document_Version
+        draft_changes: ChangeSet
+        version_new, draft_changes = version_root.evolve(
+            id=allocate_ids("versions", db_path, session=session),
+            version=major_minor_new,
+            status="DRAFT",
+            file_path=version_root.file_path.replace(major_minor_old, major_minor_new),
+        )
+        draft_checksum: str = stage_view(
+            version_root.file_path, version_new.file_path, "DRAFT", db_path, session
+        )
+        version_old: Document_Version
+        rejected_changes: ChangeSet
+        version_old, rejected_changes = version_root.evolve(
+            status="REJECTED",
+            file_path=version_root.file_path.replace("01_drafts", "04_archive").replace(
+                "_DRAFT", "_REJECTED"
+            ),
+        )
+        rejected_checksum: str = stage_view(
+            version_root.file_path,
+            version_old.file_path,
+            "REJECTED",
+            db_path,
+            session,
+            move=True,
+        )
+        audit_log_changes(rejected_changes, user_id, action, db_path, session)
+        audit_log_changes(draft_changes, user_id, "CREATE", db_path, session)
+        update_version(rejected_changes, version_old, db_path, session)
+        create_version(version_new, db_path, session)
+        set_checksum(version_old.id, rejected_checksum, db_path, session)
+        set_checksum(version_new.id, draft_checksum, db_path, session)
+        write_approvals_table(
+            user_id, user_role, version_root, action, db_path, comment, session
         )
-    if version_old.status != "IN_REVIEW":
-        raise ValueError(f"Document does not have in review version: '{doc_num}'")
-    if not comment:
-        raise ValueError("Rejection needs a comment")
-    max_v_id: int = max_id("versions", "version_id", db_path)
-    version_new.id = max_v_id + 1
-    major_minor_old = version_old.version
-    major_old: int = int(major_minor_old.split(".")[0])
-    minor_old: int = int(major_minor_old.split(".")[1])
-    minor_new: int = minor_old + 1
-    major_minor_new: str = f"{major_old}.{minor_new}"
-    version_new.version = major_minor_new
-    version_new.file_path = version_old.file_path.replace(
-        major_minor_old, major_minor_new
-    )
-    shutil.copy(version_old.file_path, version_new.file_path)
-    version_old.file_path = version_old.file_path.replace(
-        "01_drafts", "04_archive"
-    ).replace("_DRAFT", "_REJECTED")
-    version_old.status = "REJECTED"
-    version_new.status = "DRAFT"
-    shutil.move(version_root.file_path, version_old.file_path)
-    rejected_new_vals: dict = audit_log_docs(
-        version_root, version_old, user_id, action, db_path
-    )
-    audit_log_docs(version_root, version_new, user_id, "CREATE", db_path)
-    update_db("versions", rejected_new_vals, version_old, db_path)
-    create_version(version_new, db_path)
-    write_approvals_table(user_id, user_role, version_root, action, db_path, comment)
 
 
-def obsolete_doc(user: str, doc_num: str, db_path: str):
+def obsolete_doc(user: str, doc_num: str, db_path: str, session: Session | None = None):
     action: str = "OBSOLETE"
     user_id: int
     active_flag: int
     user_roles: list
-    user_id, active_flag, user_roles = user_info(user, db_path)
-    if active_flag == 0:
-        raise ValueError(f"User is not active: '{user}'")
-    if "Quality Manager" not in user_roles:
-        raise ValueError(f"Only quality manager can obsolete docs: '{user}'")
-    parent_doc: Document_Header = doc_info(doc_num, db_path)
-    version_old: Document_Version = version_info(
-        parent_doc.id, db_path, ["status", "RELEASED"]
-    )
-    version_new: Document_Version = deepcopy(version_old)
-    new_file_path: str = version_old.file_path.replace("03_released", "04_archive")
-    root: str
-    ext: str
-    root, ext = os.path.splitext(new_file_path)
-    version_new.file_path = f"{root}_{action}{ext}"
-    version_new.status = action
-    shutil.move(version_old.file_path, version_new.file_path)
-    new_vals: dict = audit_log_docs(version_old, version_new, user_id, action, db_path)
-    update_db("versions", new_vals, version_new, db_path)
+    with open_session(db_path, session, immediate=True) as session:
+        user_id, active_flag, user_roles = user_info(user, db_path, session)
+        if active_flag == 0:
+            raise ValueError(f"User is not active: '{user}'")
+        if "Quality Manager" not in user_roles:
+            raise ValueError(f"Only quality manager can obsolete docs: '{user}'")
+        parent_doc: Document_Header = doc_info(doc_num, db_path, session)
+        version_old: Document_Version = version_info(
+            parent_doc.id, db_path, ["status", "RELEASED"], session
+        )
+        new_file_path: str = version_old.file_path.replace("03_released", "04_archive")
+        root: str
+        ext: str
+        root, ext = os.path.splitext(new_file_path)
+        version_new: Document_Version
+        changes: ChangeSet
+        version_new, changes = version_old.evolve(
+            status=action, file_path=f"{root}_{action}{ext}"
+        )
+        checksum: str = stage_view(
+            version_old.file_path,
+            version_new.file_path,
+            action,
+            db_path,
+            session,
+            move=True,
+        )
+        audit_log_changes(changes, user_id, action, db_path, session)
+        update_version(changes, version_new, db_path, session)
+        set_checksum(version_new.id, checksum, db_path, session)
+        set_effectivity(
+            version_old.id,
+            db_path,
+            session,
+            effective_to=datetime.now().isoformat(),
+        )
 
 
-def revise_doc(user: str, doc_num: str, db_path: str) -> None:
+def revise_doc(
+    user: str, doc_num: str, db_path: str, session: Session | None = None
+) -> None:
     action: str = "REVISE"
-    parent_doc: Document_Header = doc_info(doc_num, db_path)
-    version_old: Document_Version = version_info(
-        parent_doc.id, db_path, ["status", "RELEASED"]
-    )
-    version_new: Document_Version = deepcopy(version_old)
-    version_new.effective_date = None
-    user_id: int
-    user_roles: list
-    active_flag: int
-    user_id, active_flag, user_roles = user_info(user, db_path)
-    if active_flag == 0:
-        raise ValueError(f"User '{user}' is not active")
-    with sqlite3.connect(db_path) as db:
-        cur: sqlite3.Cursor = db.cursor()
-        cur.execute(
-            "SELECT version_id FROM versions WHERE doc = ? AND status IN ('DRAFT', 'IN_REVIEW')",
-            (parent_doc.id,),
+    with open_session(db_path, session, immediate=True) as session:
+        parent_doc: Document_Header = doc_info(doc_num, db_path, session)
+        version_old: Document_Version = version_info(
+            parent_doc.id, db_path, ["status", "RELEASED"], session
         )
-        if cur.fetchone():
-            raise ValueError(
-                f"Draft or In review already in process for document: '{doc_num}'"
+        user_id: int
+        user_roles: list
+        active_flag: int
+        user_id, active_flag, user_roles = user_info(user, db_path, session)
+        if active_flag == 0:
+            raise ValueError(f"User '{user}' is not active")
+        with connect(db_path, session) as db:
+            cur: sqlite3.Cursor = db.cursor()
+            cur.execute(
+                "SELECT version_id FROM versions WHERE doc = ? AND status IN ('DRAFT', 'IN_REVIEW')",
+                (parent_doc.id,),
             )
+            if cur.fetchone():
+                raise ValueError(
+                    f"Draft or In review already in process for document: '{doc_num}'"
+                )
 
-    if not (user_id == parent_doc.owner or "Quality Manager" in user_roles):
-        raise PermissionError(f"User not allwed to revise document: '{doc_num}'")
-    v_major: int = int(version_old.version.split(".")[0])
-    v_minor: int = int(version_old.version.split(".")[1]) + 1
-    new_version: str = f"{v_major}.{v_minor}"
-    version_new.version = new_version
-    version_new.status = "DRAFT"
-    tmp_path: str = version_old.file_path.replace(
-        version_old.version, new_version
-    ).replace("03_released", "01_drafts")
-    root, ext = os.path.splitext(tmp_path)
-    new_file_path: str = f"{root}_DRAFT{ext}"
-    version_new.file_path = new_file_path
-    new_id: int = max_id("versions", "version_id", db_path) + 1
-    version_new.id = new_id
-    shutil.copy(version_old.file_path, version_new.file_path)
-    audit_log_docs(None, version_new, user_id, action, db_path)
-    create_version(version_new, db_path)
+        if not (user_id == parent_doc.owner or "Quality Manager" in user_roles):
+            raise PermissionError(f"User not allwed to revise document: '{doc_num}'")
+        v_major: int = int(version_old.version.split(".")[0])
+        v_minor: int = int(version_old.version.split(".")[1]) + 1
+        new_version: str = f"{v_major}.{v_minor}"
+        tmp_path: str = version_old.file_path.replace(
+            version_old.version, new_version
+        ).replace("03_released", "01_drafts")
+        root, ext = os.path.splitext(tmp_path)
+        new_file_path: str = f"{root}_DRAFT{ext}"
+        new_id: int = allocate_ids("versions", db_path, session=session)
+        version_new: Document_Version
+        version_new, _ = version_old.evolve(
+            id=new_id,
+            version=new_version,
+            status="DRAFT",
+            file_path=new_file_path,
+            effective_date=None,
+        )
+        checksum: str = stage_view(
+            version_old.file_path, version_new.file_path, "DRAFT", db_path, session
+        )
+        audit_log_docs(None, version_new, user_id, action, db_path, session)
+        create_version(version_new, db_path, session)
+        set_checksum(new_id, checksum, db_path, session)
@@ -0,0 +1,356 @@
+import sqlite3
+import sys
+import os
+import json
+import time
+import threading
+import functools
+import inspect
+import importlib
+from pathlib import Path
+from types import ModuleType
+from collections.abc import Callable
+from session import PooledConnection, close_pool
+
+traced_modules: list[str] = [
+    "core_actions",
+    "audit_actions",
+    "document_actions",
+    "training_actions",
+]
+file_ops: dict[str, str] = {
+    "file_digest": "hash",
+    "store_blob": "blob",
+    "link_view": "view",
+    "write_copy": "view",
+}
+max_spans: int = 100_000
+script_dir: Path = Path(__file__).resolve().parent
+
+
+class Tracer:
+    def __init__(self) -> None:
+        self.local: threading.local = threading.local()
+        self.lock: threading.Lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        self.origin: float = time.perf_counter()
+        self.spans: list[dict] = []
+        self.dropped_spans: int = 0
+        self.calls: dict[str, dict] = {}
+        self.statements: dict[str, dict] = {}
+        self.files: dict[str, dict] = {}
+        self.connections: int = 0
+
+    def stack(self) -> list[dict]:
+        stack: list[dict] | None = getattr(self.local, "stack", None)
+        if stack is None:
+            stack = []
+            self.local.stack = stack
+        return stack
+
+    def start_span(self, name: str) -> dict:
+        stack: list[dict] = self.stack()
+        span: dict = {
+            "name": name,
+            "start": time.perf_counter(),
+            "depth": len(stack),
+            "thread": threading.get_ident(),
+            "sql": 0,
+            "sql_seconds": 0.0,
+            "connections": 0,
+            "file_ops": 0,
+            "blob_bytes": 0,
+            "views": 0,
+            "file_seconds": 0.0,
+        }
+        stack.append(span)
+        return span
+
+    def end_span(self, span: dict) -> None:
+        stack: list[dict] = self.stack()
+        stack.pop()
+        span["seconds"] = time.perf_counter() - span["start"]
+        with self.lock:
+            totals: dict = self.calls.setdefault(
+                span["name"],
+                {
+                    "calls": 0,
+                    "seconds": 0.0,
+                    "max_seconds": 0.0,
+                    "sql": 0,
+                    "sql_seconds": 0.0,
+                    "connections": 0,
+                    "file_ops": 0,
+                    "blob_bytes": 0,
+                    "views": 0,
+                    "file_seconds": 0.0,
+                },
+            )
+            totals["calls"] += 1
+            totals["max_seconds"] = max(totals["max_seconds"], span["seconds"])
+            for key in (
+                "seconds",
+                "sql",
+                "sql_seconds",
+                "connections",
+                "file_ops",
+                "blob_bytes",
+                "views",
+                "file_seconds",
+            ):
+                totals[key] += span[key]
+            if len(self.spans) < max_spans:
+                self.spans.append(span)
+            else:
+                self.dropped_spans += 1
+
+    def record_sql(self, statement: str, seconds: float) -> None:
+        for span in self.stack():
+            span["sql"] += 1
+            span["sql_seconds"] += seconds
+        key: str = " ".join(statement.split())
+        with self.lock:
+            totals: dict = self.statements.setdefault(key, {"count": 0, "seconds": 0.0})
+            totals["count"] += 1
+            totals["seconds"] += seconds
+
+    def record_connection(self) -> None:
+        for span in self.stack():
+            span["connections"] += 1
+        with self.lock:
+            self.connections += 1
+
+    def record_file(self, op: str, size: int, views: int, seconds: float) -> None:
+        for span in self.stack():
+            span["file_ops"] += 1
+            span["blob_bytes"] += size
+            span["views"] += views
+            span["file_seconds"] += seconds
+        with self.lock:
+            totals: dict = self.files.setdefault(
+                op, {"count": 0, "blob_bytes": 0, "views": 0, "seconds": 0.0}
+            )
+            totals["count"] += 1
+            totals["blob_bytes"] += size
+            totals["views"] += views
+            totals["seconds"] += seconds
+
+
+tracer: Tracer = Tracer()
+
+
+class TracedCursor(sqlite3.Cursor):
+    def execute(self, sql: str, parameters=(), /):
+        start: float = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            tracer.record_sql(sql, time.perf_counter() - start)
+
+    def executemany(self, sql: str, seq_of_parameters, /):
+        start: float = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            tracer.record_sql(sql, time.perf_counter() - start)
+
+
+class TracedConnection(PooledConnection):
+    def cursor(self, factory=TracedCursor):  # type: ignore
+        return super().cursor(factory)
+
+    def execute(self, sql: str, parameters=(), /):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql: str, seq_of_parameters, /):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script: str, /):
+        start: float = time.perf_counter()
+        try:
+            return super().executescript(sql_script)
+        finally:
+            tracer.record_sql(sql_script, time.perf_counter() - start)
+
+
+original_connect: Callable = sqlite3.connect
+patches: list[tuple[ModuleType, str, object]] = []
+
+
+def traced_connect(*args, **kwargs) -> sqlite3.Connection:
+    if kwargs.get("factory", sqlite3.Connection) in (
+        sqlite3.Connection,
+        PooledConnection,
+    ):
+        kwargs["factory"] = TracedConnection
+    tracer.record_connection()
+    return original_connect(*args, **kwargs)
+
+
+def traced_call(func: Callable, name: str) -> Callable:
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        span: dict = tracer.start_span(name)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            tracer.end_span(span)
+
+    return wrapper
+
+
+def traced_file_op(func: Callable, name: str, kind: str) -> Callable:
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        size: int = os.path.getsize(args[0]) if kind == "blob" else 0
+        views: int = 1 if kind == "view" else 0
+        start: float = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            tracer.record_file(name, size, views, time.perf_counter() - start)
+
+    return wrapper
+
+
+def project_modules() -> list[ModuleType]:
+    modules: list[ModuleType] = []
+    for module in list(sys.modules.values()):
+        module_file: str | None = getattr(module, "__file__", None)
+        if module_file and Path(module_file).resolve().parent == script_dir:
+            modules.append(module)
+    return modules
+
+
+def enable(modules: list[str] | None = None) -> None:
+    if patches:
+        return
+    replacements: dict[int, Callable] = {}
+    for module_name in modules or traced_modules:
+        module: ModuleType = importlib.import_module(module_name)
+        for name, value in vars(module).items():
+            if inspect.isfunction(value) and value.__module__ == module_name:
+                replacements[id(value)] = traced_call(value, f"{module_name}.{name}")
+    blob_store: ModuleType = importlib.import_module("blob_store")
+    for name, kind in file_ops.items():
+        func: Callable = getattr(blob_store, name)
+        replacements[id(func)] = traced_file_op(func, name, kind)
+    for module in project_modules():
+        if module.__name__ == __name__:
+            continue
+        for name, value in list(vars(module).items()):
+            replacement: Callable | None = replacements.get(id(value))
+            if replacement is not None:
+                patches.append((module, name, value))
+                setattr(module, name, replacement)
+    patches.append((sqlite3, "connect", sqlite3.connect))
+    sqlite3.connect = traced_connect
+    close_pool()
+    tracer.reset()
+
+
+def disable() -> None:
+    while patches:
+        module, name, value = patches.pop()
+        setattr(module, name, value)
+    close_pool()
+
+
+def write_trace(path: str) -> None:
+    pid: int = os.getpid()
+    events: list[dict] = [
+        {
+            "name": span["name"],
+            "ph": "X",
+            "ts": (span["start"] - tracer.origin) * 1_000_000,
+            "dur": span["seconds"] * 1_000_000,
+            "pid": pid,
+            "tid": span["thread"],
+            "args": {
+                key: span[key]
+                for key in (
+                    "sql",
+                    "sql_seconds",
+                    "connections",
+                    "file_ops",
+                    "blob_bytes",
+                    "views",
+                    "file_seconds",
+                )
+            },
+        }
+        for span in tracer.spans
+    ]
+    trace: dict = {
+        "traceEvents": events,
+        "calls": tracer.calls,
+        "statements": tracer.statements,
+        "files": tracer.files,
+        "connections": tracer.connections,
+        "dropped_spans": tracer.dropped_spans,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(trace, f, indent=2)
+
+
+def label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def write_prometheus(path: str) -> None:
+    lines: list[str] = []
+    call_metrics: list[tuple[str, str, str]] = [
+        ("mediqms_calls_total", "calls", "Calls per instrumented function"),
+        ("mediqms_call_seconds_total", "seconds", "Wall time per function"),
+        ("mediqms_call_sql_statements_total", "sql", "SQL statements per function"),
+        ("mediqms_call_sql_seconds_total", "sql_seconds", "SQL time per function"),
+        (
+            "mediqms_call_connections_total",
+            "connections",
+            "Connections opened per function",
+        ),
+        ("mediqms_call_file_ops_total", "file_ops", "File operations per function"),
+        (
+            "mediqms_call_blob_bytes_total",
+            "blob_bytes",
+            "Unique blob bytes stored per function",
+        ),
+        ("mediqms_call_views_total", "views", "Views placed per function"),
+        ("mediqms_call_file_seconds_total", "file_seconds", "File time per function"),
+    ]
+    for metric, key, help_text in call_metrics:
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} counter")
+        for name, totals in sorted(tracer.calls.items()):
+            lines.append(f'{metric}{{function="{label(name)}"}} {totals[key]}')
+    lines.append("# HELP mediqms_sql_statements_total Executions per SQL statement")
+    lines.append("# TYPE mediqms_sql_statements_total counter")
+    for statement, totals in sorted(tracer.statements.items()):
+        lines.append(
+            f'mediqms_sql_statements_total{{statement="{label(statement)}"}} {totals["count"]}'
+        )
+    lines.append("# HELP mediqms_sql_seconds_total Time per SQL statement")
+    lines.append("# TYPE mediqms_sql_seconds_total counter")
+    for statement, totals in sorted(tracer.statements.items()):
+        lines.append(
+            f'mediqms_sql_seconds_total{{statement="{label(statement)}"}} {totals["seconds"]}'
+        )
+    lines.append("# HELP mediqms_blob_bytes_total Unique blob bytes stored per op")
+    lines.append("# TYPE mediqms_blob_bytes_total counter")
+    for op, totals in sorted(tracer.files.items()):
+        lines.append(f'mediqms_blob_bytes_total{{op="{op}"}} {totals["blob_bytes"]}')
+    lines.append("# HELP mediqms_views_total Views linked or copied per file operation")
+    lines.append("# TYPE mediqms_views_total counter")
+    for op, totals in sorted(tracer.files.items()):
+        lines.append(f'mediqms_views_total{{op="{op}"}} {totals["views"]}')
+    lines.append("# HELP mediqms_file_seconds_total Time per file operation")
+    lines.append("# TYPE mediqms_file_seconds_total counter")
+    for op, totals in sorted(tracer.files.items()):
+        lines.append(f'mediqms_file_seconds_total{{op="{op}"}} {totals["seconds"]}')
+    lines.append("# HELP mediqms_connections_opened_total SQLite connections opened")
+    lines.append("# TYPE mediqms_connections_opened_total counter")
+    lines.append(f"mediqms_connections_opened_total {tracer.connections}")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
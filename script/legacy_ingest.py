@@ -0,0 +1,462 @@
+import os
+import sqlite3
+import sys
+import csv
+import json
+import time
+import argparse
+from pathlib import Path
+from datetime import datetime
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from classes import Document_Header, Document_Version
+from blob_store import put_file, link_view, view_path
+from audit_actions import audit_entry, audit_log_many
+from core_actions import allocate_ids, advance_sequence, user_ids, supersed_docs
+from search import read_content
+from read_cache import invalidate_doc
+from session import Session, connect, open_session
+
+manifest_fields: list[str] = [
+    "doc_num",
+    "title",
+    "type",
+    "owner",
+    "version",
+    "status",
+    "effective_date",
+    "source_file",
+]
+manifest_formats: list[str] = ["csv", "jsonl"]
+legacy_statuses: list[str] = ["RELEASED", "SUPERSEDED", "OBSOLETE"]
+
+
+def read_manifest(path: str, manifest_format: str | None = None) -> list[dict]:
+    manifest_format = manifest_format or path.rsplit(".", 1)[-1].lower()
+    if manifest_format not in manifest_formats:
+        raise ValueError(f"Invalid manifest format: '{manifest_format}'")
+    with open(path, encoding="utf-8", newline="") as f:
+        if manifest_format == "csv":
+            return [dict(record) for record in csv.DictReader(f)]
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def version_key(version: str) -> tuple[int, ...]:
+    return tuple(int(part) for part in version.split("."))
+
+
+def validate_manifest(
+    records: list[dict], source_root: str, owners: dict[str, int]
+) -> tuple[dict[str, list[dict]], list[dict]]:
+    documents: dict[str, list[dict]] = {}
+    errors: list[dict] = []
+    seen: set[tuple[str, str]] = set()
+    for n, record in enumerate(records, 1):
+        doc_num: str = record.get("doc_num") or ""
+        version: str = record.get("version") or ""
+        status: str = record.get("status") or ""
+        effective_date: str | None = record.get("effective_date") or None
+        source: Path = Path(source_root) / (record.get("source_file") or "")
+        try:
+            missing: list[str] = [
+                field
+                for field in manifest_fields
+                if field != "effective_date" and not record.get(field)
+            ]
+            if missing:
+                raise ValueError(f"Missing manifest fields: '{', '.join(missing)}'")
+            if status not in legacy_statuses:
+                raise ValueError(f"Status cannot be imported: '{status}'")
+            if record["owner"] not in owners:
+                raise ValueError(f"Unknown owner: '{record['owner']}'")
+            if effective_date is not None:
+                effective_date = datetime.fromisoformat(effective_date).isoformat()
+            Document_Header(0, doc_num, record["title"], 0, record["type"])
+            Document_Version(
+                0,
+                0,
+                version,
+                status,
+                view_path(doc_num, version, status, source.suffix),
+                effective_date,
+            )
+            if not source.is_file():
+                raise ValueError(f"Source file not found: '{source}'")
+            if (doc_num, version) in seen:
+                raise ValueError(
+                    f"Duplicate version in manifest: '{doc_num}', '{version}'"
+                )
+            rows: list[dict] = documents.get(doc_num, [])
+            if rows and (rows[0]["title"], rows[0]["type"], rows[0]["owner"]) != (
+                record["title"],
+                record["type"],
+                record["owner"],
+            ):
+                raise ValueError(f"Conflicting document header: '{doc_num}'")
+            if status == "RELEASED" and any(
+                row["status"] == "RELEASED" for row in rows
+            ):
+                raise ValueError(f"More than one released version: '{doc_num}'")
+        except ValueError as e:
+            errors.append(
+                {"row": n, "doc_num": doc_num, "version": version, "error": str(e)}
+            )
+            continue
+        seen.add((doc_num, version))
+        documents.setdefault(doc_num, []).append(
+            {
+                **record,
+                "row": n,
+                "effective_date": effective_date,
+                "source": str(source),
+                "view": view_path(doc_num, version, status, source.suffix),
+            }
+        )
+    for rows in documents.values():
+        rows.sort(key=lambda row: version_key(row["version"]))
+    return documents, errors
+
+
+def stage_file(source: str, view: str) -> tuple[str, int, str]:
+    digest: str = put_file(source)
+    link_view(digest, view)
+    return digest, os.path.getsize(source), read_content(view)
+
+
+def existing_versions(
+    doc_nums: list[str], db_path: str
+) -> tuple[
+    dict[str, int],
+    set[tuple[str, str]],
+    dict[str, str],
+    dict[str, tuple[str, str, int]],
+]:
+    doc_ids: dict[str, int] = {}
+    versions: set[tuple[str, str]] = set()
+    released: dict[str, str] = {}
+    headers: dict[str, tuple[str, str, int]] = {}
+    with connect(db_path) as db:
+        for doc_num in doc_nums:
+            for doc_id, title, doc_type, owner_id, version, status in db.execute(
+                "SELECT d.doc_id, d.title, d.type, d.owner_id, v.version, v.status FROM documents d LEFT JOIN versions v ON v.doc = d.doc_id WHERE d.doc_num = ?",
+                (doc_num,),
+            ):
+                doc_ids[doc_num] = doc_id
+                headers[doc_num] = (title, doc_type, owner_id)
+                if version is not None:
+                    versions.add((doc_num, version))
+                if status == "RELEASED":
+                    released[doc_num] = version
+    return doc_ids, versions, released, headers
+
+
+def next_effective_from(
+    doc_id: int, version: str, db_path: str, session: Session
+) -> str | None:
+    with connect(db_path, session) as db:
+        later: list[tuple] = [
+            row
+            for row in db.execute(
+                "SELECT version, effective_from FROM versions WHERE doc = ?",
+                (doc_id,),
+            )
+            if version_key(row[0]) > version_key(version)
+        ]
+    if not later:
+        return None
+    return min(later, key=lambda row: version_key(row[0]))[1]
+
+
+def supersede_released(
+    documents: dict[str, list[dict]],
+    owners: dict[str, int],
+    doc_ids: dict[str, int],
+    db_path: str,
+    session: Session,
+) -> None:
+    for doc_num, rows in documents.items():
+        incoming: list[dict] = [row for row in rows if row["status"] == "RELEASED"]
+        if not incoming or doc_num not in doc_ids:
+            continue
+        with connect(db_path, session) as db:
+            current: tuple | None = db.execute(
+                "SELECT version FROM versions WHERE doc = ? AND status = 'RELEASED'",
+                (doc_ids[doc_num],),
+            ).fetchone()
+        if current is None:
+            continue
+        if version_key(current[0]) >= version_key(incoming[0]["version"]):
+            raise ValueError(
+                f"Newer version already released: '{doc_num}', '{current[0]}'"
+            )
+        supersed_docs(
+            doc_ids[doc_num],
+            owners[incoming[0]["owner"]],
+            db_path,
+            session,
+            incoming[0]["effective_date"],
+        )
+
+
+def ingest_chunk(
+    documents: dict[str, list[dict]],
+    staged: dict[tuple[str, str], tuple[str, int, str]],
+    owners: dict[str, int],
+    doc_ids: dict[str, int],
+    db_path: str,
+    session: Session | None = None,
+) -> int:
+    timestamp: str = datetime.now().isoformat()
+    new_docs: list[str] = [doc_num for doc_num in documents if doc_num not in doc_ids]
+    version_count: int = sum(len(rows) for rows in documents.values())
+    with open_session(db_path, session, immediate=True) as session:
+        db: sqlite3.Connection = session.db  # type: ignore
+        if new_docs:
+            first_doc: int = allocate_ids("documents", db_path, len(new_docs), session)
+            doc_ids = {
+                **doc_ids,
+                **{doc_num: first_doc + n for n, doc_num in enumerate(new_docs)},
+            }
+        supersede_released(documents, owners, doc_ids, db_path, session)
+        first_version: int = allocate_ids("versions", db_path, version_count, session)
+        headers: list[Document_Header] = [
+            Document_Header(
+                doc_ids[doc_num],
+                doc_num,
+                documents[doc_num][0]["title"],
+                owners[documents[doc_num][0]["owner"]],
+                documents[doc_num][0]["type"],
+            )
+            for doc_num in new_docs
+        ]
+        version_rows: list[tuple] = []
+        fts_rows: list[tuple] = []
+        audit_rows: list[tuple] = [
+            audit_entry(
+                "documents",
+                header.id,
+                header.owner,
+                "CREATE",
+                {},
+                dict(header),
+                timestamp,
+            )
+            for header in headers
+        ]
+        version_id: int = first_version
+        for doc_num, rows in documents.items():
+            for index, row in enumerate(rows):
+                digest, _, content = staged[(doc_num, row["version"])]
+                version_obj: Document_Version = Document_Version(
+                    version_id,
+                    doc_ids[doc_num],
+                    row["version"],
+                    row["status"],
+                    row["view"],
+                    row["effective_date"],
+                )
+                following: dict | None = (
+                    rows[index + 1] if index + 1 < len(rows) else None
+                )
+                effective_to: str | None = None
+                if row["status"] == "SUPERSEDED":
+                    effective_to = (
+                        (following["effective_date"] if following is not None else None)
+                        or next_effective_from(
+                            doc_ids[doc_num], row["version"], db_path, session
+                        )
+                        or row.get("retired_date")
+                        or timestamp
+                    )
+                elif row["status"] == "OBSOLETE":
+                    effective_to = row.get("retired_date") or timestamp
+                version_rows.append(
+                    (
+                        *version_obj.to_db_tuple(),
+                        row["effective_date"],
+                        effective_to,
+                        digest,
+                    )
+                )
+                fts_rows.append(
+                    (version_id, doc_num, row["title"], content, row["status"])
+                )
+                audit_rows.append(
+                    audit_entry(
+                        "versions",
+                        version_id,
+                        owners[row["owner"]],
+                        "IMPORT",
+                        {},
+                        {
+                            **dict(version_obj),
+                            "source_file": row["source_file"],
+                            "sha256": digest,
+                        },
+                        timestamp,
+                    )
+                )
+                version_id += 1
+        db.executemany(
+            "INSERT INTO documents (doc_id, doc_num, title, owner_id, type) VALUES (?, ?, ?, ?, ?)",
+            [header.to_db_tuple() for header in headers],
+        )
+        db.executemany(
+            "INSERT INTO versions (version_id, doc, version, status, file_path, effective_date, effective_from, effective_to, checksum) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            version_rows,
+        )
+        db.executemany(
+            "INSERT INTO documents_fts (rowid, doc_num, title, content, status) VALUES (?, ?, ?, ?, ?)",
+            fts_rows,
+        )
+        audit_log_many(audit_rows, db_path, session)
+        for doc_num in documents:
+            invalidate_doc(session, doc_ids[doc_num])
+        highest: dict[str, int] = {}
+        for header in headers:
+            number: int = int(header.number.split("-")[1])
+            highest[header.type] = max(highest.get(header.type, 0), number)
+        for doc_type, number in highest.items():
+            advance_sequence(f"doc_num:{doc_type}", number, db_path, session)
+    return len(version_rows)
+
+
+def ingest_manifest(
+    manifest_path: str,
+    db_path: str,
+    source_root: str | None = None,
+    workers: int | None = None,
+    chunk_docs: int = 500,
+    progress: Callable[[int, int], None] | None = None,
+) -> dict:
+    start: float = time.perf_counter()
+    records: list[dict] = read_manifest(manifest_path)
+    source_root = source_root or str(Path(manifest_path).resolve().parent)
+    owners: dict[str, int] = user_ids(
+        list({record.get("owner") or "" for record in records}), db_path
+    )
+    documents, errors = validate_manifest(records, source_root, owners)
+    doc_nums: list[str] = list(documents)
+    imported: int = 0
+    skipped: int = 0
+    files: int = 0
+    size: int = 0
+    with ProcessPoolExecutor(workers) as pool:
+        for first in range(0, len(doc_nums), chunk_docs):
+            chunk_nums: list[str] = doc_nums[first : first + chunk_docs]
+            doc_ids, done, released, headers = existing_versions(chunk_nums, db_path)
+            chunk: dict[str, list[dict]] = {}
+            for doc_num in chunk_nums:
+                pending: list[dict] = [
+                    row
+                    for row in documents[doc_num]
+                    if (doc_num, row["version"]) not in done
+                ]
+                skipped += len(documents[doc_num]) - len(pending)
+                first_row: dict = documents[doc_num][0]
+                if doc_num in headers and headers[doc_num] != (
+                    first_row["title"],
+                    first_row["type"],
+                    owners[first_row["owner"]],
+                ):
+                    errors.extend(
+                        {
+                            "row": row["row"],
+                            "doc_num": doc_num,
+                            "version": row["version"],
+                            "error": f"Conflicting document header: '{doc_num}'",
+                        }
+                        for row in pending
+                    )
+                    continue
+                stale: list[dict] = [
+                    row
+                    for row in pending
+                    if row["status"] == "RELEASED"
+                    and doc_num in released
+                    and version_key(row["version"]) <= version_key(released[doc_num])
+                ]
+                for row in stale:
+                    errors.append(
+                        {
+                            "row": row["row"],
+                            "doc_num": doc_num,
+                            "version": row["version"],
+                            "error": f"Newer version already released: '{doc_num}', '{released[doc_num]}'",
+                        }
+                    )
+                    pending.remove(row)
+                if pending:
+                    chunk[doc_num] = pending
+            if not chunk:
+                continue
+            keys: list[tuple[str, str]] = [
+                (doc_num, row["version"])
+                for doc_num, rows in chunk.items()
+                for row in rows
+            ]
+            rows_flat: list[dict] = [row for rows in chunk.values() for row in rows]
+            staged: dict[tuple[str, str], tuple[str, int, str]] = dict(
+                zip(
+                    keys,
+                    pool.map(
+                        stage_file,
+                        [row["source"] for row in rows_flat],
+                        [row["view"] for row in rows_flat],
+                        chunksize=32,
+                    ),
+                )
+            )
+            files += len(staged)
+            size += sum(staged_file[1] for staged_file in staged.values())
+            imported += ingest_chunk(chunk, staged, owners, doc_ids, db_path)
+            if progress is not None:
+                progress(imported + skipped, len(records) - len(errors))
+    elapsed: float = time.perf_counter() - start
+    return {
+        "rows": len(records),
+        "imported": imported,
+        "skipped": skipped,
+        "errors": errors,
+        "files": files,
+        "bytes": size,
+        "seconds": elapsed,
+        "rows_per_sec": imported / elapsed if elapsed > 0 else 0.0,
+        "mb_per_sec": size / elapsed / 1_000_000 if elapsed > 0 else 0.0,
+    }
+
+
+def print_progress(done: int, total: int) -> None:
+    sys.stderr.write(f"\r{done}/{total} versions ingested")
+    sys.stderr.flush()
+
+
+if __name__ == "__main__":
+    from config import db_path
+
+    parser = argparse.ArgumentParser(description="Ingest legacy controlled documents")
+    parser.add_argument("manifest")
+    parser.add_argument("--db", default=db_path)
+    parser.add_argument("--source-root")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--chunk-docs", type=int, default=500)
+    args = parser.parse_args()
+    report: dict = ingest_manifest(
+        args.manifest,
+        args.db,
+        args.source_root,
+        args.workers,
+        args.chunk_docs,
+        print_progress,
+    )
+    sys.stderr.write("\n")
+    for error in report["errors"]:
+        sys.stderr.write(
+            f"row {error['row']} ({error['doc_num']} v{error['version']}): {error['error']}\n"
+        )
+    print(
+        f"{report['imported']} versions imported, {report['skipped']} already present, {len(report['errors'])} rejected, "
+        f"{report['files']} files ({report['bytes'] / 1_000_000:.1f}MB) in {report['seconds']:.1f}s "
+        f"({report['rows_per_sec']:.0f} versions/sec, {report['mb_per_sec']:.1f}MB/s)"
+    )
+    sys.exit(1 if report["errors"] else 0)
@@ -1,9 +1,132 @@
-from create_doc import create_new_document
-from doc_actions import doc_action
-from revise_doc import revise_doc
-from config import db_path
-from datetime import datetime
+import sys
+import argparse
+
+
+def cmd_create(args: argparse.Namespace) -> int:
+    from document_actions import create_new_document
+
+    create_new_document(args.title, args.type, args.user, args.db)
+    return 0
+
+
+def cmd_approve(args: argparse.Namespace) -> int:
+    from document_actions import approve_document
+
+    if args.effective_date is None:
+        approve_document(args.user, args.doc_num, args.db, comment=args.comment)
+    else:
+        approve_document(
+            args.user, args.doc_num, args.db, args.effective_date, args.comment
+        )
+    return 0
+
+
+def cmd_reject(args: argparse.Namespace) -> int:
+    from document_actions import reject_doc
+
+    reject_doc(args.user, args.doc_num, args.db, comment=args.comment)
+    return 0
+
+
+def cmd_revise(args: argparse.Namespace) -> int:
+    from document_actions import revise_doc
+
+    revise_doc(args.user, args.doc_num, args.db)
+    return 0
+
+
+def cmd_obsolete(args: argparse.Namespace) -> int:
+    from document_actions import obsolete_doc
+
+    obsolete_doc(args.user, args.doc_num, args.db)
+    return 0
+
+
+def cmd_train(args: argparse.Namespace) -> int:
+    from training_actions import do_training
+
+    do_training(args.user, args.doc_num, args.score, args.db)
+    return 0
+
+
+def cmd_sweep(args: argparse.Namespace) -> int:
+    from training_actions import run_due
+
+    processed: dict = run_due(args.db)
+    print(f"{processed['released']} released, {processed['overdue']} overdue")
+    return 0
+
+
+def cmd_report(args: argparse.Namespace) -> int:
+    from compliance import print_summary
+
+    print_summary(args.db, args.rebuild)
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="mediqms", description="MediQMS commands")
+    parser.add_argument("--db", help="database path, defaults to the configured one")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    create = commands.add_parser("create", help="create a new draft document")
+    create.add_argument("title")
+    create.add_argument("type", help="document type code, e.g. SOP")
+    create.add_argument("--user", required=True, help="owner user name")
+    create.set_defaults(handler=cmd_create)
+
+    approve = commands.add_parser("approve", help="approve the current draft")
+    approve.add_argument("doc_num")
+    approve.add_argument("--user", required=True)
+    approve.add_argument("--effective-date", help="ISO date the version takes effect")
+    approve.add_argument("--comment")
+    approve.set_defaults(handler=cmd_approve)
+
+    reject = commands.add_parser("reject", help="reject the version under review")
+    reject.add_argument("doc_num")
+    reject.add_argument("--user", required=True)
+    reject.add_argument("--comment")
+    reject.set_defaults(handler=cmd_reject)
+
+    revise = commands.add_parser("revise", help="start a revision of a document")
+    revise.add_argument("doc_num")
+    revise.add_argument("--user", required=True)
+    revise.set_defaults(handler=cmd_revise)
+
+    obsolete = commands.add_parser("obsolete", help="obsolete a released document")
+    obsolete.add_argument("doc_num")
+    obsolete.add_argument("--user", required=True)
+    obsolete.set_defaults(handler=cmd_obsolete)
+
+    train = commands.add_parser("train", help="record a training result")
+    train.add_argument("doc_num")
+    train.add_argument("--user", required=True)
+    train.add_argument("--score", type=int, required=True)
+    train.set_defaults(handler=cmd_train)
+
+    sweep = commands.add_parser(
+        "sweep", help="release due versions and mark overdue training"
+    )
+    sweep.set_defaults(handler=cmd_sweep)
+
+    report = commands.add_parser("report", help="training compliance summary")
+    report.add_argument("--rebuild", action="store_true")
+    report.set_defaults(handler=cmd_report)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args: argparse.Namespace = build_parser().parse_args(argv)
+    if args.db is None:
+        from config import db_path
+
+        args.db = db_path
+    try:
+        return args.handler(args)
+    except (ValueError, PermissionError, FileNotFoundError, RuntimeError) as e:
+        sys.stderr.write(f"{args.command}: {e}\n")
+        return 1
 
 
 if __name__ == "__main__":
-    ...
+    sys.exit(main())
@@ -0,0 +1,459 @@
+import sqlite3
+import ast
+import re
+import sys
+from pathlib import Path
+from datetime import datetime
+from collections.abc import Callable
+from config import journal_mode
+
+base_dir: Path = Path(__file__).resolve().parent.parent
+schema_path: str = str(base_dir / "data" / "database" / "schema.sql")
+
+
+def seal_legacy_audit(db: sqlite3.Connection) -> None:
+    from audit_integrity import sign_checkpoint
+
+    cur: sqlite3.Cursor = db.execute(
+        "SELECT log_id, hash FROM audit_log WHERE log_id = (SELECT MAX(log_id) FROM audit_log)"
+    )
+    head: tuple | None = cur.fetchone()
+    cur = db.execute("SELECT count(*) FROM audit_checkpoints")
+    checkpoints: int = cur.fetchone()[0]
+    if head is not None and checkpoints == 0:
+        created_at: str = datetime.now().isoformat()
+        db.execute(
+            "INSERT INTO audit_checkpoints (log_id, chain_hash, created_at, signature) VALUES (?, ?, ?, ?)",
+            (
+                head[0],
+                head[1],
+                created_at,
+                sign_checkpoint(head[0], head[1], created_at),
+            ),
+        )
+
+
+def mark_audit_seal(db: sqlite3.Connection) -> None:
+    from audit_actions import genesis_hash
+    from audit_integrity import query_rows, sign_checkpoint, verify_rows
+
+    db.execute(
+        'ALTER TABLE audit_checkpoints ADD COLUMN "sealed" INTEGER NOT NULL DEFAULT 0'
+    )
+    first: tuple | None = db.execute(
+        "SELECT checkpoint_id, log_id, chain_hash, created_at, signature FROM audit_checkpoints ORDER BY checkpoint_id LIMIT 1"
+    ).fetchone()
+    if first is None:
+        return
+    checkpoint_id, log_id, chain, created_at, signature = first
+    if signature != sign_checkpoint(log_id, chain, created_at):
+        return
+    broken: int | None = verify_rows(db.execute(query_rows, (0, log_id)), genesis_hash)[
+        3
+    ]
+    if broken is not None:
+        db.execute(
+            "UPDATE audit_checkpoints SET sealed = 1, signature = ? WHERE checkpoint_id = ?",
+            (sign_checkpoint(log_id, chain, created_at, True), checkpoint_id),
+        )
+
+
+def build_search_index(db: sqlite3.Connection) -> None:
+    from search import read_content
+
+    db.execute(
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(
+            doc_num UNINDEXED,
+            title,
+            content,
+            status,
+            tokenize = 'unicode61 remove_diacritics 2',
+            prefix = '2 3'
+        )
+        """
+    )
+    cur: sqlite3.Cursor = db.execute(
+        "SELECT v.version_id, d.doc_num, d.title, v.file_path, v.status FROM versions v JOIN documents d ON d.doc_id = v.doc"
+    )
+    db.executemany(
+        "INSERT INTO documents_fts (rowid, doc_num, title, content, status) VALUES (?, ?, ?, ?, ?)",
+        (
+            (version_id, doc_num, title, read_content(file_path), status)
+            for version_id, doc_num, title, file_path, status in cur.fetchall()
+        ),
+    )
+
+
+migrations: list[tuple[int, str, str | Callable[[sqlite3.Connection], None]]] = [
+    (
+        1,
+        "training records, audit checkpoints and overdue index",
+        """
+        CREATE TABLE IF NOT EXISTS training_records(
+            "training_id" INTEGER,
+            "user_id" INTEGER,
+            "version_id" INTEGER,
+            "status" TEXT,
+            "assigned_date" TEXT,
+            "due_date" TEXT,
+            "completion_date" TEXT,
+            "score" INTEGER,
+            "signature_hash" TEXT,
+            PRIMARY KEY("training_id"),
+            FOREIGN KEY("user_id") REFERENCES "users"("user_id"),
+            FOREIGN KEY("version_id") REFERENCES "versions"("version_id")
+        );
+        CREATE TABLE IF NOT EXISTS audit_checkpoints (
+            "checkpoint_id" INTEGER,
+            "log_id" INTEGER,
+            "chain_hash" TEXT,
+            "created_at" TEXT,
+            "signature" TEXT,
+            PRIMARY KEY("checkpoint_id")
+        );
+        CREATE INDEX IF NOT EXISTS idx_training_due ON "training_records"("status", "due_date");
+        """,
+    ),
+    (2, "seal audit rows written before hash chaining", seal_legacy_audit),
+    (
+        3,
+        "production index set",
+        """
+        CREATE INDEX IF NOT EXISTS idx_roles_name ON "roles"("role_name");
+        CREATE INDEX IF NOT EXISTS idx_users_roles_role ON "users_roles"("role", "user");
+        CREATE INDEX IF NOT EXISTS idx_documents_type ON "documents"("type", "doc_id");
+        CREATE INDEX IF NOT EXISTS idx_documents_title ON "documents"("title");
+        CREATE INDEX IF NOT EXISTS idx_versions_doc_status ON "versions"("doc", "status");
+        CREATE INDEX IF NOT EXISTS idx_versions_status ON "versions"("status");
+        CREATE INDEX IF NOT EXISTS idx_training_user ON "training_records"("user_id", "version_id", "status");
+        CREATE INDEX IF NOT EXISTS idx_approvals_version ON "approvals"("version_id", "status");
+        ANALYZE;
+        """,
+    ),
+    (
+        4,
+        "due-event queue for releases and overdue training",
+        """
+        CREATE TABLE IF NOT EXISTS due_events (
+            "kind" TEXT,
+            "record_id" INTEGER,
+            "due_at" TEXT,
+            PRIMARY KEY("kind", "record_id")
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_due_events_due ON "due_events"("due_at");
+
+        CREATE TRIGGER IF NOT EXISTS trg_versions_due AFTER UPDATE OF "status", "effective_date" ON "versions"
+        WHEN new."status" IN ('TRAINING', 'PENDING_RELEASE') AND new."effective_date" IS NOT NULL
+        BEGIN
+            INSERT INTO due_events ("kind", "record_id", "due_at") VALUES ('RELEASE', new."version_id", new."effective_date")
+            ON CONFLICT ("kind", "record_id") DO UPDATE SET "due_at" = excluded."due_at";
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_versions_due_clear AFTER UPDATE OF "status" ON "versions"
+        WHEN new."status" NOT IN ('TRAINING', 'PENDING_RELEASE')
+        BEGIN
+            DELETE FROM due_events WHERE "kind" = 'RELEASE' AND "record_id" = new."version_id";
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_training_due AFTER INSERT ON "training_records"
+        WHEN new."status" IN ('ASSIGNED', 'FAILED')
+        BEGIN
+            INSERT INTO due_events ("kind", "record_id", "due_at") VALUES ('OVERDUE', 0, new."due_date")
+            ON CONFLICT ("kind", "record_id") DO UPDATE SET "due_at" = min("due_at", excluded."due_at");
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_training_due_update AFTER UPDATE OF "status", "due_date" ON "training_records"
+        WHEN new."status" IN ('ASSIGNED', 'FAILED')
+        BEGIN
+            INSERT INTO due_events ("kind", "record_id", "due_at") VALUES ('OVERDUE', 0, new."due_date")
+            ON CONFLICT ("kind", "record_id") DO UPDATE SET "due_at" = min("due_at", excluded."due_at");
+        END;
+        INSERT OR REPLACE INTO due_events ("kind", "record_id", "due_at")
+        SELECT 'RELEASE', "version_id", "effective_date" FROM "versions"
+        WHERE "status" IN ('TRAINING', 'PENDING_RELEASE') AND "effective_date" IS NOT NULL;
+        INSERT OR REPLACE INTO due_events ("kind", "record_id", "due_at")
+        SELECT 'OVERDUE', 0, "next_due" FROM (
+            SELECT min("due_date") AS "next_due" FROM "training_records" WHERE "status" IN ('ASSIGNED', 'FAILED')
+        ) WHERE "next_due" IS NOT NULL;
+        """,
+    ),
+    (
+        5,
+        "sequences for ids and document numbers",
+        """
+        CREATE TABLE IF NOT EXISTS sequences (
+            "name" TEXT,
+            "value" INTEGER,
+            PRIMARY KEY("name")
+        );
+        """,
+    ),
+    (6, "full-text search over titles and content", build_search_index),
+    (
+        7,
+        "audit export indexes",
+        """
+        CREATE INDEX IF NOT EXISTS idx_audit_record ON "audit_log"("table_affected", "record_id", "log_id");
+        CREATE INDEX IF NOT EXISTS idx_audit_user ON "audit_log"("user", "log_id");
+        """,
+    ),
+    (
+        8,
+        "training compliance summary",
+        """
+        CREATE TABLE IF NOT EXISTS training_summary (
+            "version_id" INTEGER,
+            "assigned" INTEGER NOT NULL DEFAULT 0,
+            "failed" INTEGER NOT NULL DEFAULT 0,
+            "completed" INTEGER NOT NULL DEFAULT 0,
+            "overdue" INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY("version_id"),
+            FOREIGN KEY("version_id") REFERENCES "versions"("version_id")
+        );
+        INSERT OR REPLACE INTO training_summary ("version_id", "assigned", "failed", "completed", "overdue")
+        SELECT "version_id", sum("status" = 'ASSIGNED'), sum("status" = 'FAILED'), sum("status" = 'COMPLETED'), sum("status" = 'OVERDUE')
+        FROM "training_records" GROUP BY "version_id";
+        """,
+    ),
+    (
+        9,
+        "currently effective version per document",
+        """
+        CREATE TABLE IF NOT EXISTS current_effective (
+            "doc_id" INTEGER,
+            "version_id" INTEGER NOT NULL,
+            "version" TEXT,
+            "file_path" TEXT,
+            "effective_date" TEXT,
+            PRIMARY KEY("doc_id"),
+            FOREIGN KEY("doc_id") REFERENCES "documents"("doc_id"),
+            FOREIGN KEY("version_id") REFERENCES "versions"("version_id")
+        );
+
+        CREATE TRIGGER IF NOT EXISTS trg_versions_effective AFTER UPDATE OF "status", "file_path", "effective_date" ON "versions"
+        WHEN new."status" = 'RELEASED'
+        BEGIN
+            INSERT INTO current_effective ("doc_id", "version_id", "version", "file_path", "effective_date")
+            VALUES (new."doc", new."version_id", new."version", new."file_path", new."effective_date")
+            ON CONFLICT ("doc_id") DO UPDATE SET "version_id" = excluded."version_id", "version" = excluded."version", "file_path" = excluded."file_path", "effective_date" = excluded."effective_date"
+            WHERE excluded."version_id" >= "version_id";
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_versions_effective_insert AFTER INSERT ON "versions"
+        WHEN new."status" = 'RELEASED'
+        BEGIN
+            INSERT INTO current_effective ("doc_id", "version_id", "version", "file_path", "effective_date")
+            VALUES (new."doc", new."version_id", new."version", new."file_path", new."effective_date")
+            ON CONFLICT ("doc_id") DO UPDATE SET "version_id" = excluded."version_id", "version" = excluded."version", "file_path" = excluded."file_path", "effective_date" = excluded."effective_date"
+            WHERE excluded."version_id" >= "version_id";
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_versions_effective_clear AFTER UPDATE OF "status" ON "versions"
+        WHEN old."status" = 'RELEASED' AND new."status" != 'RELEASED'
+        BEGIN
+            DELETE FROM current_effective WHERE "doc_id" = new."doc" AND "version_id" = new."version_id";
+            INSERT OR IGNORE INTO current_effective ("doc_id", "version_id", "version", "file_path", "effective_date")
+            SELECT "doc", "version_id", "version", "file_path", "effective_date" FROM "versions"
+            WHERE "doc" = new."doc" AND "status" = 'RELEASED' ORDER BY "version_id" DESC LIMIT 1;
+        END;
+
+        INSERT OR REPLACE INTO current_effective ("doc_id", "version_id", "version", "file_path", "effective_date")
+        SELECT "doc", max("version_id"), "version", "file_path", "effective_date" FROM "versions"
+        WHERE "status" = 'RELEASED' GROUP BY "doc";
+        """,
+    ),
+    (
+        10,
+        "version effectivity intervals",
+        """
+        ALTER TABLE "versions" ADD COLUMN "effective_from" TEXT;
+        ALTER TABLE "versions" ADD COLUMN "effective_to" TEXT;
+        CREATE INDEX IF NOT EXISTS idx_versions_effective ON "versions"("doc", "effective_from");
+        UPDATE "versions" SET "effective_from" = coalesce("effective_date", (
+            SELECT min(a."timestamp") FROM "audit_log" a
+            WHERE a."table_affected" = 'versions' AND a."record_id" = "versions"."version_id"
+            AND json_extract(a."new_val", '$.status') = 'RELEASED'
+        ))
+        WHERE "status" IN ('RELEASED', 'SUPERSEDED', 'OBSOLETE');
+        UPDATE "versions" SET "effective_to" = (
+            SELECT min(a."timestamp") FROM "audit_log" a
+            WHERE a."table_affected" = 'versions' AND a."record_id" = "versions"."version_id"
+            AND json_extract(a."new_val", '$.status') IN ('SUPERSEDED', 'OBSOLETE')
+        )
+        WHERE "status" IN ('SUPERSEDED', 'OBSOLETE');
+        """,
+    ),
+    (
+        11,
+        "version checksums and storage scan cache",
+        """
+        ALTER TABLE "versions" ADD COLUMN "checksum" TEXT;
+        CREATE TABLE IF NOT EXISTS file_scan_cache (
+            "path" TEXT PRIMARY KEY,
+            "size" INTEGER,
+            "mtime_ns" INTEGER,
+            "inode" INTEGER,
+            "digest" TEXT
+        ) WITHOUT ROWID;
+        """,
+    ),
+    (12, "mark the legacy audit seal checkpoint", mark_audit_seal),
+    (
+        13,
+        "audit timestamp index for export windows",
+        """
+        CREATE INDEX IF NOT EXISTS idx_audit_timestamp ON "audit_log"("timestamp");
+        """,
+    ),
+]
+
+
+def split_statements(script: str) -> list[str]:
+    statements: list[str] = []
+    buffer: str = ""
+    for line in script.splitlines(keepends=True):
+        buffer += line
+        if sqlite3.complete_statement(buffer):
+            statements.append(buffer)
+            buffer = ""
+    if buffer.strip():
+        statements.append(buffer)
+    return statements
+
+
+def schema_version(db: sqlite3.Connection) -> int:
+    return db.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(db_path: str) -> int:
+    db: sqlite3.Connection = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        current: int = schema_version(db)
+        for version, name, step in migrations:
+            if version <= current:
+                continue
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                if isinstance(step, str):
+                    for statement in split_statements(step):
+                        db.execute(statement)
+                else:
+                    step(db)
+                db.execute(f"PRAGMA user_version = {version}")
+                db.execute("COMMIT")
+            except sqlite3.Error as e:
+                db.execute("ROLLBACK")
+                raise RuntimeError(f"Migration {version} failed: '{name}'") from e
+            current = version
+        db.execute(f"PRAGMA journal_mode = {journal_mode}")
+        return current
+    finally:
+        db.close()
+
+
+query_modules: list[str] = [
+    "core_actions.py",
+    "document_actions.py",
+    "training_actions.py",
+    "audit_actions.py",
+    "search.py",
+    "compliance.py",
+    "training_import.py",
+    "legacy_ingest.py",
+    "audit_export.py",
+]
+
+dynamic_queries: list[str] = [
+    "SELECT version_id, version, status, file_path, effective_date FROM versions WHERE doc = ? AND status = 'TRAINING' ORDER BY version_id DESC LIMIT 1",
+    "UPDATE versions SET status = ?, file_path = ? WHERE version_id = ?",
+    "SELECT MAX(version_id) FROM versions",
+    "SELECT MAX(training_id) FROM training_records",
+    "SELECT user_name, user_id FROM users WHERE user_name IN (?, ?)",
+    "SELECT d.doc_num, max(v.version_id) FROM documents d JOIN versions v ON v.doc = d.doc_id WHERE v.status = 'TRAINING' AND d.doc_num IN (?, ?) GROUP BY d.doc_num",
+    "SELECT log_id FROM audit_log WHERE log_id > ? AND log_id <= ? AND table_affected = ? AND record_id = ? ORDER BY log_id LIMIT ?",
+    "SELECT log_id FROM audit_log WHERE log_id > ? AND log_id <= ? AND user = ? ORDER BY log_id LIMIT ?",
+    "SELECT log_id FROM audit_log WHERE log_id > ? AND log_id <= ? AND timestamp >= ? ORDER BY log_id LIMIT ?",
+]
+
+
+allowed_scans: set[tuple[str, str]] = {
+    ("core_actions.py:released_documents", "d"),
+    ("compliance.py:summary_counts", "training_records"),
+    ("search.py:index_version", "documents_fts"),
+    ("search.py:search_documents", "f"),
+}
+
+
+def definition_name(node: ast.stmt) -> str:
+    if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+        return node.name
+    if isinstance(node, ast.AnnAssign) and isinstance(node.target, ast.Name):
+        return node.target.id
+    if isinstance(node, ast.Assign) and isinstance(node.targets[0], ast.Name):
+        return node.targets[0].id
+    return str(node.lineno)
+
+
+def module_queries(module_path: Path) -> list[tuple[str, str]]:
+    tree: ast.Module = ast.parse(module_path.read_text(encoding="utf-8"))
+    queries: list[tuple[str, str]] = []
+    fragments: set[int] = {
+        id(part)
+        for node in ast.walk(tree)
+        if isinstance(node, ast.JoinedStr)
+        for part in node.values
+    }
+    for definition in tree.body:
+        for node in ast.walk(definition):
+            if not (isinstance(node, ast.Constant) and isinstance(node.value, str)):
+                continue
+            if id(node) in fragments:
+                continue
+            if re.match(r"\s*(SELECT|UPDATE|DELETE|WITH)\s", node.value, re.IGNORECASE):
+                queries.append(
+                    (f"{module_path.name}:{definition_name(definition)}", node.value)
+                )
+    return queries
+
+
+def full_scans(db: sqlite3.Connection, query: str) -> list[str]:
+    plan: list[tuple] = db.execute(
+        f"EXPLAIN QUERY PLAN {query}", [None] * query.count("?")
+    ).fetchall()
+    return [row[3] for row in plan if row[3].startswith("SCAN ")]
+
+
+def check_query_plans(db_path: str | None = None) -> list[tuple[str, str]]:
+    if db_path is None:
+        db: sqlite3.Connection = sqlite3.connect(":memory:")
+        with open(schema_path, encoding="utf-8") as f:
+            db.executescript(f.read())
+    else:
+        db = sqlite3.connect(db_path)
+    queries: list[tuple[str, str]] = [
+        (f"dynamic:{n}", query) for n, query in enumerate(dynamic_queries)
+    ]
+    for module in query_modules:
+        queries.extend(module_queries(Path(__file__).resolve().parent / module))
+    violations: list[tuple[str, str]] = []
+    try:
+        for location, query in queries:
+            for detail in full_scans(db, query):
+                if (location, detail.split()[1]) not in allowed_scans:
+                    violations.append((location, detail))
+    finally:
+        db.close()
+    return violations
+
+
+if __name__ == "__main__":
+    from config import db_path
+
+    if "--check-plans" in sys.argv:
+        found: list[tuple[str, str]] = check_query_plans()
+        for location, detail in found:
+            print(f"{location}: {detail}")
+        sys.exit(1 if found else 0)
+    print(f"Schema version: {migrate(db_path)}")
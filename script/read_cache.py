@@ -0,0 +1,117 @@
+import threading
+from copy import copy
+from collections import OrderedDict
+from session import Session
+
+cache_size: int = 1024
+
+
+class ReadCache:
+    def __init__(self, max_entries: int = cache_size) -> None:
+        self.max_entries: int = max_entries
+        self.entries: OrderedDict[tuple, tuple[int, object]] = OrderedDict()
+        self.groups: dict[int, set[tuple]] = {}
+        self.lock: threading.Lock = threading.Lock()
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self.invalidations: int = 0
+        self.resets: int = 0
+
+    def get(self, key: tuple) -> tuple[int, object] | None:
+        with self.lock:
+            entry: tuple[int, object] | None = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+        return entry[0], copy(entry[1])
+
+    def put(self, key: tuple, group: int, value: object) -> None:
+        with self.lock:
+            self.entries[key] = (group, copy(value))
+            self.entries.move_to_end(key)
+            self.groups.setdefault(group, set()).add(key)
+            while len(self.entries) > self.max_entries:
+                old_key: tuple
+                old_group: int
+                old_key, (old_group, _) = self.entries.popitem(last=False)
+                self.discard(old_key, old_group)
+                self.evictions += 1
+
+    def discard(self, key: tuple, group: int) -> None:
+        keys: set[tuple] | None = self.groups.get(group)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self.groups[group]
+
+    def invalidate(self, group: int) -> None:
+        with self.lock:
+            for key in self.groups.pop(group, set()):
+                if self.entries.pop(key, None) is not None:
+                    self.invalidations += 1
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+            self.groups.clear()
+            self.resets += 1
+
+    def metrics(self) -> dict:
+        lookups: int = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "resets": self.resets,
+        }
+
+
+read_caches: dict[str, ReadCache] = {}
+read_caches_lock: threading.Lock = threading.Lock()
+
+
+def read_cache(db_path: str) -> ReadCache:
+    with read_caches_lock:
+        cache: ReadCache | None = read_caches.get(db_path)
+        if cache is None:
+            cache = ReadCache()
+            read_caches[db_path] = cache
+        return cache
+
+
+def session_cache(session: Session) -> ReadCache:
+    cache: ReadCache = read_cache(session.db_path)
+    if not session.cache_synced:
+        db = session.db
+        data_version: int = db.execute("PRAGMA data_version").fetchone()[0]  # type: ignore
+        if db.cache_version != data_version:  # type: ignore
+            cache.clear()
+            db.cache_version = data_version  # type: ignore
+        session.cache_synced = True
+    return cache
+
+
+def cached_read(session: Session, key: tuple) -> object | None:
+    entry: tuple[int, object] | None = session_cache(session).get(key)
+    if entry is None or entry[0] in session.invalidated:
+        return None
+    return entry[1]
+
+
+def store_read(session: Session, key: tuple, group: int, value: object) -> None:
+    if group not in session.invalidated:
+        session_cache(session).put(key, group, value)
+
+
+def invalidate_doc(session: Session, doc_id: int) -> None:
+    cache: ReadCache = read_cache(session.db_path)
+    cache.invalidate(doc_id)
+    if doc_id not in session.invalidated:
+        session.invalidated.add(doc_id)
+        session.after_commit(lambda: cache.invalidate(doc_id))
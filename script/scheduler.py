@@ -0,0 +1,31 @@
+import sqlite3
+import threading
+from datetime import datetime
+from training_actions import run_due
+from session import connect
+
+
+def seconds_until_next(db_path: str) -> float | None:
+    with connect(db_path) as db:
+        cur: sqlite3.Cursor = db.execute("SELECT MIN(due_at) FROM due_events")
+        next_due: str | None = cur.fetchone()[0]
+    if next_due is None:
+        return None
+    delta: float = (datetime.fromisoformat(next_due) - datetime.now()).total_seconds()
+    return max(delta, 0.0)
+
+
+def run_scheduler(
+    db_path: str, max_sleep: float = 60.0, stop: threading.Event | None = None
+) -> None:
+    stop = stop or threading.Event()
+    while not stop.is_set():
+        run_due(db_path)
+        wait: float | None = seconds_until_next(db_path)
+        stop.wait(max_sleep if wait is None else min(wait, max_sleep))
+
+
+if __name__ == "__main__":
+    from config import db_path
+
+    run_scheduler(db_path)
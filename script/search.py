@@ -0,0 +1,85 @@
+import sqlite3
+import re
+import os
+from pathlib import Path
+from classes import Document_Version
+from blob_store import blob_path
+from config import status_types
+from session import Session, open_session, connect
+
+
+def read_content(file_path: str, source: str | Path | None = None) -> str:
+    source = source or file_path
+    if not file_path.endswith(".txt") or not os.path.exists(source):
+        return ""
+    with open(source, encoding="utf-8", errors="replace") as f:
+        return f.read()
+
+
+def index_version(
+    version_obj: Document_Version, db_path: str, session: Session | None = None
+) -> None:
+    with open_session(db_path, session) as active:
+        digest: str | None = active.staged_views.get(version_obj.file_path)
+        source: Path | None = blob_path(digest) if digest is not None else None
+        active.db.execute(  # type: ignore
+            "DELETE FROM documents_fts WHERE rowid = ?", (version_obj.id,)
+        )
+        active.db.execute(  # type: ignore
+            "INSERT INTO documents_fts (rowid, doc_num, title, content, status) SELECT ?, doc_num, title, ?, ? FROM documents WHERE doc_id = ?",
+            (
+                version_obj.id,
+                read_content(version_obj.file_path, source),
+                version_obj.status,
+                version_obj.doc,
+            ),
+        )
+
+
+def match_expression(query: str, statuses: list[str] | None = None) -> str:
+    terms: list[str] = re.findall(r"\w+", query)
+    if not terms:
+        raise ValueError(f"Search query has no terms: '{query}'")
+    expression: str = (
+        "{title content} : (" + " AND ".join(f'"{term}"*' for term in terms) + ")"
+    )
+    if statuses:
+        for status in statuses:
+            if status not in status_types:
+                raise ValueError(f"Invalid version status: '{status}'")
+        expression += (
+            " AND status : (" + " OR ".join(f'"{status}"' for status in statuses) + ")"
+        )
+    return expression
+
+
+def search_documents(
+    query: str,
+    db_path: str,
+    statuses: list[str] | None = None,
+    limit: int = 20,
+    session: Session | None = None,
+) -> list[dict]:
+    match: str = match_expression(query, statuses)
+    with connect(db_path, session) as db:
+        cur: sqlite3.Cursor = db.execute(
+            """
+            SELECT f.doc_num, f.title, v.version, f.status, f.rank, snippet(documents_fts, 2, '[', ']', '...', 12)
+            FROM documents_fts f
+            JOIN versions v ON v.version_id = f.rowid
+            WHERE documents_fts MATCH ? AND f.rank MATCH 'bm25(0.0, 10.0, 1.0, 0.0)'
+            ORDER BY f.rank LIMIT ?
+            """,
+            (match, limit),
+        )
+        return [
+            {
+                "doc_num": doc_num,
+                "title": title,
+                "version": version,
+                "status": status,
+                "score": score,
+                "snippet": snippet,
+            }
+            for doc_num, title, version, status, score, snippet in cur.fetchall()
+        ]
@@ -0,0 +1,221 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from collections.abc import Callable
+from classes import Document_Version
+from session import Session
+from stats import percentile
+from document_actions import (
+    create_new_document,
+    approve_document,
+    reject_doc,
+    revise_doc,
+    obsolete_doc,
+)
+from training_actions import do_training
+from core_actions import effective_version, released_documents, as_of
+from search import search_documents
+from compliance import compliance_summary
+
+max_samples: int = 10_000
+
+
+class ServiceStats:
+    def __init__(self) -> None:
+        self.submitted: int = 0
+        self.completed: int = 0
+        self.failed: int = 0
+        self.rejected: int = 0
+        self.in_flight: int = 0
+        self.max_depth: int = 0
+        self.waits: list[float] = []
+        self.latencies: list[float] = []
+
+    def record(self, wait: float, latency: float, ok: bool) -> None:
+        if ok:
+            self.completed += 1
+        else:
+            self.failed += 1
+        if len(self.latencies) >= max_samples:
+            del self.waits[: max_samples // 2]
+            del self.latencies[: max_samples // 2]
+        self.waits.append(wait)
+        self.latencies.append(latency)
+
+    def summary(self) -> dict:
+        return {
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "in_flight": self.in_flight,
+            "max_depth": self.max_depth,
+            "wait_p50_ms": percentile(self.waits, 50) * 1000,
+            "wait_p99_ms": percentile(self.waits, 99) * 1000,
+            "latency_p50_ms": percentile(self.latencies, 50) * 1000,
+            "latency_p99_ms": percentile(self.latencies, 99) * 1000,
+        }
+
+
+class QMSService:
+    def __init__(
+        self,
+        db_path: str,
+        readers: int = 4,
+        max_pending: int = 1000,
+        put_timeout: float | None = None,
+    ) -> None:
+        self.db_path: str = db_path
+        self.readers: int = readers
+        self.max_pending: int = max_pending
+        self.put_timeout: float | None = put_timeout
+        self.queue: asyncio.Queue | None = None
+        self.writer: asyncio.Task | None = None
+        self.write_executor: ThreadPoolExecutor | None = None
+        self.read_executor: ThreadPoolExecutor | None = None
+        self.write_stats: ServiceStats = ServiceStats()
+        self.read_stats: ServiceStats = ServiceStats()
+
+    async def start(self) -> None:
+        if self.writer is not None:
+            return
+        self.queue = asyncio.Queue(self.max_pending)
+        self.write_executor = ThreadPoolExecutor(1, "mediqms-writer")
+        self.read_executor = ThreadPoolExecutor(self.readers, "mediqms-reader")
+        self.writer = asyncio.create_task(self.write_loop())
+
+    async def stop(self) -> None:
+        if self.writer is None:
+            return
+        await self.queue.join()  # type: ignore
+        self.writer.cancel()
+        try:
+            await self.writer
+        except asyncio.CancelledError:
+            pass
+        self.writer = None
+        self.write_executor.shutdown()  # type: ignore
+        self.read_executor.shutdown()  # type: ignore
+
+    async def __aenter__(self) -> "QMSService":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.stop()
+
+    async def write_loop(self) -> None:
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        while True:
+            func, args, kwargs, future, queued = await self.queue.get()  # type: ignore
+            started: float = time.perf_counter()
+            self.write_stats.in_flight += 1
+            try:
+                result = await loop.run_in_executor(
+                    self.write_executor,
+                    lambda: func(*args, db_path=self.db_path, **kwargs),
+                )
+            except Exception as e:
+                self.write_stats.record(
+                    started - queued, time.perf_counter() - queued, False
+                )
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                self.write_stats.record(
+                    started - queued, time.perf_counter() - queued, True
+                )
+                if not future.done():
+                    future.set_result(result)
+            finally:
+                self.write_stats.in_flight -= 1
+                self.queue.task_done()  # type: ignore
+
+    async def write(self, func: Callable, *args, **kwargs):
+        if self.writer is None:
+            raise RuntimeError(f"Service is not running: '{self.db_path}'")
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        item: tuple = (func, args, kwargs, future, time.perf_counter())
+        try:
+            await asyncio.wait_for(self.queue.put(item), self.put_timeout)  # type: ignore
+        except asyncio.TimeoutError:
+            self.write_stats.rejected += 1
+            raise RuntimeError(f"Write queue is full: '{func.__name__}'") from None
+        self.write_stats.submitted += 1
+        self.write_stats.max_depth = max(
+            self.write_stats.max_depth, self.queue.qsize()  # type: ignore
+        )
+        return await future
+
+    def run_read(self, func: Callable, args: tuple, kwargs: dict, started: list[float]):
+        started.append(time.perf_counter())
+        with Session(self.db_path, readonly=True) as session:
+            return func(*args, db_path=self.db_path, session=session, **kwargs)
+
+    async def read(self, func: Callable, *args, **kwargs):
+        if self.writer is None:
+            raise RuntimeError(f"Service is not running: '{self.db_path}'")
+        queued: float = time.perf_counter()
+        self.read_stats.submitted += 1
+        self.read_stats.in_flight += 1
+        self.read_stats.max_depth = max(
+            self.read_stats.max_depth, self.read_stats.in_flight
+        )
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        started: list[float] = []
+        try:
+            result = await loop.run_in_executor(
+                self.read_executor, self.run_read, func, args, kwargs, started
+            )
+        except Exception:
+            self.read_stats.record(
+                max(started, default=queued) - queued,
+                time.perf_counter() - queued,
+                False,
+            )
+            raise
+        finally:
+            self.read_stats.in_flight -= 1
+        self.read_stats.record(started[0] - queued, time.perf_counter() - queued, True)
+        return result
+
+    async def create(self, title: str, doc_type: str, user_name: str) -> None:
+        await self.write(create_new_document, title, doc_type, user_name)
+
+    async def approve(self, user: str, doc_num: str, **kwargs) -> None:
+        await self.write(approve_document, user, doc_num, **kwargs)
+
+    async def reject(self, user: str, doc_num: str, **kwargs) -> None:
+        await self.write(reject_doc, user, doc_num, **kwargs)
+
+    async def revise(self, user: str, doc_num: str) -> None:
+        await self.write(revise_doc, user, doc_num)
+
+    async def obsolete(self, user: str, doc_num: str) -> None:
+        await self.write(obsolete_doc, user, doc_num)
+
+    async def train(self, user: str, doc_num: str, score: int) -> None:
+        await self.write(do_training, user, doc_num, score)
+
+    async def effective_version(self, doc_num: str) -> Document_Version:
+        return await self.read(effective_version, doc_num)
+
+    async def released_documents(self) -> list[tuple]:
+        return await self.read(released_documents)
+
+    async def as_of(self, when: str, doc_num: str | None = None) -> list[tuple]:
+        return await self.read(as_of, when, doc_num=doc_num)
+
+    async def search(self, query: str, **kwargs) -> list[dict]:
+        return await self.read(search_documents, query, **kwargs)
+
+    async def compliance_summary(self) -> list[dict]:
+        return await self.read(compliance_summary)
+
+    def metrics(self) -> dict:
+        return {
+            "queue_depth": self.queue.qsize() if self.queue is not None else 0,
+            "max_pending": self.max_pending,
+            "writes": self.write_stats.summary(),
+            "reads": self.read_stats.summary(),
+        }
@@ -0,0 +1,169 @@
+import sqlite3
+import threading
+import time
+import random
+from pathlib import Path
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from config import busy_timeout_ms, journal_mode, write_retries, retry_backoff
+
+pool_size: int = 4
+_pool: dict[tuple[str, bool], list[sqlite3.Connection]] = {}
+_pool_lock: threading.Lock = threading.Lock()
+
+
+class PooledConnection(sqlite3.Connection):
+    cache_version: int | None = None
+
+
+def _acquire(db_path: str, readonly: bool = False) -> sqlite3.Connection:
+    with _pool_lock:
+        idle: list[sqlite3.Connection] = _pool.get((db_path, readonly), [])
+        if idle:
+            return idle.pop()
+    if readonly:
+        return sqlite3.connect(
+            f"{Path(db_path).resolve().as_uri()}?mode=ro",
+            uri=True,
+            isolation_level=None,
+            check_same_thread=False,
+            timeout=busy_timeout_ms / 1000,
+            factory=PooledConnection,
+        )
+    db: sqlite3.Connection = sqlite3.connect(
+        db_path,
+        isolation_level=None,
+        check_same_thread=False,
+        timeout=busy_timeout_ms / 1000,
+        factory=PooledConnection,
+    )
+    current: str = _retry(db, "PRAGMA journal_mode").fetchone()[0]
+    if current.lower() != journal_mode.lower():
+        _retry(db, f"PRAGMA journal_mode = {journal_mode}")
+    return db
+
+
+def _retry(db: sqlite3.Connection, statement: str) -> sqlite3.Cursor:
+    for attempt in range(write_retries + 1):
+        try:
+            return db.execute(statement)
+        except sqlite3.OperationalError as e:
+            if "locked" not in str(e) and "busy" not in str(e):
+                raise
+            if attempt == write_retries:
+                raise
+            time.sleep(retry_backoff * 2**attempt * random.uniform(0.5, 1.5))
+
+
+def _begin(db: sqlite3.Connection, immediate: bool) -> None:
+    if not immediate:
+        db.execute("BEGIN")
+        return
+    _retry(db, "BEGIN IMMEDIATE")
+
+
+def _release(db_path: str, db: sqlite3.Connection, readonly: bool = False) -> None:
+    with _pool_lock:
+        idle: list[sqlite3.Connection] = _pool.setdefault((db_path, readonly), [])
+        if len(idle) < pool_size:
+            idle.append(db)
+            return
+    db.close()
+
+
+def close_pool() -> None:
+    with _pool_lock:
+        for idle in _pool.values():
+            for db in idle:
+                db.close()
+        _pool.clear()
+
+
+class Session:
+    def __init__(
+        self, db_path: str, immediate: bool = False, readonly: bool = False
+    ) -> None:
+        if immediate and readonly:
+            raise ValueError(
+                f"Read-only session cannot take the write lock: '{db_path}'"
+            )
+        self.db_path: str = db_path
+        self.immediate: bool = immediate
+        self.readonly: bool = readonly
+        self.db: sqlite3.Connection | None = None
+        self.depth: int = 0
+        self.callbacks: list[Callable[[], None]] = []
+        self.pre_commit: list[Callable[[], None]] = []
+        self.pending_audit: list[tuple] = []
+        self.invalidated: set[int] = set()
+        self.staged_views: dict[str, str] = {}
+        self.cache_synced: bool = False
+
+    def after_commit(self, callback: Callable[[], None]) -> None:
+        self.callbacks.append(callback)
+
+    def before_commit(self, callback: Callable[[], None]) -> None:
+        self.pre_commit.append(callback)
+
+    def __enter__(self) -> "Session":
+        if self.depth == 0:
+            self.db = _acquire(self.db_path, self.readonly)
+            try:
+                _begin(self.db, self.immediate)
+            except sqlite3.Error:
+                _release(self.db_path, self.db, self.readonly)
+                self.db = None
+                raise
+        self.depth += 1
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.depth -= 1
+        if self.depth > 0:
+            return
+        db: sqlite3.Connection = self.db  # type: ignore
+        callbacks: list[Callable[[], None]] = self.callbacks
+        error: BaseException | None = None
+        if exc_type is None:
+            try:
+                for callback in self.pre_commit:
+                    callback()
+            except BaseException as e:
+                error = e
+        self.db = None
+        self.callbacks = []
+        self.pre_commit = []
+        self.pending_audit = []
+        self.invalidated = set()
+        self.staged_views = {}
+        self.cache_synced = False
+        try:
+            if exc_type is None and error is None:
+                db.execute("COMMIT")
+            elif db.in_transaction:
+                db.execute("ROLLBACK")
+        except sqlite3.Error:
+            db.close()
+            raise
+        _release(self.db_path, db, self.readonly)
+        if error is not None:
+            raise error
+        if exc_type is None:
+            for callback in callbacks:
+                callback()
+
+
+def open_session(
+    db_path: str, session: Session | None = None, immediate: bool = False
+) -> Session:
+    if session is not None:
+        return session
+    return Session(db_path, immediate)
+
+
+@contextmanager
+def connect(
+    db_path: str, session: Session | None = None, immediate: bool = False
+) -> Iterator[sqlite3.Connection]:
+    with open_session(db_path, session, immediate) as active:
+        yield active.db  # type: ignore
@@ -0,0 +1,251 @@
+import os
+import sys
+import time
+import sqlite3
+import argparse
+from pathlib import Path
+from collections.abc import Callable, Iterator
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from blob_store import stage_folders, file_digest
+from session import Session, connect, open_session
+from config import storage_root_path
+
+mutable_statuses: list[str] = ["DRAFT"]
+scan_chunk: int = 5_000
+
+
+def walk_files(folder: Path) -> Iterator[str]:
+    try:
+        entries: list[os.DirEntry] = list(os.scandir(folder))
+    except FileNotFoundError:
+        return
+    for entry in entries:
+        if entry.name.startswith("."):
+            continue
+        if entry.is_dir(follow_symlinks=False):
+            yield from walk_files(Path(entry.path))
+        else:
+            yield os.path.abspath(entry.path)
+
+
+def stored_files(storage_root: str) -> set[str]:
+    files: set[str] = set()
+    for folder in sorted(set(stage_folders.values())):
+        files.update(walk_files(Path(storage_root) / folder))
+    return files
+
+
+def file_key(file_path: str) -> tuple[int, int, int] | None:
+    try:
+        st: os.stat_result = os.stat(file_path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns, st.st_ino
+
+
+def load_scan_cache(
+    db_path: str, session: Session | None = None
+) -> dict[str, tuple[int, int, int, str]]:
+    with connect(db_path, session) as db:
+        cur: sqlite3.Cursor = db.execute(
+            "SELECT path, size, mtime_ns, inode, digest FROM file_scan_cache"
+        )
+        return {row[0]: row[1:] for row in cur}
+
+
+def save_scan_cache(
+    entries: list[tuple],
+    stale: list[str],
+    db_path: str,
+    session: Session | None = None,
+) -> None:
+    with connect(db_path, session) as db:
+        db.executemany(
+            "INSERT OR REPLACE INTO file_scan_cache (path, size, mtime_ns, inode, digest) VALUES (?, ?, ?, ?, ?)",
+            entries,
+        )
+        db.executemany(
+            "DELETE FROM file_scan_cache WHERE path = ?", [(path,) for path in stale]
+        )
+
+
+def scan_storage(
+    db_path: str,
+    storage_root: str = storage_root_path,
+    workers: int | None = None,
+    processes: bool = False,
+    full: bool = False,
+    backfill: bool = False,
+    progress: Callable[[int, int], None] | None = None,
+) -> dict:
+    start: float = time.perf_counter()
+    with connect(db_path) as db:
+        versions: list[tuple] = db.execute(
+            """
+            SELECT v.version_id, d.doc_num, v.version, v.status, v.file_path, v.checksum
+            FROM versions v
+            JOIN documents d ON d.doc_id = v.doc
+            ORDER BY v.version_id
+            """
+        ).fetchall()
+    cache: dict[str, tuple[int, int, int, str]] = (
+        {} if full else load_scan_cache(db_path)
+    )
+    files: set[str] = stored_files(storage_root)
+    referenced: set[str] = set()
+    missing: list[dict] = []
+    misplaced: list[dict] = []
+    unverified: list[dict] = []
+    pending: dict[tuple[int, int, int], list[str]] = {}
+    digests: dict[str, str] = {}
+    for row in versions:
+        version_id, doc_num, version, status, file_path, checksum = row
+        entry: dict = {
+            "version_id": version_id,
+            "doc_num": doc_num,
+            "version": version,
+            "status": status,
+            "file_path": file_path,
+        }
+        path: str = os.path.abspath(file_path)
+        referenced.add(path)
+        key: tuple[int, int, int] | None = file_key(path)
+        if key is None:
+            missing.append(entry)
+            continue
+        if Path(path).parent.name != stage_folders.get(status):
+            misplaced.append({**entry, "expected_folder": stage_folders.get(status)})
+        if status in mutable_statuses:
+            continue
+        if checksum is None and not backfill:
+            unverified.append(entry)
+            continue
+        cached: tuple[int, int, int, str] | None = cache.get(path)
+        if cached is not None and cached[:3] == key:
+            digests[path] = cached[3]
+        else:
+            pending.setdefault(key, []).append(path)
+    hashed: int = 0
+    hashed_bytes: int = 0
+    cache_entries: list[tuple] = []
+    executor: Executor = (
+        ProcessPoolExecutor(workers) if processes else ThreadPoolExecutor(workers)
+    )
+    keys: list[tuple[int, int, int]] = list(pending)
+    with executor:
+        for first in range(0, len(keys), scan_chunk):
+            chunk: list[tuple[int, int, int]] = keys[first : first + scan_chunk]
+            results: Iterator[str] = executor.map(
+                file_digest, [pending[key][0] for key in chunk], chunksize=64
+            )
+            for key, digest in zip(chunk, results):
+                for path in pending[key]:
+                    digests[path] = digest
+                    cache_entries.append((path, *key, digest))
+                hashed += 1
+                hashed_bytes += key[0]
+            if progress is not None:
+                progress(first + len(chunk), len(keys))
+    modified: list[dict] = []
+    backfilled: list[tuple[str, int]] = []
+    for version_id, doc_num, version, status, file_path, checksum in versions:
+        path = os.path.abspath(file_path)
+        digest: str | None = digests.get(path)
+        if digest is None:
+            continue
+        if checksum is None:
+            backfilled.append((digest, version_id))
+        elif digest != checksum:
+            modified.append(
+                {
+                    "version_id": version_id,
+                    "doc_num": doc_num,
+                    "version": version,
+                    "status": status,
+                    "file_path": file_path,
+                    "checksum": checksum,
+                    "digest": digest,
+                }
+            )
+    stale: list[str] = [
+        path for path in cache if path not in files and path not in referenced
+    ]
+    with open_session(db_path, immediate=True) as session:
+        save_scan_cache(cache_entries, stale, db_path, session)
+        with connect(db_path, session) as db:
+            db.executemany(
+                "UPDATE versions SET checksum = ? WHERE version_id = ? AND checksum IS NULL",
+                backfilled,
+            )
+    elapsed: float = time.perf_counter() - start
+    return {
+        "versions": len(versions),
+        "files": len(files),
+        "hashed": hashed,
+        "cached": len(digests) - len(cache_entries),
+        "hashed_bytes": hashed_bytes,
+        "backfilled": len(backfilled),
+        "missing": missing,
+        "misplaced": misplaced,
+        "modified": modified,
+        "orphaned": sorted(files - referenced),
+        "unverified": unverified,
+        "seconds": elapsed,
+        "mb_per_sec": hashed_bytes / elapsed / 1_000_000 if elapsed > 0 else 0.0,
+    }
+
+
+def print_progress(done: int, total: int) -> None:
+    sys.stderr.write(f"\r{done}/{total} files hashed")
+    sys.stderr.flush()
+
+
+if __name__ == "__main__":
+    from config import db_path
+
+    parser = argparse.ArgumentParser(description="Verify controlled document storage")
+    parser.add_argument("--db", default=db_path)
+    parser.add_argument("--storage-root", default=storage_root_path)
+    parser.add_argument("--workers", type=int)
+    parser.add_argument(
+        "--processes", action="store_true", help="hash in processes, not threads"
+    )
+    parser.add_argument(
+        "--full", action="store_true", help="ignore the scan cache and rehash"
+    )
+    parser.add_argument(
+        "--backfill", action="store_true", help="record checksums that are missing"
+    )
+    args = parser.parse_args()
+    report: dict = scan_storage(
+        args.db,
+        args.storage_root,
+        args.workers,
+        args.processes,
+        args.full,
+        args.backfill,
+        print_progress,
+    )
+    sys.stderr.write("\n")
+    for entry in report["missing"]:
+        print(f"missing: {entry['doc_num']} v{entry['version']} {entry['file_path']}")
+    for entry in report["misplaced"]:
+        print(
+            f"misplaced: {entry['doc_num']} v{entry['version']} {entry['status']} not in {entry['expected_folder']}: {entry['file_path']}"
+        )
+    for entry in report["modified"]:
+        print(
+            f"modified: {entry['doc_num']} v{entry['version']} {entry['file_path']} ({entry['checksum'][:12]} != {entry['digest'][:12]})"
+        )
+    for path in report["orphaned"]:
+        print(f"orphaned: {path}")
+    print(
+        f"{report['versions']} versions, {report['files']} files: {len(report['missing'])} missing, "
+        f"{len(report['misplaced'])} misplaced, {len(report['modified'])} modified, {len(report['orphaned'])} orphaned, "
+        f"{len(report['unverified'])} without checksum; {report['hashed']} hashed, {report['cached']} cached "
+        f"in {report['seconds']:.1f}s ({report['mb_per_sec']:.1f}MB/s)"
+    )
+    problems: int = sum(
+        len(report[name]) for name in ["missing", "misplaced", "modified", "orphaned"]
+    )
+    sys.exit(1 if problems else 0)
@@ -0,0 +1,170 @@
+import os
+import sqlite3
+import tempfile
+import time
+import argparse
+import multiprocessing
+from datetime import datetime, timedelta
+from stats import percentile
+
+invariant_queries: dict[str, str] = {
+    "duplicate doc_num": "SELECT doc_num FROM documents GROUP BY doc_num HAVING count(*) > 1",
+    "duplicate training assignment": "SELECT user_id, version_id FROM training_records GROUP BY user_id, version_id HAVING count(*) > 1",
+    "completed training without signature": "SELECT training_id FROM training_records WHERE status = 'COMPLETED' AND signature_hash IS NULL",
+    "version without creation audit": """
+        SELECT v.version_id FROM versions v
+        WHERE NOT EXISTS (
+            SELECT 1 FROM audit_log a
+            WHERE a.table_affected = 'versions' AND a.record_id = v.version_id AND a.action IN ('CREATE', 'REVISE')
+        )
+        """,
+    "training version without QM approval": """
+        SELECT v.version_id FROM versions v
+        WHERE v.status = 'TRAINING' AND NOT EXISTS (
+            SELECT 1 FROM approvals ap
+            WHERE ap.version_id = v.version_id AND ap.role_signing = 'QUALITY_MANAGER' AND ap.status = 'APPROVED'
+        )
+        """,
+}
+
+
+def stress_worker(
+    db_path: str, worker: int, iterations: int, trainees: list[str]
+) -> dict:
+    from document_actions import create_new_document, approve_document
+    from training_actions import do_training
+
+    latencies: dict[str, list[float]] = {"create": [], "approve": [], "train": []}
+    errors: list[str] = []
+    effective_date: str = (datetime.now() + timedelta(days=20)).isoformat()
+
+    def timed(op: str, func, *args) -> bool:
+        start: float = time.perf_counter()
+        try:
+            func(*args)
+        except Exception as e:
+            errors.append(f"{op}: {type(e).__name__}: {e}")
+            return False
+        latencies[op].append(time.perf_counter() - start)
+        return True
+
+    for i in range(iterations):
+        title: str = f"Stress SOP {worker}-{i}"
+        if not timed(
+            "create", create_new_document, title, "SOP", "albert.sevilleja", db_path
+        ):
+            continue
+        with sqlite3.connect(db_path) as db:
+            doc_num: str = db.execute(
+                "SELECT doc_num FROM documents WHERE title = ?", (title,)
+            ).fetchone()[0]
+        if not timed("approve", approve_document, "albert.sevilleja", doc_num, db_path):
+            continue
+        if not timed(
+            "approve", approve_document, "gus.fring", doc_num, db_path, effective_date
+        ):
+            continue
+        for trainee in trainees:
+            timed("train", do_training, trainee, doc_num, 90, db_path)
+    return {"latencies": latencies, "errors": errors}
+
+
+def check_invariants(db_path: str, expected_docs: int, expected_completed: int) -> list:
+    from audit_integrity import verify_full
+    from compliance import summary_drift
+
+    violations: list[str] = []
+    with sqlite3.connect(db_path) as db:
+        for name, query in invariant_queries.items():
+            rows: list[tuple] = db.execute(query).fetchall()
+            if rows:
+                violations.append(f"{name}: {len(rows)} rows")
+        documents: int = db.execute("SELECT count(*) FROM documents").fetchone()[0]
+        completed: int = db.execute(
+            "SELECT count(*) FROM training_records WHERE status = 'COMPLETED'"
+        ).fetchone()[0]
+    if documents != expected_docs:
+        violations.append(f"documents: expected {expected_docs}, found {documents}")
+    if completed != expected_completed:
+        violations.append(
+            f"completed training: expected {expected_completed}, found {completed}"
+        )
+    chain: dict = verify_full(db_path)
+    if not chain["ok"]:
+        violations.append(f"audit chain broken at log_id {chain['broken_log_id']}")
+    drift: list[tuple] = summary_drift(db_path)
+    if drift:
+        violations.append(f"training summary drift: {len(drift)} versions")
+    return violations
+
+
+def run_stress(workers: int = 4, iterations: int = 20, employees: int = 25) -> dict:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        os.environ["MEDIQMS_STORAGE_ROOT"] = os.path.join(tmp_dir, "storage")
+        from benchmark import build_training_db
+
+        db_path: str = os.path.join(tmp_dir, "stress.db")
+        build_training_db(db_path, employees)
+        with sqlite3.connect(db_path) as db:
+            db.execute("DELETE FROM versions")
+            db.execute("DELETE FROM documents")
+            trainees: list[str] = [
+                row[0]
+                for row in db.execute(
+                    "SELECT u.user_name FROM users u JOIN users_roles ur ON ur.user = u.user_id WHERE ur.role = 5 AND u.active_flag = 1"
+                )
+            ]
+        context = multiprocessing.get_context("spawn")
+        start: float = time.perf_counter()
+        with context.Pool(workers) as pool:
+            results: list[dict] = pool.starmap(
+                stress_worker,
+                [(db_path, worker, iterations, trainees) for worker in range(workers)],
+            )
+        elapsed: float = time.perf_counter() - start
+        errors: list[str] = [error for result in results for error in result["errors"]]
+        report: dict = {
+            "workers": workers,
+            "seconds": elapsed,
+            "errors": len(errors),
+            "error_samples": errors[:5],
+        }
+        total_ops: int = 0
+        for op in ("create", "approve", "train"):
+            samples: list[float] = [
+                sample for result in results for sample in result["latencies"][op]
+            ]
+            total_ops += len(samples)
+            report[op] = {
+                "count": len(samples),
+                "p50_ms": percentile(samples, 50) * 1000,
+                "p99_ms": percentile(samples, 99) * 1000,
+            }
+        report["ops_per_sec"] = total_ops / elapsed if elapsed > 0 else 0.0
+        report["violations"] = check_invariants(
+            db_path, workers * iterations, workers * iterations * len(trainees)
+        )
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent workflow stress test")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--employees", type=int, default=25)
+    args = parser.parse_args()
+    result: dict = run_stress(args.workers, args.iterations, args.employees)
+    print(
+        f"{result['workers']} workers, {result['ops_per_sec']:.1f} ops/sec, {result['errors']} errors"
+    )
+    for op in ("create", "approve", "train"):
+        stats: dict = result[op]
+        print(
+            f"  {op}: n={stats['count']} p50={stats['p50_ms']:.1f}ms p99={stats['p99_ms']:.1f}ms"
+        )
+    for sample in result["error_samples"]:
+        print(f"  error: {sample}")
+    for violation in result["violations"]:
+        print(f"  VIOLATION: {violation}")
+    if not result["violations"]:
+        print("  invariants: ok")
@@ -1,118 +1,340 @@
 import sqlite3
-import os
-import shutil
+import time
 from types import FunctionType
-from copy import deepcopy
+from collections.abc import Iterable
 from datetime import datetime
-from classes import Training, Document_Header, Document_Version
-from audit_actions import audit_log_training, audit_log_docs
+from classes import Training, Document_Header, Document_Version, ChangeSet
+from audit_actions import (
+    audit_log_changes,
+    change_audit_entry,
+    audit_entry,
+    audit_log_many,
+)
 from core_actions import (
-    update_db,
+    update_version,
     get_training,
     version_info,
     doc_info,
     get_training_users,
-    max_id,
-    inital_trining,
+    allocate_ids,
+    bulk_initial_training,
     update_training,
-    get_active_training,
+    bulk_update_training,
+    user_ids,
+    training_versions,
+    open_training,
+    mark_overdue,
+    adjust_training_summary,
     get_user_id,
     supersed_docs,
+    set_effectivity,
+    set_checksum,
+    stage_view,
+    has_view,
+    due_events,
+    has_due_events,
+    reschedule_overdue,
+    drop_due_event,
 )
 from config import db_path
+from session import Session, open_session, connect
 
 
 def doc_action(action: str) -> FunctionType:  # type: ignore
     if action == "TRAINING":
-        lazy_check(db_path=db_path)
-        check_overdue(db_path=db_path)
+        run_due(db_path=db_path)
         return do_training
     else:
         raise ValueError("Action does not exist")
 
 
 def assign_training(
-    doc_num: str, efective_date: str, user_assigning: int, db_path: str
-):
+    doc_num: str,
+    efective_date: str,
+    user_assigning: int,
+    db_path: str,
+    session: Session | None = None,
+) -> dict:
     action: str = "ASSING"
-    parent_doc: Document_Header = doc_info(doc_num, db_path)
-    version_training: Document_Version = version_info(
-        parent_doc.id, db_path, ["status", "TRAINING"]
-    )
-    users_to_train: list[int] = get_training_users(db_path)
-    for user in users_to_train:
-        new_training: Training = Training(
-            max_id("training_records", "training_id", db_path) + 1,
-            user,
-            version_training.id,
-            "ASSIGNED",
-            datetime.now().isoformat(),
-            efective_date,
+    start: float = time.perf_counter()
+    with open_session(db_path, session, immediate=True) as session:
+        parent_doc: Document_Header = doc_info(doc_num, db_path, session)
+        version_training: Document_Version = version_info(
+            parent_doc.id, db_path, ["status", "TRAINING"], session
+        )
+        users_to_train: list[int] = get_training_users(db_path, session)
+        first_id: int = allocate_ids(
+            "training_records", db_path, len(users_to_train), session
+        )
+        assigned_date: str = datetime.now().isoformat()
+        due_date: str = datetime.fromisoformat(efective_date).isoformat()
+        training_rows: list[tuple] = []
+        audit_rows: list[tuple] = []
+        for offset, user in enumerate(users_to_train):
+            training_id: int = first_id + offset
+            training_rows.append(
+                (
+                    training_id,
+                    user,
+                    version_training.id,
+                    "ASSIGNED",
+                    assigned_date,
+                    due_date,
+                    None,
+                    None,
+                )
+            )
+            new_val: dict = {
+                "training_id": training_id,
+                "user_id": user,
+                "version_id": version_training.id,
+                "status": "ASSIGNED",
+                "assigned_date": assigned_date,
+                "due_date": due_date,
+            }
+            audit_rows.append(
+                audit_entry(
+                    "training_records",
+                    training_id,
+                    user_assigning,
+                    action,
+                    {},
+                    new_val,
+                    assigned_date,
+                )
+            )
+        bulk_initial_training(training_rows, db_path, session)
+        adjust_training_summary(
+            {version_training.id: {"ASSIGNED": len(training_rows)}}, db_path, session
         )
-        inital_trining(new_training, db_path)
-        audit_log_training(None, new_training, user_assigning, action, db_path)
+        audit_log_many(audit_rows, db_path, session)
+    elapsed: float = time.perf_counter() - start
+    rows: int = len(users_to_train)
+    return {
+        "rows": rows,
+        "seconds": elapsed,
+        "rows_per_sec": rows / elapsed if elapsed > 0 else 0.0,
+    }
 
 
-def do_training(user: str, doc_num: str, score: int, db_path: str) -> None:
-    user_id: int = get_user_id(user, db_path)
-    old_training_obj: Training = get_training(user_id, doc_num, db_path)
-    new_training_obj: Training = deepcopy(old_training_obj)
-    new_training_obj.score = score
-    if score > 70:
-        new_training_obj.status = "COMPLETED"
-        new_training_obj.completion_date = datetime.now()
+def do_training(
+    user: str, doc_num: str, score: int, db_path: str, session: Session | None = None
+) -> None:
+    with open_session(db_path, session, immediate=True) as session:
+        user_id: int = get_user_id(user, db_path, session)
+        old_training_obj: Training = get_training(user_id, doc_num, db_path, session)
+        new_training_obj: Training
+        changes: ChangeSet
+        if score > 70:
+            new_training_obj, changes = old_training_obj.evolve(
+                status="COMPLETED", completion_date=datetime.now(), score=score
+            )
+        else:
+            new_training_obj, changes = old_training_obj.evolve(
+                status="FAILED", score=score
+            )
+        audit_log_changes(changes, user_id, new_training_obj.status, db_path, session)
+        update_training(new_training_obj, db_path, session)
+        if old_training_obj.status != new_training_obj.status:
+            adjust_training_summary(
+                {
+                    new_training_obj.version_id: {
+                        old_training_obj.status: -1,
+                        new_training_obj.status: 1,
+                    }
+                },
+                db_path,
+                session,
+            )
 
-    else:
-        new_training_obj.status = "FAILED"
-    audit_log_training(
-        old_training_obj,
-        new_training_obj,
-        user_id,
-        new_training_obj.status,
-        db_path,
-    )
-    update_training(new_training_obj, db_path)
-
-
-def check_overdue(db_path: str) -> None:
-    active_training: list[tuple] = get_active_training(db_path)
-    if len(active_training) >= 1:
-        for active in active_training:
-            training_event: Training = Training(*active)
-            if training_event.due_date < datetime.now():
-                new_training: Training = deepcopy(training_event)
-                new_training.status = "OVERDUE"
-                update_training(new_training, db_path)
-                audit_log_training(
-                    training_event, new_training, 0, "AUTO_OVERDUE", db_path
+
+def do_training_batch(
+    results: Iterable[tuple[str, str, int]],
+    db_path: str,
+    session: Session | None = None,
+    strict: bool = False,
+) -> dict:
+    rows: list[tuple] = list(results)
+    errors: list[dict] = []
+    applied: list[tuple[Training, Training, ChangeSet]] = []
+    with open_session(db_path, session, immediate=True) as session:
+        users: dict[str, int] = user_ids(
+            list({row[0] for row in rows}), db_path, session
+        )
+        versions: dict[str, int] = training_versions(
+            list({row[1] for row in rows}), db_path, session
+        )
+        resolved: list[tuple[int, int] | None] = [
+            (
+                (users[user], versions[doc_num])
+                if user in users and doc_num in versions
+                else None
+            )
+            for user, doc_num, _ in rows
+        ]
+        records: dict[tuple[int, int], tuple] = open_training(
+            [pair for pair in resolved if pair is not None], db_path, session
+        )
+        seen: set[tuple[int, int]] = set()
+        completion_date: datetime = datetime.now()
+        for n, ((user, doc_num, score), pair) in enumerate(zip(rows, resolved), 1):
+            error: str | None = None
+            if user not in users:
+                error = f"Unknown user: '{user}'"
+            elif doc_num not in versions:
+                error = f"No training version for document: '{doc_num}'"
+            elif isinstance(score, bool) or not isinstance(score, int):
+                error = f"Invalid score: '{score}'"
+            elif not 0 <= score <= 100:
+                error = f"Score out of range: '{score}'"
+            elif pair in seen:
+                error = f"Duplicate result for user and document: '{user}', '{doc_num}'"
+            elif pair not in records:
+                error = f"No training for user and document: '{user}', '{doc_num}'"
+            if error is not None:
+                errors.append(
+                    {"row": n, "user": user, "doc_num": doc_num, "error": error}
                 )
+                continue
+            seen.add(pair)  # type: ignore
+            old_training_obj: Training = Training(*records[pair])  # type: ignore
+            if score > 70:
+                new_training_obj, changes = old_training_obj.evolve(
+                    status="COMPLETED", completion_date=completion_date, score=score
+                )
+            else:
+                new_training_obj, changes = old_training_obj.evolve(
+                    status="FAILED", score=score
+                )
+            applied.append((old_training_obj, new_training_obj, changes))
+        if strict and errors:
+            applied = []
+        timestamp: str = datetime.now().isoformat()
+        audit_rows: list[tuple] = [
+            change_audit_entry(
+                changes,
+                new_training_obj.user_id,
+                new_training_obj.status,
+                timestamp,
+            )
+            for _, new_training_obj, changes in applied
+        ]
+        audit_log_many(audit_rows, db_path, session)
+        bulk_update_training(
+            [new_training_obj for _, new_training_obj, _ in applied], db_path, session
+        )
+        deltas: dict[int, dict[str, int]] = {}
+        for old_training_obj, new_training_obj, _ in applied:
+            if old_training_obj.status == new_training_obj.status:
+                continue
+            delta: dict[str, int] = deltas.setdefault(new_training_obj.version_id, {})
+            delta[old_training_obj.status] = delta.get(old_training_obj.status, 0) - 1
+            delta[new_training_obj.status] = delta.get(new_training_obj.status, 0) + 1
+        adjust_training_summary(deltas, db_path, session)
+    return {
+        "rows": len(rows),
+        "completed": sum(1 for _, new, _ in applied if new.status == "COMPLETED"),
+        "failed": sum(1 for _, new, _ in applied if new.status == "FAILED"),
+        "errors": errors,
+    }
+
+
+def check_overdue(db_path: str, session: Session | None = None) -> int:
+    now: str = datetime.now().isoformat()
+    with open_session(db_path, session, immediate=True) as session:
+        overdue: list[tuple] = mark_overdue(now, db_path, session)
+        if len(overdue) >= 1:
+            audit_rows: list[tuple] = [
+                audit_entry(
+                    "training_records",
+                    training_id,
+                    0,
+                    "AUTO_OVERDUE",
+                    {"status": old_status},
+                    {"status": "OVERDUE"},
+                    now,
+                )
+                for training_id, old_status, _ in overdue
+            ]
+            audit_log_many(audit_rows, db_path, session)
+            deltas: dict[int, dict[str, int]] = {}
+            for _, old_status, version_id in overdue:
+                changes: dict[str, int] = deltas.setdefault(version_id, {})
+                changes[old_status] = changes.get(old_status, 0) - 1
+                changes["OVERDUE"] = changes.get("OVERDUE", 0) + 1
+            adjust_training_summary(deltas, db_path, session)
+        reschedule_overdue(now, db_path, session)
+    return len(overdue)
 
 
-def lazy_check(db_path: str):
-    query: str = (
-        "SELECT * FROM versions WHERE status IN ('TRAINING', 'PENDING_RELEASE')"
+def release_version(
+    old_version: Document_Version, db_path: str, session: Session | None = None
+) -> None:
+    released_at: str = old_version.effective_date or datetime.now().isoformat()
+    major_v: int = int(old_version.version.split(".")[0])
+    if major_v > 1:
+        supersed_docs(old_version.doc, 0, db_path, session, released_at)
+    new_version: Document_Version
+    changes: ChangeSet
+    new_version, changes = old_version.evolve(
+        status="RELEASED",
+        file_path=old_version.file_path.replace("_TRAINING", "")
+        .replace("_PENDING_RELEASE", "")
+        .replace("02_pending_approval", "03_released"),
     )
-    with sqlite3.connect(db_path) as db:
-        cur: sqlite3.Cursor = db.cursor()
-        cur.execute(query)
-        res: list[tuple] = cur.fetchall()
+    if has_view(old_version.file_path, session):
+        set_checksum(
+            new_version.id,
+            stage_view(
+                old_version.file_path,
+                new_version.file_path,
+                "RELEASED",
+                db_path,
+                session,
+                move=True,
+            ),
+            db_path,
+            session,
+        )
+    audit_log_changes(changes, 0, "AUTO_RELEASE", db_path, session)
+    update_version(changes, new_version, db_path, session)
+    set_effectivity(new_version.id, db_path, session, effective_from=released_at)
+
+
+def lazy_check(db_path: str, session: Session | None = None):
+    query: str = "SELECT version_id, doc, version, status, file_path, effective_date FROM versions WHERE status IN ('TRAINING', 'PENDING_RELEASE')"
+    with open_session(db_path, session, immediate=True) as session:
+        with connect(db_path, session) as db:
+            cur: sqlite3.Cursor = db.cursor()
+            cur.execute(query)
+            res: list[tuple] = cur.fetchall()
         if len(res) >= 1:
             for i in res:
                 old_version: Document_Version = Document_Version(*i)
-                new_version: Document_Version = deepcopy(old_version)
-                major_v: int = int(old_version.version.split(".")[0])
                 if datetime.fromisoformat(old_version.effective_date) < datetime.now():  # type: ignore
-                    if major_v > 1:
-                        supersed_docs(old_version.doc, 0, db_path)
-                    new_version.status = "RELEASED"
-                    new_version.file_path = (
-                        new_version.file_path.replace("_TRAINING", "")
-                        .replace("_PENDING_RELEASE", "")
-                        .replace("02_pending_approval", "03_released")
-                    )
-                    if os.path.exists(old_version.file_path):
-                        shutil.move(old_version.file_path, new_version.file_path)
-                    new_vals: dict = audit_log_docs(
-                        old_version, new_version, 0, "AUTO_RELEASE", db_path
+                    release_version(old_version, db_path, session)
+
+
+def run_due(db_path: str, session: Session | None = None) -> dict:
+    now: str = datetime.now().isoformat()
+    processed: dict = {"released": 0, "overdue": 0}
+    if session is None and not has_due_events(now, db_path):
+        return processed
+    with open_session(db_path, session, immediate=True) as session:
+        events: list[tuple] = due_events(now, db_path, session)
+        for kind, record_id in events:
+            if kind == "RELEASE":
+                with connect(db_path, session) as db:
+                    cur: sqlite3.Cursor = db.execute(
+                        "SELECT version_id, doc, version, status, file_path, effective_date FROM versions WHERE version_id = ?",
+                        (record_id,),
                     )
-                    update_db("versions", new_vals, new_version, db_path)
+                    res: tuple | None = cur.fetchone()
+                if res is None:
+                    drop_due_event(kind, record_id, db_path, session)
+                    continue
+                release_version(Document_Version(*res), db_path, session)
+                processed["released"] += 1
+            elif kind == "OVERDUE":
+                processed["overdue"] += check_overdue(db_path, session)
+    return processed
@@ -0,0 +1,65 @@
+import sys
+import csv
+import json
+import argparse
+from collections.abc import Iterator
+from training_actions import do_training_batch
+
+import_formats: list[str] = ["jsonl", "csv"]
+
+
+def parse_score(value) -> int | str:
+    if isinstance(value, int):
+        return value
+    try:
+        return int(str(value).strip())
+    except ValueError:
+        return str(value)
+
+
+def read_results(path: str, import_format: str | None = None) -> Iterator[tuple]:
+    import_format = import_format or path.rsplit(".", 1)[-1].lower()
+    if import_format not in import_formats:
+        raise ValueError(f"Invalid import format: '{import_format}'")
+    with open(path, encoding="utf-8", newline="") as f:
+        if import_format == "csv":
+            for record in csv.DictReader(f):
+                yield record.get("user"), record.get("doc_num"), parse_score(
+                    record.get("score")
+                )
+        else:
+            for line in f:
+                if not line.strip():
+                    continue
+                record: dict = json.loads(line)
+                yield record.get("user"), record.get("doc_num"), parse_score(
+                    record.get("score")
+                )
+
+
+def import_training_results(
+    path: str, db_path: str, import_format: str | None = None, strict: bool = False
+) -> dict:
+    return do_training_batch(read_results(path, import_format), db_path, strict=strict)
+
+
+if __name__ == "__main__":
+    from config import db_path
+
+    parser = argparse.ArgumentParser(description="Import classroom training results")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=import_formats)
+    parser.add_argument("--db", default=db_path)
+    parser.add_argument(
+        "--strict", action="store_true", help="apply nothing if any row fails"
+    )
+    args = parser.parse_args()
+    report: dict = import_training_results(args.path, args.db, args.format, args.strict)
+    for error in report["errors"]:
+        sys.stderr.write(
+            f"row {error['row']} ({error['user']}, {error['doc_num']}): {error['error']}\n"
+        )
+    print(
+        f"{report['rows']} rows: {report['completed']} completed, {report['failed']} failed, {len(report['errors'])} rejected"
+    )
+    sys.exit(1 if report["errors"] else 0)
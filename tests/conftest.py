@@ -0,0 +1,25 @@
+import os
+import sys
+import sqlite3
+import tempfile
+from pathlib import Path
+
+import pytest
+
+base_dir: Path = Path(__file__).resolve().parent.parent
+os.environ.setdefault("MEDIQMS_STORAGE_ROOT", tempfile.mkdtemp(prefix="mediqms-"))
+sys.path.insert(0, str(base_dir / "script"))
+
+
+def build_db(db_path: str) -> str:
+    with sqlite3.connect(db_path) as db:
+        for name in ["schema.sql", "mock_data.sql"]:
+            with open(base_dir / "data" / "database" / name, encoding="utf-8") as f:
+                db.executescript(f.read())
+    db.close()
+    return db_path
+
+
+@pytest.fixture
+def db_path(tmp_path: Path) -> str:
+    return build_db(str(tmp_path / "test.db"))
@@ -0,0 +1,60 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from core_actions import as_of
+from document_actions import (
+    approve_document,
+    create_new_document,
+    obsolete_doc,
+    revise_doc,
+)
+from mock_data import backdate
+from training_actions import lazy_check
+
+
+def release(db_path: str, doc_num: str, released_at: datetime) -> None:
+    approve_document("albert.sevilleja", doc_num, db_path)
+    approve_document(
+        "gus.fring",
+        doc_num,
+        db_path,
+        (datetime.now() + timedelta(days=20)).isoformat(),
+    )
+    backdate(doc_num, released_at.isoformat(), db_path)
+    lazy_check(db_path)
+
+
+def in_force(when: datetime, db_path: str, doc_num: str | None = None) -> list:
+    return [
+        (row[0], row[3], row[4]) for row in as_of(when.isoformat(), db_path, doc_num)
+    ]
+
+
+def test_as_of_returns_the_version_in_force_at_each_moment(db_path: str) -> None:
+    first: datetime = datetime.now() - timedelta(days=10)
+    second: datetime = datetime.now() - timedelta(days=2)
+    create_new_document("Cleaning", "SOP", "albert.sevilleja", db_path)
+    create_new_document("Gowning", "SOP", "albert.sevilleja", db_path)
+    release(db_path, "SOP-001", first)
+    revise_doc("albert.sevilleja", "SOP-001", db_path)
+    release(db_path, "SOP-001", second)
+    assert in_force(first - timedelta(days=1), db_path) == []
+    assert in_force(first + timedelta(days=1), db_path) == [
+        ("SOP-001", "1.0", "SUPERSEDED")
+    ]
+    assert in_force(second, db_path) == [("SOP-001", "2.0", "RELEASED")]
+    assert in_force(datetime.now(), db_path, "SOP-001") == [
+        ("SOP-001", "2.0", "RELEASED")
+    ]
+    assert in_force(datetime.now(), db_path, "SOP-002") == []
+    obsolete_doc("gus.fring", "SOP-001", db_path)
+    assert in_force(datetime.now() + timedelta(minutes=1), db_path) == []
+    assert in_force(second + timedelta(days=1), db_path) == [
+        ("SOP-001", "2.0", "OBSOLETE")
+    ]
+
+
+def test_as_of_rejects_invalid_moments(db_path: str) -> None:
+    with pytest.raises(ValueError):
+        as_of("last tuesday", db_path)
@@ -0,0 +1,43 @@
+import sqlite3
+
+import pytest
+
+from audit_integrity import verify_full
+from document_actions import approve_document, create_new_document
+from session import open_session
+
+
+def audit_rows(db_path: str) -> list[tuple]:
+    with sqlite3.connect(db_path) as db:
+        rows: list[tuple] = db.execute(
+            "SELECT table_affected, action FROM audit_log ORDER BY log_id"
+        ).fetchall()
+    db.close()
+    return rows
+
+
+def test_workflow_audit_rows_commit_in_order_with_the_step(db_path: str) -> None:
+    with open_session(db_path, immediate=True) as active:
+        create_new_document("audited", "SOP", "albert.sevilleja", db_path, active)
+        assert active.pending_audit
+        with sqlite3.connect(db_path) as other:
+            assert other.execute("SELECT count(*) FROM audit_log").fetchone()[0] == 0
+        other.close()
+        approve_document("albert.sevilleja", "SOP-001", db_path, session=active)
+    assert audit_rows(db_path) == [
+        ("documents", "CREATE"),
+        ("versions", "CREATE"),
+        ("versions", "UPDATE"),
+    ]
+    assert verify_full(db_path)["ok"]
+
+
+def test_rolled_back_step_leaves_no_audit_rows(db_path: str) -> None:
+    with pytest.raises(PermissionError):
+        with open_session(db_path, immediate=True) as active:
+            create_new_document("lost", "SOP", "albert.sevilleja", db_path, active)
+            approve_document("walter.white", "SOP-001", db_path, session=active)
+    assert audit_rows(db_path) == []
+    create_new_document("kept", "SOP", "albert.sevilleja", db_path)
+    assert [row[1] for row in audit_rows(db_path)] == ["CREATE", "CREATE"]
+    assert verify_full(db_path)["ok"]
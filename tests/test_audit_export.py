@@ -0,0 +1,30 @@
+import sqlite3
+
+from audit_export import iter_audit
+
+
+def test_time_window_matches_a_full_filter(db_path: str) -> None:
+    stamps: list[str] = [f"2024-01-{day:02d}T12:00:00" for day in range(1, 29)]
+    stamps[10], stamps[11] = stamps[11], stamps[10]
+    with sqlite3.connect(db_path) as db:
+        db.execute("DELETE FROM audit_log")
+        db.executemany(
+            "INSERT INTO audit_log (table_affected, record_id, user, action, timestamp) VALUES ('documents', ?, 1, 'UPDATE', ?)",
+            list(enumerate(stamps)),
+        )
+        expected: list[int] = [
+            row[0]
+            for row in db.execute(
+                "SELECT log_id FROM audit_log WHERE timestamp >= ? AND timestamp < ? ORDER BY log_id",
+                ("2024-01-11", "2024-01-20"),
+            )
+        ]
+    db.close()
+    exported: list[int] = [
+        row[0]
+        for row in iter_audit(
+            db_path, since="2024-01-11", until="2024-01-20", page_rows=3
+        )
+    ]
+    assert exported == expected
+    assert list(iter_audit(db_path, since="2025-01-01")) == []
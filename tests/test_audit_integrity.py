@@ -0,0 +1,86 @@
+import sqlite3
+
+from audit_actions import audit_entry, audit_log_many
+from audit_integrity import verify_full, write_checkpoint
+from migrations import mark_audit_seal, seal_legacy_audit
+
+legacy_rows: list[tuple] = [
+    ("documents", 1, 4, "CREATE", "{}", "{}", "2024-01-01T00:00:00", "legacy-1"),
+    ("versions", 1, 4, "CREATE", "{}", "{}", "2024-01-01T00:00:00", "legacy-2"),
+]
+
+
+def insert_legacy(db: sqlite3.Connection) -> None:
+    db.executemany(
+        "INSERT INTO audit_log (table_affected, record_id, user, action, old_val, new_val, timestamp, hash) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        legacy_rows,
+    )
+
+
+def log_rows(db_path: str, count: int) -> None:
+    audit_log_many(
+        [
+            audit_entry("documents", n, 4, "UPDATE", {}, {"n": n}, "2025-01-01")
+            for n in range(count)
+        ],
+        db_path,
+    )
+
+
+def test_verify_full_starts_at_legacy_seal(db_path: str) -> None:
+    with sqlite3.connect(db_path) as db:
+        insert_legacy(db)
+        write_checkpoint(db, 2, "legacy-2", sealed=True)
+    db.close()
+    log_rows(db_path, 3)
+    assert verify_full(db_path, workers=1) == {
+        "ok": True,
+        "rows": 3,
+        "broken_log_id": None,
+    }
+    with sqlite3.connect(db_path) as db:
+        db.execute("UPDATE audit_log SET new_val = '{}' WHERE log_id = 4")
+    db.close()
+    assert verify_full(db_path, workers=1)["broken_log_id"] == 4
+
+
+def test_unsealed_legacy_rows_are_reported(db_path: str) -> None:
+    with sqlite3.connect(db_path) as db:
+        insert_legacy(db)
+        write_checkpoint(db, 2, "legacy-2")
+    db.close()
+    assert verify_full(db_path, workers=1)["broken_log_id"] == 1
+
+
+def legacy_layout(chained: bool) -> sqlite3.Connection:
+    db: sqlite3.Connection = sqlite3.connect(":memory:")
+    db.executescript(
+        """
+        CREATE TABLE audit_log (
+            log_id INTEGER PRIMARY KEY, table_affected TEXT, record_id INTEGER, user INTEGER,
+            action TEXT, old_val TEXT, new_val TEXT, timestamp TEXT, hash TEXT
+        );
+        CREATE TABLE audit_checkpoints (
+            checkpoint_id INTEGER PRIMARY KEY, log_id INTEGER, chain_hash TEXT,
+            created_at TEXT, signature TEXT
+        );
+        """
+    )
+    if chained:
+        from audit_actions import insert_chained
+
+        insert_chained(db, [row[:7] for row in legacy_rows])
+    else:
+        insert_legacy(db)
+    return db
+
+
+def test_migration_marks_only_unchained_prefix_as_sealed() -> None:
+    for chained, expected in [(False, 1), (True, 0)]:
+        db: sqlite3.Connection = legacy_layout(chained)
+        seal_legacy_audit(db)
+        mark_audit_seal(db)
+        assert db.execute("SELECT sealed FROM audit_checkpoints").fetchone() == (
+            expected,
+        )
+        db.close()
@@ -0,0 +1,79 @@
+import os
+import stat
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from blob_store import blob_path, blob_root, file_digest
+from config import storage_root_path, template_map
+from document_actions import approve_document, create_new_document
+from session import open_session
+
+
+def draft_path(db_path: str, doc_num: str) -> Path:
+    with sqlite3.connect(db_path) as db:
+        file_path: str = db.execute(
+            "SELECT v.file_path FROM versions v JOIN documents d ON d.doc_id = v.doc WHERE d.doc_num = ? ORDER BY v.version_id DESC LIMIT 1",
+            (doc_num,),
+        ).fetchone()[0]
+    db.close()
+    return Path(file_path)
+
+
+def test_drafts_are_private_writable_copies(db_path: str) -> None:
+    create_new_document("first", "SOP", "albert.sevilleja", db_path)
+    create_new_document("second", "SOP", "albert.sevilleja", db_path)
+    first: Path = draft_path(db_path, "SOP-001")
+    second: Path = draft_path(db_path, "SOP-002")
+    template_digest: str = file_digest(template_map["SOP"])
+    for draft in [first, second]:
+        assert not draft.is_symlink()
+        assert os.stat(draft).st_nlink == 1
+        assert os.stat(draft).st_mode & stat.S_IWUSR
+    with open(first, "ab") as f:
+        f.write(b"edited")
+    assert file_digest(second) == template_digest
+    assert file_digest(blob_path(template_digest)) == template_digest
+
+
+def test_review_freezes_the_draft_into_the_store(db_path: str) -> None:
+    create_new_document("frozen", "SOP", "albert.sevilleja", db_path)
+    draft: Path = draft_path(db_path, "SOP-001")
+    with open(draft, "ab") as f:
+        f.write(b"owner edit")
+    approve_document("albert.sevilleja", "SOP-001", db_path)
+    assert draft.is_symlink()
+    assert draft.resolve().parent.parent == blob_root.resolve()
+    assert file_digest(draft) == draft.resolve().name
+
+
+def test_rolled_back_workflow_places_no_files(db_path: str) -> None:
+    drafts: Path = Path(storage_root_path) / "01_drafts"
+    before: set[str] = set(os.listdir(drafts)) if drafts.exists() else set()
+    with pytest.raises(RuntimeError):
+        with open_session(db_path, immediate=True) as session:
+            create_new_document(
+                "rolled back", "SOP", "albert.sevilleja", db_path, session
+            )
+            raise RuntimeError("abort")
+    after: set[str] = set(os.listdir(drafts)) if drafts.exists() else set()
+    assert after == before
+    with sqlite3.connect(db_path) as db:
+        assert db.execute("SELECT count(*) FROM documents").fetchone()[0] == 0
+    db.close()
+
+
+def test_submitting_a_draft_without_a_file_is_rejected(db_path: str) -> None:
+    create_new_document("unstaged", "SOP", "albert.sevilleja", db_path)
+    draft_path(db_path, "SOP-001").unlink()
+    with pytest.raises(FileNotFoundError):
+        approve_document("albert.sevilleja", "SOP-001", db_path)
+    with sqlite3.connect(db_path) as db:
+        assert (
+            db.execute(
+                "SELECT status FROM versions ORDER BY version_id DESC LIMIT 1"
+            ).fetchone()[0]
+            == "DRAFT"
+        )
+    db.close()
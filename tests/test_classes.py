@@ -0,0 +1,154 @@
+import json
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+from classes import (
+    ChangeSet,
+    Document_Header,
+    Document_Version,
+    Training,
+    TrainingBatch,
+    epoch_seconds,
+)
+from core_actions import get_active_training, get_user_id
+from document_actions import approve_document, create_new_document
+from training_actions import do_training
+
+
+def test_training_parses_dates_on_first_access() -> None:
+    training: Training = Training(
+        1, 2, 3, "ASSIGNED", "2026-01-01T08:00:00", "2026-02-01T08:00:00", ""
+    )
+    assert training._due_date == "2026-02-01T08:00:00"
+    assert training.due_date == datetime(2026, 2, 1, 8)
+    assert training._due_date is training.due_date
+    assert training.completion_date is None
+    assert training.to_db_tuple() == (
+        1,
+        2,
+        3,
+        "ASSIGNED",
+        "2026-01-01T08:00:00",
+        "2026-02-01T08:00:00",
+        None,
+        None,
+    )
+
+
+def test_batch_round_trips_rows() -> None:
+    assigned: int = epoch_seconds("2026-01-01T00:00:00")
+    batch: TrainingBatch = TrainingBatch()
+    batch.extend([])
+    batch.extend(
+        [
+            (1, 10, 5, "ASSIGNED", assigned, assigned + 86_400, None),
+            (2, 11, 5, "FAILED", assigned, assigned + 3 * 86_400, 40),
+        ]
+    )
+    assert len(batch) == 2
+    assert batch.training(1) == Training(
+        2,
+        11,
+        5,
+        "FAILED",
+        datetime(2026, 1, 1),
+        datetime(2026, 1, 4),
+        None,
+        40,
+    )
+    assert batch.training(0).score is None
+    assert batch.status_counts() == {
+        "ASSIGNED": 1,
+        "FAILED": 1,
+        "COMPLETED": 0,
+        "OVERDUE": 0,
+    }
+    assert batch.due_before("2026-01-03T00:00:00") == [1]
+    assert batch.nbytes() == 2 * (8 * 5 + 1 + 2)
+    with pytest.raises(ValueError):
+        batch.extend([(3, 12, 5, "ARCHIVED", assigned, assigned, None)])
+    assert len(batch) == 2
+
+
+def test_active_training_loads_open_records_only(db_path: str) -> None:
+    create_new_document("batch", "SOP", "albert.sevilleja", db_path)
+    approve_document("albert.sevilleja", "SOP-001", db_path)
+    approve_document(
+        "gus.fring",
+        "SOP-001",
+        db_path,
+        (datetime.now() + timedelta(days=20)).isoformat(),
+    )
+    do_training("walter.white", "SOP-001", 95, db_path)
+    do_training("jesse.pinkman", "SOP-001", 40, db_path)
+    batch: TrainingBatch = get_active_training(db_path)
+    users: dict[int, Training] = {
+        training.user_id: training
+        for training in (batch.training(n) for n in range(len(batch)))
+    }
+    assert get_user_id("walter.white", db_path) not in users
+    failed: Training = users[get_user_id("jesse.pinkman", db_path)]
+    assert (failed.status, failed.score) == ("FAILED", 40)
+    assert batch.status_counts()["ASSIGNED"] == len(batch) - 1
+
+
+def test_evolve_records_only_changed_columns() -> None:
+    header: Document_Header = Document_Header(4, "SOP-004", "Cleaning", 1, "SOP")
+    renamed, changes = header.evolve(title="Sanitation", owner=2, type="SOP")
+    assert (header.title, header.owner) == ("Cleaning", 1)
+    assert (renamed.title, renamed.owner, renamed.number) == (
+        "Sanitation",
+        2,
+        "SOP-004",
+    )
+    assert (changes.old, changes.new) == (
+        {"title": "Cleaning", "owner_id": 1},
+        {"title": "Sanitation", "owner_id": 2},
+    )
+    assert changes.update_statement() == (
+        "UPDATE documents SET title = ?, owner_id = ? WHERE doc_id = ?",
+        ("Sanitation", 2, 4),
+    )
+    with pytest.raises(ValueError):
+        header.evolve(doc_num="SOP-005")
+
+
+def test_unchanged_evolve_yields_an_empty_change_set() -> None:
+    version: Document_Version = Document_Version(
+        7, 4, "1.0", "DRAFT", "draft.txt", None
+    )
+    same, changes = version.evolve(status="DRAFT")
+    assert same == version and same is not version
+    assert not changes
+    with pytest.raises(ValueError):
+        changes.update_statement()
+
+
+def test_change_set_keeps_the_first_old_value() -> None:
+    changes: ChangeSet = ChangeSet("training_records", "training_id", 9)
+    changes.record("status", "ASSIGNED", "FAILED")
+    changes.record("status", "FAILED", "COMPLETED")
+    changes.record("completion_date", None, datetime(2026, 3, 1, 9))
+    assert changes.old == {"status": "ASSIGNED", "completion_date": None}
+    assert changes.new == {
+        "status": "COMPLETED",
+        "completion_date": "2026-03-01T09:00:00",
+    }
+    changes.record("status", "COMPLETED", "ASSIGNED")
+    assert changes.new == {"completion_date": "2026-03-01T09:00:00"}
+
+
+def test_workflow_audits_the_change_set(db_path: str) -> None:
+    create_new_document("audited", "SOP", "albert.sevilleja", db_path)
+    approve_document("albert.sevilleja", "SOP-001", db_path)
+    with sqlite3.connect(db_path) as db:
+        old_val, new_val = db.execute(
+            "SELECT old_val, new_val FROM audit_log WHERE table_affected = 'versions' AND action = 'UPDATE'"
+        ).fetchone()
+    db.close()
+    assert (json.loads(old_val), json.loads(new_val)) == (
+        {"status": "DRAFT"},
+        {"status": "IN_REVIEW"},
+    )
@@ -0,0 +1,73 @@
+import sqlite3
+from datetime import datetime, timedelta
+
+from core_actions import released_documents
+from document_actions import (
+    approve_document,
+    create_new_document,
+    obsolete_doc,
+    revise_doc,
+)
+from mock_data import backdate
+from training_actions import lazy_check
+
+
+def release(db_path: str, doc_num: str) -> None:
+    approve_document("albert.sevilleja", doc_num, db_path)
+    approve_document(
+        "gus.fring",
+        doc_num,
+        db_path,
+        (datetime.now() + timedelta(days=20)).isoformat(),
+    )
+    backdate(doc_num, (datetime.now() - timedelta(days=1)).isoformat(), db_path)
+    lazy_check(db_path)
+
+
+def current(db_path: str) -> list[tuple]:
+    with sqlite3.connect(db_path) as db:
+        rows: list[tuple] = db.execute(
+            "SELECT c.doc_id, c.version, v.status FROM current_effective c JOIN versions v ON v.version_id = c.version_id ORDER BY c.doc_id"
+        ).fetchall()
+    db.close()
+    return rows
+
+
+def test_release_and_supersede_move_the_current_version(db_path: str) -> None:
+    create_new_document("Cleaning", "SOP", "albert.sevilleja", db_path)
+    assert current(db_path) == []
+    release(db_path, "SOP-001")
+    assert current(db_path) == [(1, "1.0", "RELEASED")]
+    revise_doc("albert.sevilleja", "SOP-001", db_path)
+    assert current(db_path) == [(1, "1.0", "RELEASED")]
+    release(db_path, "SOP-001")
+    assert current(db_path) == [(1, "2.0", "RELEASED")]
+    assert [row[:4] for row in released_documents(db_path)] == [
+        ("SOP-001", "Cleaning", "SOP", "2.0")
+    ]
+    obsolete_doc("gus.fring", "SOP-001", db_path)
+    assert current(db_path) == []
+    assert released_documents(db_path) == []
+
+
+def test_clearing_falls_back_to_the_latest_released_version(db_path: str) -> None:
+    with sqlite3.connect(db_path) as db:
+        db.execute(
+            "INSERT INTO documents (doc_id, doc_num, title, type, owner_id) VALUES (1, 'SOP-001', 'Legacy', 'SOP', 1)"
+        )
+        db.executemany(
+            "INSERT INTO versions (version_id, doc, version, status, file_path) VALUES (?, 1, ?, 'RELEASED', ?)",
+            [(1, "1.0", "v1.txt"), (2, "1.1", "v2.txt")],
+        )
+        db.execute(
+            "UPDATE versions SET file_path = 'v1_moved.txt' WHERE version_id = 1"
+        )
+    db.close()
+    assert current(db_path) == [(1, "1.1", "RELEASED")]
+    with sqlite3.connect(db_path) as db:
+        db.execute("UPDATE versions SET status = 'OBSOLETE' WHERE version_id = 2")
+        fallback: tuple = db.execute(
+            "SELECT version_id, file_path FROM current_effective"
+        ).fetchone()
+    db.close()
+    assert fallback == (1, "v1_moved.txt")
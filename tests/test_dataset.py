@@ -0,0 +1,77 @@
+import sqlite3
+from pathlib import Path
+
+from audit_integrity import verify_full
+from bench_suite import compare
+from compliance import summary_drift
+from dataset import generate_dataset
+
+
+def test_generated_dataset_is_consistent(tmp_path: Path) -> None:
+    db_path: str = str(tmp_path / "generated.db")
+    counts: dict = generate_dataset(
+        db_path, documents=60, users=40, trainees_per_version=5
+    )
+    with sqlite3.connect(db_path) as db:
+        for table in ["documents", "versions", "training_records"]:
+            assert (
+                db.execute(f"SELECT count(*) FROM {table}").fetchone()[0]
+                == counts[table]
+            )
+        assert (
+            db.execute(
+                "SELECT count(*) FROM (SELECT doc FROM versions WHERE status = 'RELEASED' GROUP BY doc HAVING count(*) > 1)"
+            ).fetchone()[0]
+            == 0
+        )
+        assert (
+            db.execute(
+                "SELECT count(*) FROM versions WHERE status IN ('SUPERSEDED', 'OBSOLETE') AND effective_to IS NULL"
+            ).fetchone()[0]
+            == 0
+        )
+    db.close()
+    assert summary_drift(db_path) == []
+    assert verify_full(db_path)["ok"]
+
+
+def test_same_seed_generates_the_same_documents(tmp_path: Path) -> None:
+    titles: list[list[tuple]] = []
+    for name in ["first", "second"]:
+        db_path: str = str(tmp_path / f"{name}.db")
+        generate_dataset(db_path, documents=30, users=20, seed=7)
+        with sqlite3.connect(db_path) as db:
+            titles.append(
+                db.execute(
+                    "SELECT d.doc_num, d.title, v.version, v.status FROM documents d JOIN versions v ON v.doc = d.doc_id ORDER BY v.version_id"
+                ).fetchall()
+            )
+        db.close()
+    assert titles[0] == titles[1]
+
+
+def test_compare_flags_only_material_regressions() -> None:
+    baseline: dict = {
+        "scales": {
+            "100": {
+                "workflows": {
+                    "approve_document": {"runs": 3, "median_ms": 10.0},
+                    "lazy_check": {"runs": 3, "median_ms": 0.2},
+                }
+            }
+        }
+    }
+    report: dict = {
+        "scales": {
+            "100": {
+                "workflows": {
+                    "approve_document": {"runs": 3, "median_ms": 14.0},
+                    "lazy_check": {"runs": 3, "median_ms": 0.6},
+                    "revise_doc": {"runs": 3, "median_ms": 50.0},
+                }
+            }
+        }
+    }
+    assert compare(report, baseline) == [
+        "approve_document at 100 documents: 10.00ms -> 14.00ms"
+    ]
@@ -0,0 +1,58 @@
+import sqlite3
+from datetime import datetime, timedelta
+
+from training_actions import check_overdue, run_due
+
+
+def test_run_due_skips_the_write_lock_when_nothing_is_due(db_path: str) -> None:
+    with sqlite3.connect(db_path) as db:
+        db.execute("PRAGMA journal_mode = WAL")
+        db.execute(
+            "INSERT INTO due_events (kind, record_id, due_at) VALUES ('OVERDUE', 0, ?)",
+            ((datetime.now() + timedelta(days=1)).isoformat(),),
+        )
+    writer: sqlite3.Connection = sqlite3.connect(db_path, isolation_level=None)
+    writer.execute("BEGIN IMMEDIATE")
+    try:
+        assert run_due(db_path) == {"released": 0, "overdue": 0}
+    finally:
+        writer.execute("ROLLBACK")
+        writer.close()
+        db.close()
+
+
+def test_check_overdue_moves_the_overdue_event_forward(db_path: str) -> None:
+    past: str = (datetime.now() - timedelta(days=1)).isoformat()
+    future: str = (datetime.now() + timedelta(days=3)).isoformat()
+    with sqlite3.connect(db_path) as db:
+        db.executemany(
+            "INSERT INTO training_records (training_id, user_id, version_id, status, assigned_date, due_date) VALUES (?, ?, 1, 'ASSIGNED', ?, ?)",
+            [(1, 2, past, past), (2, 3, past, future)],
+        )
+    db.close()
+    assert check_overdue(db_path) == 1
+    with sqlite3.connect(db_path) as db:
+        assert db.execute(
+            "SELECT due_at FROM due_events WHERE kind = 'OVERDUE'"
+        ).fetchall() == [(future,)]
+        db.execute(
+            "UPDATE training_records SET status = 'COMPLETED' WHERE training_id = 2"
+        )
+    db.close()
+    assert check_overdue(db_path) == 0
+    with sqlite3.connect(db_path) as db:
+        assert db.execute("SELECT count(*) FROM due_events").fetchone()[0] == 0
+    db.close()
+
+
+def test_run_due_drops_release_events_for_missing_versions(db_path: str) -> None:
+    with sqlite3.connect(db_path) as db:
+        db.execute(
+            "INSERT INTO due_events (kind, record_id, due_at) VALUES ('RELEASE', 999, ?)",
+            ((datetime.now() - timedelta(days=1)).isoformat(),),
+        )
+    db.close()
+    assert run_due(db_path) == {"released": 0, "overdue": 0}
+    with sqlite3.connect(db_path) as db:
+        assert db.execute("SELECT count(*) FROM due_events").fetchone()[0] == 0
+    db.close()
@@ -0,0 +1,36 @@
+import os
+from pathlib import Path
+from collections.abc import Iterator
+
+import pytest
+
+import blob_store
+import document_actions
+import instrumentation
+from config import template_map
+
+
+@pytest.fixture
+def tracer(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator:
+    monkeypatch.setattr(blob_store, "blob_root", tmp_path / "blobs")
+    instrumentation.enable(["document_actions"])
+    try:
+        yield instrumentation.tracer
+    finally:
+        instrumentation.disable()
+
+
+def test_views_are_not_counted_as_blob_bytes(db_path: str, tracer) -> None:
+    document_actions.create_new_document("first", "SOP", "albert.sevilleja", db_path)
+    document_actions.create_new_document("second", "SOP", "albert.sevilleja", db_path)
+    document_actions.approve_document("albert.sevilleja", "SOP-001", db_path)
+    document_actions.approve_document("albert.sevilleja", "SOP-002", db_path)
+    create: dict = tracer.calls["document_actions.create_new_document"]
+    approve: dict = tracer.calls["document_actions.approve_document"]
+    assert create["blob_bytes"] == os.path.getsize(template_map["SOP"])
+    assert create["views"] == 2
+    assert approve["blob_bytes"] == 0
+    assert approve["views"] == 2
+    assert tracer.files["store_blob"]["count"] == 1
+    assert tracer.files["write_copy"]["views"] == 2
+    assert tracer.files["link_view"]["views"] == 2
@@ -0,0 +1,106 @@
+import csv
+import sqlite3
+from pathlib import Path
+
+from legacy_ingest import ingest_manifest, manifest_fields
+
+
+def write_manifest(
+    folder: Path,
+    name: str,
+    rows: list[tuple[str, str]],
+    title: str = "legacy procedure",
+) -> str:
+    manifest: Path = folder / f"{name}.csv"
+    with open(manifest, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=manifest_fields)
+        writer.writeheader()
+        for version, status in rows:
+            source: Path = folder / f"SOP-900_{version}.txt"
+            source.write_text(f"legacy procedure {version}", encoding="utf-8")
+            writer.writerow(
+                {
+                    "doc_num": "SOP-900",
+                    "title": title,
+                    "type": "SOP",
+                    "owner": "albert.sevilleja",
+                    "version": version,
+                    "status": status,
+                    "effective_date": f"2020-0{version[0]}-01",
+                    "source_file": source.name,
+                }
+            )
+    return str(manifest)
+
+
+def versions(db_path: str) -> dict[str, tuple]:
+    with sqlite3.connect(db_path) as db:
+        rows: list[tuple] = db.execute(
+            "SELECT v.version, v.status, v.effective_to FROM versions v JOIN documents d ON d.doc_id = v.doc WHERE d.doc_num = 'SOP-900'"
+        ).fetchall()
+    db.close()
+    return {version: (status, effective_to) for version, status, effective_to in rows}
+
+
+def test_newer_release_supersedes_the_stored_one(db_path: str, tmp_path: Path) -> None:
+    first: str = write_manifest(tmp_path, "first", [("1.0", "RELEASED")])
+    assert ingest_manifest(first, db_path, workers=1)["imported"] == 1
+    second: str = write_manifest(tmp_path, "second", [("2.0", "RELEASED")])
+    report: dict = ingest_manifest(second, db_path, workers=1)
+    assert report["imported"] == 1 and report["errors"] == []
+    assert versions(db_path) == {
+        "1.0": ("SUPERSEDED", "2020-02-01T00:00:00"),
+        "2.0": ("RELEASED", None),
+    }
+    with sqlite3.connect(db_path) as db:
+        assert db.execute(
+            "SELECT c.version FROM current_effective c JOIN documents d ON d.doc_id = c.doc_id WHERE d.doc_num = 'SOP-900'"
+        ).fetchone() == ("2.0",)
+    db.close()
+
+
+def test_older_release_is_rejected(db_path: str, tmp_path: Path) -> None:
+    first: str = write_manifest(tmp_path, "first", [("2.0", "RELEASED")])
+    ingest_manifest(first, db_path, workers=1)
+    second: str = write_manifest(tmp_path, "second", [("1.0", "RELEASED")])
+    report: dict = ingest_manifest(second, db_path, workers=1)
+    assert report["imported"] == 0
+    assert [error["version"] for error in report["errors"]] == ["1.0"]
+    assert versions(db_path) == {"2.0": ("RELEASED", None)}
+
+
+def test_header_must_match_the_stored_document(db_path: str, tmp_path: Path) -> None:
+    first: str = write_manifest(tmp_path, "first", [("1.0", "RELEASED")])
+    ingest_manifest(first, db_path, workers=1)
+    second: str = write_manifest(
+        tmp_path, "second", [("1.0", "SUPERSEDED"), ("2.0", "RELEASED")], "renamed"
+    )
+    report: dict = ingest_manifest(second, db_path, workers=1)
+    assert (report["imported"], report["skipped"]) == (0, 1)
+    assert [(error["version"], error["error"]) for error in report["errors"]] == [
+        ("2.0", "Conflicting document header: 'SOP-900'")
+    ]
+    assert versions(db_path) == {"1.0": ("RELEASED", None)}
+
+
+def test_last_superseded_version_is_closed(db_path: str, tmp_path: Path) -> None:
+    first: str = write_manifest(
+        tmp_path, "first", [("1.0", "SUPERSEDED"), ("2.0", "SUPERSEDED")]
+    )
+    assert ingest_manifest(first, db_path, workers=1)["imported"] == 2
+    stored: dict[str, tuple] = versions(db_path)
+    assert stored["1.0"] == ("SUPERSEDED", "2020-02-01T00:00:00")
+    assert stored["2.0"][1] is not None
+
+
+def test_backfilled_history_closes_at_the_stored_version(
+    db_path: str, tmp_path: Path
+) -> None:
+    first: str = write_manifest(tmp_path, "first", [("3.0", "RELEASED")])
+    ingest_manifest(first, db_path, workers=1)
+    second: str = write_manifest(tmp_path, "second", [("2.0", "SUPERSEDED")])
+    assert ingest_manifest(second, db_path, workers=1)["imported"] == 1
+    assert versions(db_path) == {
+        "2.0": ("SUPERSEDED", "2020-03-01T00:00:00"),
+        "3.0": ("RELEASED", None),
+    }
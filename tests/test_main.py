@@ -0,0 +1,54 @@
+import sqlite3
+from datetime import datetime, timedelta
+
+from main import main
+from mock_data import backdate
+
+
+def status(db_path: str) -> tuple:
+    with sqlite3.connect(db_path) as db:
+        row: tuple = db.execute(
+            "SELECT version, status FROM versions ORDER BY version_id DESC LIMIT 1"
+        ).fetchone()
+    db.close()
+    return row
+
+
+def test_document_lifecycle_through_the_cli(db_path: str, capsys) -> None:
+    cli: list[str] = ["--db", db_path]
+    assert main([*cli, "create", "Cleaning", "SOP", "--user", "albert.sevilleja"]) == 0
+    assert main([*cli, "approve", "SOP-001", "--user", "albert.sevilleja"]) == 0
+    effective_date: str = (datetime.now() + timedelta(days=20)).isoformat()
+    approve: list[str] = ["approve", "SOP-001", "--user", "gus.fring"]
+    assert main([*cli, *approve, "--effective-date", effective_date]) == 0
+    assert status(db_path) == ("1.0", "TRAINING")
+    assert (
+        main([*cli, "train", "SOP-001", "--user", "walter.white", "--score", "95"]) == 0
+    )
+    capsys.readouterr()
+    assert main([*cli, "report", "--rebuild"]) == 0
+    lines: list[str] = capsys.readouterr().out.splitlines()
+    assert lines[0] == "Rebuilt 1 summary rows"
+    assert lines[1].startswith("SOP-001 v1.0 TRAINING: 1/")
+    backdate("SOP-001", (datetime.now() - timedelta(days=1)).isoformat(), db_path)
+    assert main([*cli, "sweep"]) == 0
+    assert capsys.readouterr().out.startswith("1 released, ")
+    assert status(db_path) == ("1.0", "RELEASED")
+    assert main([*cli, "revise", "SOP-001", "--user", "albert.sevilleja"]) == 0
+    assert main([*cli, "approve", "SOP-001", "--user", "albert.sevilleja"]) == 0
+    reject: list[str] = ["reject", "SOP-001", "--user", "gus.fring"]
+    assert main([*cli, *reject, "--comment", "missing steps"]) == 0
+    assert status(db_path) == ("1.2", "DRAFT")
+    assert main([*cli, "obsolete", "SOP-001", "--user", "gus.fring"]) == 0
+    with sqlite3.connect(db_path) as db:
+        assert db.execute(
+            "SELECT status FROM versions WHERE version = '1.0'"
+        ).fetchone() == ("OBSOLETE",)
+    db.close()
+
+
+def test_failures_exit_with_a_message(db_path: str, capsys) -> None:
+    assert main(["--db", db_path, "approve", "SOP-404", "--user", "gus.fring"]) == 1
+    assert capsys.readouterr().err.startswith("approve: ")
+    assert main(["--db", db_path, "revise", "SOP-404", "--user", "gus.fring"]) == 1
+    assert capsys.readouterr().err.startswith("revise: ")
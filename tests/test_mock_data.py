@@ -0,0 +1,44 @@
+import sqlite3
+from pathlib import Path
+
+from compliance import summary_drift
+from blob_store import blob_root
+from config import storage_root_path
+from document_actions import create_new_document
+from mock_data import reset_database, seed_documents
+
+
+def test_seed_keeps_the_training_summary_consistent(db_path: str) -> None:
+    seed_documents(db_path)
+    assert summary_drift(db_path) == []
+    with sqlite3.connect(db_path) as db:
+        statuses: dict[str, str] = dict(
+            db.execute(
+                "SELECT d.doc_num || ' v' || v.version, v.status FROM versions v JOIN documents d ON d.doc_id = v.doc"
+            ).fetchall()
+        )
+        negative: int = db.execute(
+            "SELECT count(*) FROM training_summary WHERE min(assigned, failed, completed, overdue) < 0"
+        ).fetchone()[0]
+    db.close()
+    assert negative == 0
+    assert statuses == {
+        "SOP-001 v1.0": "SUPERSEDED",
+        "SOP-001 v2.0": "RELEASED",
+        "WI-001 v1.0": "RELEASED",
+        "SOP-002 v1.0": "RELEASED",
+        "DWG-001 v1.0": "PENDING_RELEASE",
+    }
+
+
+def test_reset_clears_the_wal_and_the_configured_storage(db_path: str) -> None:
+    create_new_document("stale", "SOP", "albert.sevilleja", db_path)
+    assert Path(f"{db_path}-wal").exists()
+    reset_database(db_path)
+    assert not Path(f"{db_path}-wal").exists()
+    assert not Path(f"{db_path}-shm").exists()
+    with sqlite3.connect(db_path) as db:
+        assert db.execute("SELECT count(*) FROM documents").fetchone()[0] == 0
+    db.close()
+    assert not (Path(storage_root_path) / "01_drafts").exists()
+    assert not blob_root.exists()
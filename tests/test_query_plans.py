@@ -0,0 +1,36 @@
+import sqlite3
+from pathlib import Path
+
+import migrations
+from migrations import allowed_scans, check_query_plans, full_scans, schema_path
+
+
+def test_hot_queries_use_indexes() -> None:
+    assert check_query_plans() == []
+
+
+def test_full_scan_is_reported(tmp_path: Path) -> None:
+    db_path: str = str(tmp_path / "plans.db")
+    with sqlite3.connect(db_path) as db:
+        with open(schema_path, encoding="utf-8") as f:
+            db.executescript(f.read())
+        assert full_scans(db, "SELECT log_id FROM audit_log WHERE new_val = ?")
+        db.execute("DROP INDEX idx_training_due")
+    db.close()
+    violations: list[tuple[str, str]] = check_query_plans(db_path)
+    assert any("training_records" in detail for _, detail in violations)
+
+
+def test_covering_index_scans_are_reported(db_path: str) -> None:
+    with sqlite3.connect(db_path) as db:
+        assert full_scans(db, "SELECT doc_num FROM documents ORDER BY doc_num") == [
+            "SCAN documents USING COVERING INDEX idx_doc_num"
+        ]
+    db.close()
+
+
+def test_allowed_scans_are_tied_to_their_location(monkeypatch) -> None:
+    scan: str = "SELECT version_id, count(*) FROM training_records GROUP BY version_id"
+    monkeypatch.setattr(migrations, "dynamic_queries", [scan])
+    assert ("compliance.py:summary_counts", "training_records") in allowed_scans
+    assert [location for location, _ in check_query_plans()] == ["dynamic:0"]
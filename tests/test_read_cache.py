@@ -0,0 +1,35 @@
+import sqlite3
+
+from core_actions import doc_info
+from document_actions import create_new_document
+from read_cache import ReadCache, read_cache
+from session import close_pool
+
+
+def test_lru_evicts_the_least_recent_entry() -> None:
+    cache: ReadCache = ReadCache(max_entries=2)
+    cache.put(("doc_num", "A"), 1, ["a"])
+    cache.put(("doc_num", "B"), 2, ["b"])
+    assert cache.get(("doc_num", "A")) == (1, ["a"])
+    cache.put(("doc_num", "C"), 3, ["c"])
+    assert cache.get(("doc_num", "B")) is None
+    assert cache.groups == {1: {("doc_num", "A")}, 3: {("doc_num", "C")}}
+    cache.invalidate(1)
+    assert cache.get(("doc_num", "A")) is None
+    assert cache.metrics()["evictions"] == 1
+    assert cache.metrics()["invalidations"] == 1
+
+
+def test_external_commit_clears_the_cache(db_path: str) -> None:
+    close_pool()
+    create_new_document("cached", "SOP", "albert.sevilleja", db_path)
+    assert doc_info("SOP-001", db_path).title == "cached"
+    assert doc_info("SOP-001", db_path).title == "cached"
+    hits: int = read_cache(db_path).hits
+    assert hits >= 1
+    with sqlite3.connect(db_path) as db:
+        db.execute("UPDATE documents SET title = 'renamed' WHERE doc_num = 'SOP-001'")
+    db.close()
+    assert doc_info("SOP-001", db_path).title == "renamed"
+    assert read_cache(db_path).metrics()["resets"] >= 1
+    close_pool()
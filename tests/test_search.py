@@ -0,0 +1,57 @@
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+from document_actions import approve_document, create_new_document
+from mock_data import backdate
+from search import search_documents
+from training_actions import lazy_check
+
+
+def write_draft(db_path: str, doc_num: str, text: str) -> None:
+    with sqlite3.connect(db_path) as db:
+        file_path: str = db.execute(
+            "SELECT v.file_path FROM versions v JOIN documents d ON d.doc_id = v.doc WHERE d.doc_num = ? ORDER BY v.version_id DESC LIMIT 1",
+            (doc_num,),
+        ).fetchone()[0]
+    db.close()
+    with open(file_path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def submit(db_path: str, title: str, doc_num: str, text: str) -> None:
+    create_new_document(title, "SOP", "albert.sevilleja", db_path)
+    write_draft(db_path, doc_num, text)
+    approve_document("albert.sevilleja", doc_num, db_path)
+
+
+def test_released_content_is_searchable(db_path: str) -> None:
+    submit(db_path, "Sterilisation", "SOP-001", "Load the autoclave chamber")
+    approve_document(
+        "gus.fring",
+        "SOP-001",
+        db_path,
+        (datetime.now() + timedelta(days=20)).isoformat(),
+    )
+    backdate("SOP-001", (datetime.now() - timedelta(days=1)).isoformat(), db_path)
+    lazy_check(db_path)
+    found: list[dict] = search_documents("autoclave", db_path, ["RELEASED"])
+    assert [(hit["doc_num"], hit["version"]) for hit in found] == [("SOP-001", "1.0")]
+    assert "[autoclave]" in found[0]["snippet"]
+    assert search_documents("autoclave", db_path, ["IN_REVIEW"]) == []
+
+
+def test_title_matches_rank_above_content_matches(db_path: str) -> None:
+    submit(db_path, "Cleaning", "SOP-001", "Record each calibration of the scale")
+    submit(db_path, "Calibration", "SOP-002", "Weigh the reference mass")
+    found: list[dict] = search_documents("calib", db_path)
+    assert [hit["doc_num"] for hit in found] == ["SOP-002", "SOP-001"]
+    assert {hit["status"] for hit in found} == {"IN_REVIEW"}
+
+
+def test_invalid_queries_are_rejected(db_path: str) -> None:
+    with pytest.raises(ValueError):
+        search_documents("  ", db_path)
+    with pytest.raises(ValueError):
+        search_documents("autoclave", db_path, ["ARCHIVED"])
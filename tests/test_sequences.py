@@ -0,0 +1,49 @@
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+
+from core_actions import allocate_doc_num, allocate_ids
+from document_actions import create_new_document
+from mock_data import seed_documents
+
+processes: int = 8
+allocations: int = 100
+
+
+def allocate_many(db_path: str) -> tuple[list[str], list[int]]:
+    doc_nums: list[str] = []
+    ids: list[int] = []
+    for n in range(allocations):
+        doc_nums.append(allocate_doc_num("SOP", db_path))
+        first: int = allocate_ids("versions", db_path, count=1 + n % 3)
+        ids.extend(range(first, first + 1 + n % 3))
+    return doc_nums, ids
+
+
+def test_concurrent_allocators_have_no_duplicates_or_gaps(db_path: str) -> None:
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        batches: list[tuple[list[str], list[int]]] = list(
+            pool.map(allocate_many, [db_path] * processes)
+        )
+    doc_nums: list[str] = [doc_num for batch, _ in batches for doc_num in batch]
+    ids: list[int] = [version_id for _, batch in batches for version_id in batch]
+    assert sorted(doc_nums) == [
+        f"SOP-{n:03d}" for n in range(1, processes * allocations + 1)
+    ]
+    assert sorted(ids) == list(range(1, len(ids) + 1))
+
+
+def test_mock_seed_keeps_sequences_in_step(db_path: str) -> None:
+    seed_documents(db_path)
+    create_new_document("after seed", "SOP", "albert.sevilleja", db_path)
+    with sqlite3.connect(db_path) as db:
+        for name, table, key in [
+            ("documents", "documents", "doc_id"),
+            ("versions", "versions", "version_id"),
+        ]:
+            assert (
+                db.execute(
+                    "SELECT value FROM sequences WHERE name = ?", (name,)
+                ).fetchone()[0]
+                == db.execute(f"SELECT max({key}) FROM {table}").fetchone()[0]
+            )
+    db.close()
@@ -0,0 +1,84 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from classes import Document_Header
+from core_actions import doc_info
+from service import QMSService
+from session import Session
+
+
+def slow_read(db_path: str, session: Session) -> int:
+    time.sleep(0.05)
+    return session.db.execute("SELECT count(*) FROM documents").fetchone()[0]
+
+
+def test_writes_are_serialised_and_reads_see_them(db_path: str) -> None:
+    async def run() -> tuple:
+        async with QMSService(db_path) as service:
+            await asyncio.gather(
+                *(
+                    service.create(f"doc {i}", "SOP", "albert.sevilleja")
+                    for i in range(5)
+                )
+            )
+            with pytest.raises(PermissionError):
+                await service.approve("walter.white", "SOP-001")
+            headers: list[Document_Header] = await asyncio.gather(
+                *(service.read(doc_info, f"SOP-00{i}") for i in range(1, 6))
+            )
+            return headers, service.metrics()
+
+    headers: list[Document_Header]
+    metrics: dict
+    headers, metrics = asyncio.run(run())
+    assert sorted(header.title for header in headers) == [f"doc {i}" for i in range(5)]
+    assert metrics["writes"]["submitted"] == 6
+    assert (metrics["writes"]["completed"], metrics["writes"]["failed"]) == (5, 1)
+    assert metrics["reads"]["completed"] == 5
+    assert metrics["queue_depth"] == 0
+
+
+def test_read_wait_counts_time_queued_behind_other_reads(db_path: str) -> None:
+    async def run() -> tuple:
+        async with QMSService(db_path, readers=1) as service:
+            counts: list[int] = await asyncio.gather(
+                service.read(slow_read), service.read(slow_read)
+            )
+            return counts, sorted(service.read_stats.waits)
+
+    counts: list[int]
+    waits: list[float]
+    counts, waits = asyncio.run(run())
+    assert counts[0] == counts[1]
+    assert waits[0] < 0.04
+    assert waits[1] >= 0.04
+
+
+def test_full_queue_rejects_writes(db_path: str) -> None:
+    gate: threading.Event = threading.Event()
+
+    def blocked(db_path: str) -> None:
+        gate.wait(5)
+
+    async def run() -> dict:
+        async with QMSService(db_path, max_pending=1, put_timeout=0.01) as service:
+            running: asyncio.Task = asyncio.create_task(service.write(blocked))
+            await asyncio.sleep(0.05)
+            waiting: asyncio.Task = asyncio.create_task(service.write(blocked))
+            await asyncio.sleep(0.01)
+            with pytest.raises(RuntimeError):
+                await service.write(blocked)
+            gate.set()
+            await asyncio.gather(running, waiting)
+            return service.metrics()["writes"]
+
+    writes: dict = asyncio.run(run())
+    assert (writes["submitted"], writes["completed"], writes["rejected"]) == (2, 2, 1)
+
+
+def test_calls_require_a_running_service(db_path: str) -> None:
+    with pytest.raises(RuntimeError):
+        asyncio.run(QMSService(db_path).released_documents())
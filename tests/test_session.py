@@ -0,0 +1,69 @@
+import sqlite3
+import threading
+
+import pytest
+
+import session
+from core_actions import allocate_ids
+from document_actions import approve_document, create_new_document
+from session import Session, connect, open_session
+
+
+def test_journal_mode_switch_waits_for_a_locked_database(
+    db_path: str, monkeypatch
+) -> None:
+    with sqlite3.connect(db_path) as db:
+        db.execute("PRAGMA journal_mode = DELETE")
+    db.close()
+    monkeypatch.setattr(session, "busy_timeout_ms", 50)
+    session.close_pool()
+    holder: sqlite3.Connection = sqlite3.connect(
+        db_path, isolation_level=None, check_same_thread=False
+    )
+    holder.execute("BEGIN EXCLUSIVE")
+    release: threading.Timer = threading.Timer(0.3, holder.execute, ["COMMIT"])
+    release.start()
+    try:
+        assert allocate_ids("versions", db_path) == 1
+    finally:
+        release.join()
+        holder.close()
+        session.close_pool()
+    with sqlite3.connect(db_path) as db:
+        assert db.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    db.close()
+
+
+def test_new_databases_start_in_wal(db_path: str) -> None:
+    with sqlite3.connect(db_path) as db:
+        assert db.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    db.close()
+
+
+def test_workflow_steps_share_one_transaction(db_path: str) -> None:
+    placed: list[str] = []
+    with pytest.raises(PermissionError):
+        with open_session(db_path, immediate=True) as active:
+            create_new_document("shared", "SOP", "albert.sevilleja", db_path, active)
+            with connect(db_path, active) as db:
+                assert db is active.db
+            active.after_commit(lambda: placed.append("committed"))
+            approve_document("walter.white", "SOP-001", db_path, session=active)
+    assert placed == []
+    with sqlite3.connect(db_path) as db:
+        assert db.execute("SELECT count(*) FROM documents").fetchone()[0] == 0
+        assert db.execute("SELECT count(*) FROM versions").fetchone()[0] == 0
+    db.close()
+
+
+def test_sessions_reuse_pooled_connections(db_path: str) -> None:
+    session.close_pool()
+    with Session(db_path) as first:
+        reused: sqlite3.Connection = first.db  # type: ignore
+    with Session(db_path) as second:
+        assert second.db is reused
+    with Session(db_path, immediate=True) as outer:
+        with open_session(db_path, outer) as inner:
+            assert inner is outer and inner.depth == 2
+        assert outer.db.in_transaction  # type: ignore
+    session.close_pool()
@@ -0,0 +1,94 @@
+import sqlite3
+from pathlib import Path
+
+from blob_store import file_digest, stage_folders
+from config import storage_root_path
+from document_actions import approve_document, create_new_document
+from storage_scan import scan_storage
+
+
+def submit_all(db_path: str, count: int) -> dict[str, Path]:
+    views: dict[str, Path] = {}
+    for n in range(1, count + 1):
+        doc_num: str = f"SOP-00{n}"
+        create_new_document(f"scanned {n}", "SOP", "albert.sevilleja", db_path)
+        with sqlite3.connect(db_path) as db:
+            file_path: str = db.execute(
+                "SELECT v.file_path FROM versions v JOIN documents d ON d.doc_id = v.doc WHERE d.doc_num = ?",
+                (doc_num,),
+            ).fetchone()[0]
+        db.close()
+        Path(file_path).write_text(f"procedure {n}", encoding="utf-8")
+        approve_document("albert.sevilleja", doc_num, db_path)
+        views[doc_num] = Path(file_path)
+    return views
+
+
+def doc_nums(entries: list[dict]) -> list[str]:
+    return [entry["doc_num"] for entry in entries]
+
+
+def test_clean_storage_is_hashed_once_then_cached(db_path: str) -> None:
+    submit_all(db_path, 3)
+    first: dict = scan_storage(db_path, workers=1)
+    assert (first["hashed"], first["cached"]) == (3, 0)
+    for name in ["missing", "misplaced", "modified", "unverified"]:
+        assert first[name] == []
+    second: dict = scan_storage(db_path, workers=1)
+    assert (second["hashed"], second["cached"]) == (0, 3)
+    assert scan_storage(db_path, workers=1, full=True)["hashed"] == 3
+
+
+def test_damaged_storage_is_reported(db_path: str) -> None:
+    views: dict[str, Path] = submit_all(db_path, 4)
+    scan_storage(db_path, workers=1)
+    views["SOP-001"].unlink()
+    views["SOP-002"].unlink()
+    views["SOP-002"].write_text("tampered", encoding="utf-8")
+    moved: Path = (
+        Path(storage_root_path) / stage_folders["RELEASED"] / views["SOP-003"].name
+    )
+    moved.parent.mkdir(exist_ok=True)
+    moved.write_bytes(views["SOP-003"].read_bytes())
+    views["SOP-003"].unlink()
+    orphan: Path = Path(storage_root_path) / stage_folders["DRAFT"] / "orphan.txt"
+    orphan.write_text("stray", encoding="utf-8")
+    with sqlite3.connect(db_path) as db:
+        db.execute(
+            "UPDATE versions SET file_path = ? WHERE version_id = 3", (str(moved),)
+        )
+        db.execute("UPDATE versions SET checksum = NULL WHERE version_id = 4")
+    db.close()
+    report: dict = scan_storage(db_path, workers=1)
+    orphan.unlink()
+    assert doc_nums(report["missing"]) == ["SOP-001"]
+    assert doc_nums(report["modified"]) == ["SOP-002"]
+    assert report["modified"][0]["digest"] == file_digest(str(views["SOP-002"]))
+    assert doc_nums(report["misplaced"]) == ["SOP-003"]
+    assert report["misplaced"][0]["expected_folder"] == stage_folders["IN_REVIEW"]
+    assert doc_nums(report["unverified"]) == ["SOP-004"]
+    assert str(orphan) in report["orphaned"]
+    assert str(moved) not in report["orphaned"]
+
+
+def test_backfill_records_missing_checksums(db_path: str) -> None:
+    views: dict[str, Path] = submit_all(db_path, 2)
+    with sqlite3.connect(db_path) as db:
+        db.execute("UPDATE versions SET checksum = NULL")
+    db.close()
+    report: dict = scan_storage(db_path, workers=1, backfill=True)
+    assert (report["backfilled"], report["unverified"]) == (2, [])
+    with sqlite3.connect(db_path) as db:
+        checksums: list[str] = [
+            row[0]
+            for row in db.execute("SELECT checksum FROM versions ORDER BY version_id")
+        ]
+    db.close()
+    assert checksums == [file_digest(str(views[doc_num])) for doc_num in views]
+    assert scan_storage(db_path, workers=1)["unverified"] == []
+
+
+def test_process_workers_hash_the_same_digests(db_path: str) -> None:
+    submit_all(db_path, 2)
+    report: dict = scan_storage(db_path, workers=2, processes=True, full=True)
+    assert (report["hashed"], report["modified"]) == (2, [])
@@ -0,0 +1,72 @@
+import sqlite3
+from datetime import datetime, timedelta
+
+from core_actions import get_training_users, get_user_id
+from compliance import summary_drift
+from document_actions import approve_document, create_new_document
+from training_actions import check_overdue, do_training
+
+effective_date: str = (datetime.now() + timedelta(days=20)).isoformat()
+
+
+def to_training(db_path: str, title: str, doc_num: str) -> None:
+    create_new_document(title, "SOP", "albert.sevilleja", db_path)
+    approve_document("albert.sevilleja", doc_num, db_path)
+    approve_document("gus.fring", doc_num, db_path, effective_date)
+
+
+def test_assignment_writes_one_contiguous_batch(db_path: str) -> None:
+    to_training(db_path, "first", "SOP-001")
+    to_training(db_path, "second", "SOP-002")
+    trainees: list[int] = get_training_users(db_path)
+    assert trainees
+    with sqlite3.connect(db_path) as db:
+        rows: list[tuple] = db.execute(
+            "SELECT training_id, user_id, version_id, status, due_date FROM training_records ORDER BY training_id"
+        ).fetchall()
+        summary: list[tuple] = db.execute(
+            "SELECT version_id, assigned, failed, completed, overdue FROM training_summary ORDER BY version_id"
+        ).fetchall()
+        audited: int = db.execute(
+            "SELECT count(*) FROM audit_log WHERE table_affected = 'training_records' AND action = 'ASSING'"
+        ).fetchone()[0]
+    db.close()
+    assert [row[0] for row in rows] == list(range(1, 2 * len(trainees) + 1))
+    versions: list[int] = sorted({row[2] for row in rows})
+    for version_id in versions:
+        batch: list[tuple] = [row for row in rows if row[2] == version_id]
+        assert sorted(row[1] for row in batch) == sorted(trainees)
+        assert {(row[3], row[4]) for row in batch} == {("ASSIGNED", effective_date)}
+    assert summary == [(version_id, len(trainees), 0, 0, 0) for version_id in versions]
+    assert audited == len(rows)
+
+
+def test_overdue_sweep_moves_open_records_and_summary(db_path: str) -> None:
+    to_training(db_path, "sweep", "SOP-001")
+    do_training("walter.white", "SOP-001", 40, db_path)
+    do_training("jesse.pinkman", "SOP-001", 95, db_path)
+    with sqlite3.connect(db_path) as db:
+        db.execute(
+            "UPDATE training_records SET due_date = ?",
+            ((datetime.now() - timedelta(days=1)).isoformat(),),
+        )
+    db.close()
+    trainees: int = len(get_training_users(db_path))
+    assert check_overdue(db_path) == trainees - 1
+    assert check_overdue(db_path) == 0
+    with sqlite3.connect(db_path) as db:
+        statuses: dict[int, str] = dict(
+            db.execute("SELECT user_id, status FROM training_records").fetchall()
+        )
+        summary: tuple = db.execute(
+            "SELECT assigned, failed, completed, overdue FROM training_summary"
+        ).fetchone()
+        audited: int = db.execute(
+            "SELECT count(*) FROM audit_log WHERE action = 'AUTO_OVERDUE'"
+        ).fetchone()[0]
+    db.close()
+    assert statuses.pop(get_user_id("jesse.pinkman", db_path)) == "COMPLETED"
+    assert set(statuses.values()) == {"OVERDUE"}
+    assert summary == (0, 0, 1, trainees - 1)
+    assert audited == trainees - 1
+    assert summary_drift(db_path) == []
@@ -0,0 +1,95 @@
+import sqlite3
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+from compliance import summary_drift
+from document_actions import approve_document, create_new_document
+from training_import import import_training_results
+
+rows: str = """user,doc_num,score
+walter.white,SOP-001,95
+jesse.pinkman,SOP-001,40
+saul.goodman,SOP-001,90
+no.body,SOP-001,90
+walter.white,SOP-404,90
+hank.schrader,SOP-001,ninety
+mike.ehrmantraut,SOP-001,101
+walter.white,SOP-001,80
+"""
+
+
+def to_training(db_path: str) -> None:
+    create_new_document("Import", "SOP", "albert.sevilleja", db_path)
+    approve_document("albert.sevilleja", "SOP-001", db_path)
+    approve_document(
+        "gus.fring",
+        "SOP-001",
+        db_path,
+        (datetime.now() + timedelta(days=20)).isoformat(),
+    )
+
+
+def statuses(db_path: str) -> dict[str, str]:
+    with sqlite3.connect(db_path) as db:
+        found: dict[str, str] = dict(
+            db.execute(
+                "SELECT u.user_name, t.status FROM training_records t JOIN users u ON u.user_id = t.user_id"
+            ).fetchall()
+        )
+    db.close()
+    return found
+
+
+def test_bad_rows_are_reported_and_good_rows_applied(
+    db_path: str, tmp_path: Path
+) -> None:
+    to_training(db_path)
+    path: Path = tmp_path / "results.csv"
+    path.write_text(rows, encoding="utf-8")
+    report: dict = import_training_results(str(path), db_path)
+    assert (report["rows"], report["completed"], report["failed"]) == (8, 1, 1)
+    assert [(error["row"], error["error"]) for error in report["errors"]] == [
+        (3, "No training for user and document: 'saul.goodman', 'SOP-001'"),
+        (4, "Unknown user: 'no.body'"),
+        (5, "No training version for document: 'SOP-404'"),
+        (6, "Invalid score: 'ninety'"),
+        (7, "Score out of range: '101'"),
+        (
+            8,
+            "Duplicate result for user and document: 'walter.white', 'SOP-001'",
+        ),
+    ]
+    found: dict[str, str] = statuses(db_path)
+    assert found["walter.white"] == "COMPLETED"
+    assert found["jesse.pinkman"] == "FAILED"
+    assert found["hank.schrader"] == "ASSIGNED"
+    assert summary_drift(db_path) == []
+
+
+def test_strict_import_applies_nothing_on_error(db_path: str, tmp_path: Path) -> None:
+    to_training(db_path)
+    path: Path = tmp_path / "results.jsonl"
+    path.write_text(
+        '{"user": "walter.white", "doc_num": "SOP-001", "score": 95}\n\n'
+        '{"user": "jesse.pinkman", "doc_num": "SOP-001", "score": -1}\n',
+        encoding="utf-8",
+    )
+    report: dict = import_training_results(str(path), db_path, strict=True)
+    assert (report["rows"], report["completed"], report["failed"]) == (2, 0, 0)
+    assert [error["row"] for error in report["errors"]] == [2]
+    assert set(statuses(db_path).values()) == {"ASSIGNED"}
+    with sqlite3.connect(db_path) as db:
+        audited: int = db.execute(
+            "SELECT count(*) FROM audit_log WHERE table_affected = 'training_records' AND action != 'ASSING'"
+        ).fetchone()[0]
+    db.close()
+    assert audited == 0
+
+
+def test_unknown_formats_are_rejected(db_path: str, tmp_path: Path) -> None:
+    path: Path = tmp_path / "results.xlsx"
+    path.write_text("", encoding="utf-8")
+    with pytest.raises(ValueError):
+        import_training_results(str(path), db_path)